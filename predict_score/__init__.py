@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Predicción de goles de partidos de fútbol (football-data.co.uk).
+
+Importar el paquete no descarga datos ni carga backends: cada módulo se
+importa la primera vez que se accede a él (``predict_score.mlp`` carga
+TensorFlow; ``forest`` y ``model_catalog`` importan XGBoost/CatBoost al
+construir los modelos; matplotlib y seaborn sólo al dibujar).
+
+Módulos:
+    match_data, ingestion, team_form,
+    rolling_features, ratings, preprocessing    Datos y features.
+    forest, mlp, comparison                     Modelos supervisados.
+    clustering, team_profiles                   KMeans y perfiles de equipo.
+    fixture_prediction, model_bundle,
+    numpy_inference, prediction_server, odds    Predicción, servicio y cuotas.
+    evaluation_engine, stacking, model_cache,
+    tuning, backtesting,
+    season_simulation, benchmark_suite,
+    instrumentation, load_test                  Evaluación y herramientas.
+
+La línea de comandos es ``predict-score`` (``predict_score.cli``).
+"""
+
+import importlib
+
+__version__ = "0.1.0"
+
+_SUBMODULES = (
+    "backtesting", "benchmark_suite", "cli", "clustering", "comparison", "evaluation_engine",
+    "fixture_prediction", "forest", "ingestion", "instrumentation", "load_test", "match_data", "mlp",
+    "model_bundle", "model_cache", "model_catalog", "multi_output", "numpy_inference", "odds",
+    "prediction_server", "preprocessing", "ratings", "rolling_features", "season_simulation", "stacking",
+    "team_form", "team_profiles", "tuning",
+)
+# Atajos: nombre -> módulo donde está definido
+_EXPORTS = {
+    "load_matches": "match_data",
+    "TeamFormStore": "team_form",
+    "RatingEngine": "ratings",
+    "DixonColes": "ratings",
+    "load_bundle": "model_bundle",
+    "save_bundle": "model_bundle",
+    "NumpyScorePredictor": "numpy_inference",
+}
+
+__all__ = list(_SUBMODULES) + list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""Backtest walk-forward por jornadas con reentrenamiento incremental.
+
+Recorre los partidos en orden de ``Date`` agrupados por jornada (semana
+natural). Para cada jornada predice sus partidos sólo con información
+anterior: la forma HF/AF se toma del ``TeamFormStore`` antes de la jornada y
+los modelos se han entrenado con las jornadas previas. Tras predecir, los
+modelos se actualizan de forma incremental en lugar de reentrenarse:
+
+    Random Forest   ``warm_start`` añade árboles nuevos ajustados con todo el histórico
+    XGBoost         sigue el boosting desde el booster anterior (``xgb_model``)
+    CatBoost        sigue el boosting desde el modelo anterior (``init_model``)
+    MLP (Keras)     unas pocas épocas de ajuste fino sobre las últimas jornadas
+
+Cada ``refit_every`` jornadas se reajustan desde cero el preprocesador y los
+modelos (``refit_every=1`` equivale a reentrenar en cada jornada).
+
+Uso:
+    python -m predict_score.backtesting --models rf xgb catboost --refit-every 38
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+from .fixture_prediction import outcomes
+from .multi_output import GOAL_TARGETS
+from .preprocessing import create_preprocessor
+from .team_form import TeamFormStore
+
+FEATURES = ["HF", "AF", "HomeTeam", "AwayTeam"]
+
+
+def matchweeks(dates):
+    """Número de jornada (0, 1, ...) de cada partido: semanas naturales de lunes a domingo."""
+    periods = dates.dt.to_period("W-SUN")
+    codes, _ = pd.factorize(periods, sort=True)
+    return codes
+
+
+def pre_match_form(matches, weeks, window=5):
+    """
+    HF y AF de cada partido con la forma que se conocía antes de su jornada.
+
+    Es lo mismo que ve ``predict_fixtures`` en producción: los resultados de
+    la propia jornada no entran en sus características.
+    """
+    store = TeamFormStore(window)
+    home_form = np.zeros(len(matches))
+    away_form = np.zeros(len(matches))
+    bounds = np.flatnonzero(np.diff(np.r_[-1, weeks, weeks[-1] + 1]))
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        week = matches.iloc[start:stop]
+        home_form[start:stop] = [store.home_form(team) for team in week["HomeTeam"]]
+        away_form[start:stop] = [store.away_form(team) for team in week["AwayTeam"]]
+        store.update_many(week)
+    return home_form, away_form
+
+
+def _dense(X):
+    return X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+
+
+class WarmStartForest:
+    """Random Forest multi-salida que añade ``trees_per_update`` árboles por jornada."""
+
+    name = "Random Forest"
+
+    def __init__(self, n_estimators=100, trees_per_update=10, random_state=42):
+        self.n_estimators = n_estimators
+        self.trees_per_update = trees_per_update
+        self.random_state = random_state
+        self.model = None
+
+    def fit(self, X, y):
+        self.model = RandomForestRegressor(n_estimators=self.n_estimators, warm_start=True,
+                                           random_state=self.random_state, n_jobs=-1)
+        self.model.fit(X, y)
+
+    def update(self, X, y, X_new, y_new):
+        # Los árboles existentes se conservan; sólo se ajustan los nuevos
+        self.model.n_estimators += self.trees_per_update
+        self.model.fit(X, y)
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+class ContinuedXGBoost:
+    """Un XGBRegressor por objetivo; cada actualización añade ``rounds_per_update`` rondas."""
+
+    name = "XGBRegressor"
+
+    def __init__(self, n_estimators=100, rounds_per_update=10, **params):
+        self.n_estimators = n_estimators
+        self.rounds_per_update = rounds_per_update
+        self.params = {"learning_rate": 0.1, "max_depth": 6, "subsample": 0.8,
+                       "colsample_bytree": 0.8, "random_state": 42, **params}
+        self.models = None
+
+    def fit(self, X, y):
+        from xgboost import XGBRegressor
+
+        self.models = [XGBRegressor(n_estimators=self.n_estimators, **self.params).fit(X, y[:, i])
+                       for i in range(y.shape[1])]
+
+    def update(self, X, y, X_new, y_new):
+        from xgboost import XGBRegressor
+
+        self.models = [
+            XGBRegressor(n_estimators=self.rounds_per_update, **self.params)
+            .fit(X, y[:, i], xgb_model=model.get_booster())
+            for i, model in enumerate(self.models)
+        ]
+
+    def predict(self, X):
+        return np.column_stack([model.predict(X) for model in self.models])
+
+
+class ContinuedCatBoost:
+    """Un CatBoostRegressor por objetivo; cada actualización añade ``iterations_per_update`` árboles."""
+
+    name = "CatBoostRegressor"
+
+    def __init__(self, iterations=1000, iterations_per_update=50, **params):
+        self.iterations = iterations
+        self.iterations_per_update = iterations_per_update
+        self.params = {"random_state": 42, "silent": True, "allow_writing_files": False, **params}
+        self.models = None
+
+    def fit(self, X, y):
+        from catboost import CatBoostRegressor
+
+        self.models = [CatBoostRegressor(iterations=self.iterations, **self.params).fit(X, y[:, i])
+                       for i in range(y.shape[1])]
+
+    def update(self, X, y, X_new, y_new):
+        from catboost import CatBoostRegressor
+
+        self.models = [
+            CatBoostRegressor(iterations=self.iterations_per_update, **self.params)
+            .fit(X, y[:, i], init_model=model)
+            for i, model in enumerate(self.models)
+        ]
+
+    def predict(self, X):
+        return np.column_stack([model.predict(X) for model in self.models])
+
+
+class FineTunedMLP:
+    """
+    MLP de ``mlp.build_mlp``: ``epochs`` épocas al reajustar y
+    ``fine_tune_epochs`` sobre las últimas ``replay_weeks`` jornadas al actualizar.
+    """
+
+    name = "MLP"
+
+    def __init__(self, epochs=50, fine_tune_epochs=3, replay_weeks=4, batch_size=32):
+        self.epochs = epochs
+        self.fine_tune_epochs = fine_tune_epochs
+        self.replay_weeks = replay_weeks
+        self.batch_size = batch_size
+        self.model = None
+        self._recent = []
+
+    def fit(self, X, y):
+        from .mlp import build_mlp
+
+        X = _dense(X)
+        self.model = build_mlp(X.shape[1])
+        self.model.fit(X, y, epochs=self.epochs, batch_size=self.batch_size, verbose=0)
+        self._recent = []
+
+    def update(self, X, y, X_new, y_new):
+        # Repaso de las últimas jornadas para no olvidar lo reciente con cada paso
+        self._recent = (self._recent + [(_dense(X_new), y_new)])[-self.replay_weeks:]
+        X_recent = np.vstack([block[0] for block in self._recent])
+        y_recent = np.vstack([block[1] for block in self._recent])
+        self.model.fit(X_recent, y_recent, epochs=self.fine_tune_epochs, batch_size=self.batch_size, verbose=0)
+
+    def predict(self, X):
+        return self.model.predict(_dense(X), verbose=0)
+
+
+class RefitEachWeek:
+    """Adaptador para cualquier regresor de scikit-learn: sin modo incremental, siempre reajusta."""
+
+    def __init__(self, estimator, name=None):
+        self.estimator = estimator
+        self.name = name or type(estimator).__name__
+        self.model = None
+
+    def fit(self, X, y):
+        self.model = clone(self.estimator).fit(X, y)
+
+    def update(self, X, y, X_new, y_new):
+        self.fit(X, y)
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+LEARNERS = {
+    "rf": WarmStartForest,
+    "xgb": ContinuedXGBoost,
+    "catboost": ContinuedCatBoost,
+    "mlp": FineTunedMLP,
+}
+
+
+def walk_forward(matches, learners, min_train_weeks=38, refit_every=38, window=5, verbose=False):
+    """
+    Backtest jornada a jornada.
+
+    Args:
+        matches (DataFrame): Partidos con Date, HomeTeam, AwayTeam, FTHG y FTAG.
+        learners (list): Modelos incrementales (``WarmStartForest``, ``ContinuedXGBoost``...).
+        min_train_weeks (int): Jornadas iniciales que sólo se usan para entrenar.
+        refit_every (int): Jornadas entre reajustes completos.
+        window (int): Ventana de forma HF/AF.
+        verbose (bool): Imprime una línea por jornada y modelo.
+
+    Returns:
+        DataFrame: Una fila por (modelo, jornada) con partidos, MSE y MAE de goles
+        local/visitante, acierto del resultado, tipo de paso ('refit' o 'update')
+        y segundos de entrenamiento y predicción.
+    """
+    matches = matches.sort_values("Date", kind="stable").reset_index(drop=True)
+    weeks = matchweeks(matches["Date"])
+    matches["HF"], matches["AF"] = pre_match_form(matches, weeks, window)
+    targets = matches[GOAL_TARGETS].to_numpy(dtype=float)
+    week_dates = matches.groupby(weeks)["Date"].min()
+
+    rows = []
+    for learner in learners:
+        preprocessor = X_all = None
+        last_refit = None
+        for week in range(min_train_weeks, weeks.max() + 1):
+            train = weeks < week
+            test = weeks == week
+            if not test.any():
+                continue
+
+            start = time.perf_counter()
+            if last_refit is None or week - last_refit >= refit_every:
+                # Las características son previas a cada partido: transformar todo de una vez no filtra resultados
+                preprocessor = create_preprocessor().fit(matches.loc[train, FEATURES])
+                X_all = preprocessor.transform(matches[FEATURES])
+                learner.fit(X_all[train], targets[train])
+                last_refit, step = week, "refit"
+            else:
+                new = weeks == week - 1
+                learner.update(X_all[train], targets[train], X_all[new], targets[new])
+                step = "update"
+            train_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            predicted = np.asarray(learner.predict(X_all[test]), dtype=float).reshape(-1, 2)
+            predict_seconds = time.perf_counter() - start
+
+            actual = targets[test]
+            scores = np.rint(predicted).astype(int)
+            rows.append({
+                "Model": learner.name,
+                "Week": week,
+                "Date": week_dates[week],
+                "Matches": int(test.sum()),
+                "Step": step,
+                "Home MSE": mean_squared_error(actual[:, 0], predicted[:, 0]),
+                "Away MSE": mean_squared_error(actual[:, 1], predicted[:, 1]),
+                "Home MAE": mean_absolute_error(actual[:, 0], predicted[:, 0]),
+                "Away MAE": mean_absolute_error(actual[:, 1], predicted[:, 1]),
+                "Outcome accuracy": float(np.mean(outcomes(scores[:, 0], scores[:, 1])
+                                                  == matches.loc[test, "FTR"].to_numpy())),
+                "Train seconds": train_seconds,
+                "Predict seconds": predict_seconds,
+            })
+            if verbose:
+                last = rows[-1]
+                print(f"{learner.name:<18} week {week:>3} {step:<6} mse={last['Home MSE']:.3f}/{last['Away MSE']:.3f}"
+                      f" train={train_seconds:.2f}s")
+    return pd.DataFrame(rows)
+
+
+def summarize(results):
+    """
+    Métricas ponderadas por partidos y tiempo de cómputo total por modelo.
+    """
+    weighted = results.assign(**{
+        column: results[column] * results["Matches"]
+        for column in ["Home MSE", "Away MSE", "Home MAE", "Away MAE", "Outcome accuracy"]
+    })
+    summary = weighted.groupby("Model").agg({
+        "Matches": "sum", "Home MSE": "sum", "Away MSE": "sum", "Home MAE": "sum", "Away MAE": "sum",
+        "Outcome accuracy": "sum", "Train seconds": "sum", "Predict seconds": "sum",
+    })
+    for column in ["Home MSE", "Away MSE", "Home MAE", "Away MAE", "Outcome accuracy"]:
+        summary[column] /= summary["Matches"]
+    summary["Weeks"] = results.groupby("Model").size()
+    summary["Refits"] = results[results["Step"] == "refit"].groupby("Model").size()
+    summary["Compute seconds"] = summary["Train seconds"] + summary["Predict seconds"]
+    return summary
+
+
+def main(argv=None):
+    from .match_data import load_matches
+
+    parser = argparse.ArgumentParser(description="Walk-forward matchweek backtest with incremental refitting")
+    parser.add_argument("--models", nargs="+", choices=sorted(LEARNERS), default=["rf", "xgb"])
+    parser.add_argument("--min-train-weeks", type=int, default=38)
+    parser.add_argument("--refit-every", type=int, default=38, help="weeks between full refits (1 = always)")
+    parser.add_argument("--output", help="CSV file for the per-week results")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    learners = [LEARNERS[name]() for name in args.models]
+    results = walk_forward(load_matches(), learners, args.min_train_weeks, args.refit_every, verbose=args.verbose)
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(summarize(results).round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks de tiempo y memoria por etapa del pipeline.
+
+Mide la carga de datos, la construcción de HF/AF, el ``fit_transform`` del
+ColumnTransformer, el ajuste y la predicción de cada modelo de
+``evaluate_models``, la latencia de un partido suelto, el throughput por
+lotes y el ajuste de KMeans de ``modelonosupervisado``. Se ejecuta sobre
+``PremierLeague.csv`` y sobre copias sintéticas escaladas (10x, 100x filas y
+equipos) y escribe un JSON; ``compare`` marca las regresiones entre dos runs.
+
+Uso:
+    python -m predict_score.benchmark_suite run --scales 1 10 100 --output bench.json
+    python -m predict_score.benchmark_suite compare base.json bench.json --threshold 0.10
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+from sklearn.cluster import KMeans
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from . import match_data
+from .fixture_prediction import predict_fixtures, season_grid
+from .model_catalog import build_models
+from .preprocessing import create_preprocessor
+from .team_form import build_form_features
+from .clustering import VARS as CLUSTER_VARS, k_sweep
+FEATURES = ['HF', 'AF', 'HomeTeam', 'AwayTeam']
+
+
+def scale_matches(matches, factor):
+    """
+    Copia sintética con ``factor`` veces más filas y equipos: cada copia
+    renombra los equipos ('Arsenal #3') para que el one-hot también crezca.
+    """
+    if factor == 1:
+        return matches.copy()
+    copies = []
+    for i in range(factor):
+        copy = matches.copy()
+        copy['HomeTeam'] = copy['HomeTeam'] + f' #{i}'
+        copy['AwayTeam'] = copy['AwayTeam'] + f' #{i}'
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(fn, repeat=3, profile_memory=True):
+    """
+    Ejecuta ``fn`` ``repeat`` veces y devuelve tiempos y, en una pasada extra
+    con tracemalloc, el pico de memoria asignada.
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    record = {"repeat": repeat, "seconds": statistics.median(times), "min_seconds": min(times)}
+    if profile_memory:
+        tracemalloc.start()
+        fn()
+        record["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    record["rss_mb"] = _rss_mb()
+    return record, result
+
+
+class BenchmarkRun:
+    def __init__(self, repeat=3, profile_memory=True, verbose=True):
+        self.repeat = repeat
+        self.profile_memory = profile_memory
+        self.verbose = verbose
+        self.results = []
+
+    def stage(self, name, scale, fn, rows, repeat=None, **extra):
+        record, result = measure(fn, repeat or self.repeat, self.profile_memory)
+        record = {"stage": name, "scale": scale, "rows": rows, **extra, **record}
+        self.results.append(record)
+        if self.verbose:
+            print(f"{name:<45} x{scale:<4} rows={rows:<8} {record['seconds'] * 1000:10.2f} ms"
+                  f"  peak={record.get('peak_mb', float('nan')):8.1f} MB")
+        return result
+
+
+def _legacy_form(matches):
+    # Implementación original (groupby-rolling) como referencia
+    goal_difference = matches['FTHG'] - matches['FTAG']
+    frame = matches.assign(goal_difference=goal_difference)
+    hf = frame.groupby('HomeTeam')['goal_difference'].rolling(5).mean().reset_index(level=0, drop=True)
+    af = frame.groupby('AwayTeam')['goal_difference'].rolling(5).mean().reset_index(level=0, drop=True)
+    return hf, af
+
+
+def bench_load(run):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        run.stage("load.csv_parse", 1, lambda: pd.read_csv(match_data.BOOTSTRAP_CSV), rows=0)
+
+        def cold():
+            for path in match_data.Path(cache_dir).glob("*/*.parquet"):
+                path.unlink()
+            return match_data.load_matches(offline=True, cache_dir=cache_dir)
+
+        matches = run.stage("load.cache_cold", 1, cold, rows=0)
+        run.stage("load.cache_warm", 1, lambda: match_data.load_matches(offline=True, cache_dir=cache_dir),
+                  rows=len(matches))
+    return matches
+
+
+def bench_scale(run, base, scale, models, max_fit_rows):
+    matches = scale_matches(base, scale)
+    rows = len(matches)
+    teams = matches['HomeTeam'].nunique()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scaled.parquet")
+        matches.to_parquet(path, index=False)
+        run.stage("load.parquet_projected", scale,
+                  lambda: pd.read_parquet(path, columns=match_data.MATCH_COLUMNS), rows=rows, teams=teams)
+
+    run.stage("features.form_groupby_rolling", scale, lambda: _legacy_form(matches), rows=rows, teams=teams)
+    hf, af, form_store = run.stage("features.form_store", scale, lambda: build_form_features(matches),
+                                   rows=rows, teams=teams)
+    matches = matches.assign(HF=np.nan_to_num(hf), AF=np.nan_to_num(af))
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        matches[FEATURES], matches['FTHG'], test_size=0.2, random_state=123)
+    for sparse_float32 in (False, True):
+        name = "preprocess.fit_transform" + ("[sparse_float32]" if sparse_float32 else "")
+        run.stage(name, scale, lambda: create_preprocessor(sparse_float32=sparse_float32).fit_transform(X_train),
+                  rows=len(X_train), teams=teams)
+    preprocessor = create_preprocessor().fit(X_train)
+    X_train_matrix = preprocessor.transform(X_train)
+    X_test_matrix = preprocessor.transform(X_test)
+
+    fitted = {}
+    if len(X_train) <= max_fit_rows:
+        for model_name, model in models.items():
+            fitted[model_name] = run.stage(
+                f"model.fit[{model_name}]", scale, lambda: clone(model).fit(X_train_matrix, y_train),
+                rows=len(X_train), teams=teams, repeat=1)
+            run.stage(f"model.predict[{model_name}]", scale,
+                      lambda: fitted[model_name].predict(X_test_matrix), rows=len(X_test), teams=teams)
+
+    forest = fitted.get("Random Forest")
+    if forest is not None:
+        some_teams = list(form_store.teams)[:20]
+        run.stage("predict.single_row", scale,
+                  lambda: predict_fixtures([(some_teams[0], some_teams[1])], preprocessor, forest, forest, form_store),
+                  rows=1, teams=teams, repeat=max(run.repeat, 20))
+        grid = season_grid(some_teams)
+        record_rows = len(grid)
+        run.stage("predict.batch_season_grid", scale,
+                  lambda: predict_fixtures(grid, preprocessor, forest, forest, form_store),
+                  rows=record_rows, teams=teams)
+
+    cluster_matrix = StandardScaler().fit_transform(matches[CLUSTER_VARS].fillna(0))
+    run.stage("cluster.kmeans_fit[k=3]", scale,
+              lambda: KMeans(n_clusters=3, random_state=42).fit(cluster_matrix), rows=rows, repeat=1)
+    run.stage("cluster.elbow_sweep[k=1..9]", scale,
+              lambda: [KMeans(n_clusters=k, random_state=42).fit(cluster_matrix).inertia_ for k in range(1, 10)],
+              rows=rows, repeat=1)
+    for mode in ("exact", "minibatch"):
+        run.stage(f"cluster.k_sweep[{mode}]", scale,
+                  lambda: k_sweep(matches, mode=mode, silhouette_sample=5000), rows=rows, repeat=1)
+
+
+def run_benchmarks(scales=(1, 10, 100), model_names=None, max_fit_rows=30000, repeat=3, profile_memory=True):
+    """
+    Ejecuta todas las etapas y devuelve el documento JSON de resultados.
+
+    Args:
+        scales (list): Factores de escala sintética (1 = dataset original).
+        model_names (list): Modelos de ``build_models`` a medir (por defecto todos).
+        max_fit_rows (int): No se ajustan modelos en escalas con más filas de entrenamiento.
+        repeat (int): Repeticiones por etapa (se reporta la mediana).
+        profile_memory (bool): Mide el pico de memoria con tracemalloc.
+    """
+    run = BenchmarkRun(repeat, profile_memory)
+    base = bench_load(run)
+    models = build_models()
+    if model_names:
+        models = {name: models[name] for name in model_names}
+    for scale in scales:
+        bench_scale(run, base, scale, models, max_fit_rows)
+
+    return {
+        "meta": {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "cpu_count": os.cpu_count(),
+            "platform": platform.platform(),
+        },
+        "results": run.results,
+    }
+
+
+def compare(baseline, current, threshold=0.10, min_seconds=0.001):
+    """
+    Compara dos runs etapa a etapa.
+
+    Una etapa es una regresión si su tiempo (o su pico de memoria) crece más
+    de ``threshold`` y la diferencia de tiempo supera ``min_seconds`` (ruido).
+
+    Returns:
+        DataFrame: Una fila por (stage, scale) con ratios y la columna ``regression``.
+    """
+    key = ["stage", "scale"]
+    old = pd.DataFrame(baseline["results"]).set_index(key)
+    new = pd.DataFrame(current["results"]).set_index(key)
+    table = old[["seconds"]].join(new[["seconds"]], lsuffix="_old", rsuffix="_new", how="inner")
+    table["time_ratio"] = table["seconds_new"] / table["seconds_old"]
+    slower = (table["time_ratio"] > 1 + threshold) & (table["seconds_new"] - table["seconds_old"] > min_seconds)
+
+    if "peak_mb" in old and "peak_mb" in new:
+        table = table.join(old[["peak_mb"]].join(new[["peak_mb"]], lsuffix="_old", rsuffix="_new"))
+        table["memory_ratio"] = table["peak_mb_new"] / table["peak_mb_old"]
+        heavier = (table["memory_ratio"] > 1 + threshold) & (table["peak_mb_new"] - table["peak_mb_old"] > 1)
+    else:
+        heavier = False
+    table["regression"] = slower | heavier
+    return table.reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and write JSON")
+    run_parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    run_parser.add_argument("--models", nargs="+", help="subset of evaluate_models model names")
+    run_parser.add_argument("--max-fit-rows", type=int, default=30000)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc passes")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = subparsers.add_parser("compare", help="flag regressions between two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        document = run_benchmarks(args.scales, args.models, args.max_fit_rows, args.repeat, not args.no_memory)
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    table = compare(baseline, current, args.threshold)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(table.to_string(index=False))
+    regressions = table[table["regression"]]
+    print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if len(regressions) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
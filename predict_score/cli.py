@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""Línea de comandos ``predict-score``.
+
+Cada subcomando importa sólo lo que usa: ``predict`` carga el bundle elegido
+(un ``.npz`` de ``numpy_inference`` ni siquiera necesita scikit-learn) y no
+toca TensorFlow, XGBoost ni los datos.
+
+Uso:
+    predict-score train --model rf
+    predict-score train --model rf --leagues E0 E1 --since 2015-08-01
+    predict-score train --model mlp-embedding --leagues E0 E1 SP1 D1 I1 --since 2000-08-01 --chunk-size 100000
+    predict-score evaluate --multioutput --tuned-params tuned_params.json
+    predict-score evaluate --oof-cache oof_predictions.npz
+    predict-score evaluate --rolling-features --ratings
+    predict-score predict --bundle modelo_rf.joblib "Man City" Liverpool
+    predict-score predict --bundle mlp_score_predictor.npz --fixtures jornada.csv
+    predict-score cluster --k 3 --compare Tottenham "Man City"
+    predict-score ingest jornada.csv --bundle modelo_rf.joblib
+"""
+
+import argparse
+import json
+import sys
+
+TRAINERS = ("rf", "gb", "multioutput", "mlp", "mlp-embedding")
+
+
+def query_matches(args):
+    """Partidos de ``--leagues``/``--since``/``--until``; None = temporadas por defecto de cada script."""
+    if not (args.leagues or args.since or args.until):
+        return None
+    from .match_data import scan_matches
+
+    return scan_matches(args.leagues, since=args.since, until=args.until, skip_missing=args.skip_missing)
+
+
+def train(args):
+    if args.chunk_size:
+        if args.model != "mlp-embedding":
+            sys.exit("train: --chunk-size is only supported with --model mlp-embedding")
+        from .mlp import main_embedding_chunked
+
+        main_embedding_chunked(args.leagues, args.since, args.until, chunk_size=args.chunk_size,
+                               epochs=args.epochs, skip_missing=args.skip_missing)
+        return
+
+    matches = query_matches(args)
+    if args.model in ("mlp", "mlp-embedding"):
+        from . import mlp
+
+        if args.model == "mlp":
+            mlp.main(sparse_float32=args.sparse_float32, matches=matches)
+        else:
+            mlp.main_embedding(epochs=args.epochs, matches=matches)
+        return
+
+    from . import forest
+
+    if args.model == "rf":
+        forest.main(args.home, args.away, matches)
+    elif args.model == "gb":
+        forest.main_gradient_boosting(args.home, args.away, matches)
+    else:
+        forest.main_multioutput(args.home, args.away, matches=matches)
+
+
+def evaluate(args):
+    from .comparison import main as compare_models
+    from .tuning import load_tuned_params
+
+    params = load_tuned_params(args.tuned_params) if args.tuned_params else None
+    compare_models(plots=args.plots, matches=query_matches(args), n_jobs=args.n_jobs,
+                   threads_per_worker=args.threads_per_worker, multioutput=args.multioutput,
+                   sparse_float32=args.sparse_float32, params=params,
+                   oof_stacking=args.oof_stacking or bool(args.oof_cache), oof_cache=args.oof_cache,
+                   rolling=args.rolling_features, ratings=args.ratings)
+
+
+def load_predictor(path):
+    """Bundle joblib (``model_bundle``) o exportación ``.npz`` (``numpy_inference``)."""
+    if path.endswith(".npz"):
+        from .numpy_inference import NumpyScorePredictor
+
+        return NumpyScorePredictor.load(path)
+    from .model_bundle import load_bundle
+
+    return load_bundle(path)
+
+
+def predict(args):
+    if args.fixtures:
+        import pandas as pd
+
+        fixtures = pd.read_csv(args.fixtures, usecols=["HomeTeam", "AwayTeam"])
+    elif len(args.teams) == 2:
+        fixtures = [tuple(args.teams)]
+    else:
+        sys.exit("predict: pass HOME AWAY or --fixtures CSV")
+
+    predictor = load_predictor(args.bundle)
+    if not args.frozen_form:
+        from .ingestion import refresh_form
+
+        version = refresh_form(predictor, args.league)
+        if version is not None:
+            print(f"Using team form from feature table version {version}", file=sys.stderr)
+    if predictor.stale:
+        print(f"Warning: {args.bundle} is stale ({predictor.stale['new_matches']} new matches since training)",
+              file=sys.stderr)
+    try:
+        predictions = predictor.predict_fixtures(fixtures)
+    except ValueError as error:
+        sys.exit(f"predict: {error}")
+    if args.json:
+        print(json.dumps(predictions.to_dict(orient="records"), default=float))
+    else:
+        print(predictions.round(2).to_string(index=False))
+
+
+def cluster(args):
+    import os
+
+    from .clustering import ClusterModel, k_sweep
+    from .match_data import load_matches
+    from .team_profiles import TeamProfileIndex
+
+    dataset = load_matches()
+    previous = ClusterModel.load(args.model_path) if os.path.exists(args.model_path) else None
+    model, labels = k_sweep(dataset, ks=range(1, args.max_k + 1), k=args.k, mode=args.mode, previous=previous)
+    model.save(args.model_path)
+    print(model.elbow_table().to_string())
+
+    profiles = TeamProfileIndex.from_matches(dataset, labels, n_clusters=args.k)
+    print(profiles.cluster_stats().round(2).to_string())
+    if args.compare:
+        home_team, away_team = args.compare
+        comparison = profiles.compare(home_team, away_team)
+        print(f"{home_team} (home): cluster {comparison['home_cluster']}, "
+              f"{away_team} (away): cluster {comparison['away_cluster']}")
+        print(f"More goals: {comparison['more_goals']}, "
+              f"more shots on target: {comparison['more_shots_on_target']}")
+
+
+def ingest(args):
+    from .ingestion import ingest_csv
+
+    ingest_csv(args.csv, args.league, args.bundle)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="predict-score", description="Football score prediction")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Consulta al almacén de partidos (match_data.scan_matches) común a train y evaluate
+    data = argparse.ArgumentParser(add_help=False)
+    data.add_argument("--leagues", nargs="+", metavar="LEAGUE", help="football-data divisions (default E0)")
+    data.add_argument("--since", help="first match date, e.g. 2015-08-01")
+    data.add_argument("--until", help="last match date")
+    data.add_argument("--skip-missing", action="store_true", help="skip league/seasons without data")
+
+    parser_train = commands.add_parser("train", parents=[data],
+                                       help="train a model and save its bundle in the current directory")
+    parser_train.add_argument("--model", choices=TRAINERS, default="rf")
+    parser_train.add_argument("--home", default="Man City", help="home team of the example prediction")
+    parser_train.add_argument("--away", default="Liverpool", help="away team of the example prediction")
+    parser_train.add_argument("--sparse-float32", action="store_true", help="MLP on the CSR float32 one-hot matrix")
+    parser_train.add_argument("--epochs", type=int, default=200, help="max epochs of the embedding MLP")
+    parser_train.add_argument("--chunk-size", type=int, help="stream the matches in chunks (mlp-embedding only)")
+    parser_train.set_defaults(handler=train)
+
+    parser_evaluate = commands.add_parser("evaluate", parents=[data],
+                                          help="compare every regressor of the model catalog")
+    parser_evaluate.add_argument("--multioutput", action="store_true", help="one model for both goals")
+    parser_evaluate.add_argument("--sparse-float32", action="store_true")
+    parser_evaluate.add_argument("--n-jobs", type=int)
+    parser_evaluate.add_argument("--threads-per-worker", type=int, default=1)
+    parser_evaluate.add_argument("--tuned-params", help="JSON written by predict_score.tuning")
+    parser_evaluate.add_argument("--oof-stacking", action="store_true",
+                                 help="stack cached out-of-fold predictions instead of refitting the base models")
+    parser_evaluate.add_argument("--oof-cache", help="out-of-fold predictions .npz (implies --oof-stacking)")
+    parser_evaluate.add_argument("--rolling-features", action="store_true",
+                                 help="pre-match rolling means/EWMs (3/5/10 matches) instead of HF/AF")
+    parser_evaluate.add_argument("--ratings", action="store_true",
+                                 help="add pre-match Elo and attack/defence ratings as features")
+    parser_evaluate.add_argument("--plots", action="store_true", help="show the matplotlib figures")
+    parser_evaluate.set_defaults(handler=evaluate)
+
+    parser_predict = commands.add_parser("predict", help="predict fixtures with a saved bundle")
+    parser_predict.add_argument("--bundle", required=True, help="joblib bundle or .npz export")
+    parser_predict.add_argument("teams", nargs="*", metavar="TEAM", help="HOME AWAY")
+    parser_predict.add_argument("--fixtures", help="CSV with HomeTeam and AwayTeam columns")
+    parser_predict.add_argument("--json", action="store_true", help="print JSON records")
+    parser_predict.add_argument("--league", default="E0", help="feature table with the current team form")
+    parser_predict.add_argument("--frozen-form", action="store_true",
+                                help="use the team form saved in the bundle, not the ingested one")
+    parser_predict.set_defaults(handler=predict)
+
+    parser_cluster = commands.add_parser("cluster", help="KMeans sweep and cluster profiles")
+    parser_cluster.add_argument("--k", type=int, default=3)
+    parser_cluster.add_argument("--max-k", type=int, default=9, help="elbow sweep over k = 1..max-k")
+    parser_cluster.add_argument("--mode", choices=["exact", "minibatch"], default="exact")
+    parser_cluster.add_argument("--model-path", default="modelo_kmeans.joblib", help="warm start and output")
+    parser_cluster.add_argument("--compare", nargs=2, metavar=("HOME", "AWAY"))
+    parser_cluster.set_defaults(handler=cluster)
+
+    parser_ingest = commands.add_parser("ingest", help="append new results and mark bundles as stale")
+    parser_ingest.add_argument("csv", nargs="+", help="football-data CSV files with the new matches")
+    parser_ingest.add_argument("--league", default="E0")
+    parser_ingest.add_argument("--bundle", action="append", default=[], help="bundle to mark as stale (repeatable)")
+    parser_ingest.set_defaults(handler=ingest)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""Clustering de partidos (KMeans) escalable para ``modelonosupervisado``.
+
+- ``k_sweep`` ajusta todos los k del método del codo en paralelo sobre la
+  misma matriz escalada y guarda cada solución; el k elegido se toma del
+  barrido en lugar de volver a ajustarlo.
+- ``mode='minibatch'`` usa ``MiniBatchKMeans`` y ``stream_fit`` ajusta por
+  bloques (p. ej. temporada a temporada) sin tener todo el histórico en memoria.
+- Si se pasa el modelo de una ejecución anterior, cada k arranca de sus
+  centroides (``n_init=1``) en lugar de k-means++, y converge en pocas
+  iteraciones cuando los datos sólo han crecido un poco.
+- La silueta se estima sobre una muestra en lugar de sobre todos los pares.
+- ``ClusterModel`` guarda escalador y centroides; ``assign`` etiqueta partidos
+  nuevos sin reajustar.
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from .evaluation_engine import default_workers
+from .instrumentation import stage
+
+#FTHG/FTAG = goles local/visitante, HS/AS = disparos, HST/AST = disparos a puerta,
+#HC/AC = córners, HY/AY = amarillas, HR/AR = rojas
+VARS = ['FTHG', 'FTAG', 'HS', 'AS', 'HST', 'AST', 'HC', 'AC', 'HY', 'AY', 'HR', 'AR']
+MODES = ("exact", "minibatch")
+
+
+def feature_matrix(dataset, variables=VARS):
+    """Columnas ``variables`` con nulos a cero, en float32."""
+    return dataset[variables].fillna(0).to_numpy(dtype=np.float32)
+
+
+def _estimator(k, mode, init, random_state, batch_size):
+    n_init = 1 if not isinstance(init, str) else "auto"
+    if mode == "minibatch":
+        return MiniBatchKMeans(n_clusters=k, init=init, n_init=n_init, batch_size=batch_size,
+                               random_state=random_state)
+    if mode != "exact":
+        raise ValueError(f"Unknown mode '{mode}', expected one of {MODES}")
+    return KMeans(n_clusters=k, init=init, n_init=n_init, random_state=random_state)
+
+
+def _fit_one(X, k, mode, init, random_state, batch_size, silhouette_sample, threads):
+    with threadpool_limits(limits=threads), stage(f"kmeans.fit[k={k}]", rows=len(X), mode=mode):
+        model = _estimator(k, mode, init, random_state, batch_size).fit(X)
+    silhouette = None
+    if k > 1 and silhouette_sample:
+        with stage(f"kmeans.silhouette[k={k}]", rows=min(len(X), silhouette_sample)):
+            silhouette = float(silhouette_score(X, model.labels_, sample_size=min(len(X), silhouette_sample),
+                                                random_state=random_state))
+    return k, model.cluster_centers_.astype(np.float32), model.labels_, float(model.inertia_), silhouette
+
+
+class ClusterModel:
+    """
+    Escalador + centroides de cada k del barrido.
+
+    Attributes:
+        variables (list): Columnas usadas (``VARS``).
+        scaler (StandardScaler): Escalador ajustado.
+        centroids (dict): k -> centroides (k, n_variables) en el espacio escalado.
+        inertia (dict): k -> inercia (suma de distancias al cuadrado).
+        silhouette (dict): k -> silueta estimada sobre una muestra (None para k=1).
+        k (int): k elegido para ``assign``.
+        mode (str): 'exact' o 'minibatch'.
+    """
+
+    def __init__(self, variables, scaler, centroids, inertia, silhouette, k, mode):
+        self.variables = list(variables)
+        self.scaler = scaler
+        self.centroids = centroids
+        self.inertia = inertia
+        self.silhouette = silhouette
+        self.k = k
+        self.mode = mode
+
+    def elbow_table(self):
+        return pd.DataFrame({"Inertia": self.inertia, "Silhouette": self.silhouette}).sort_index()
+
+    def assign(self, dataset, k=None, chunk_size=100_000):
+        """
+        Cluster más cercano de cada partido, sin reajustar.
+
+        Args:
+            dataset (DataFrame): Partidos con las columnas ``variables``.
+            k (int): Solución del barrido a usar (por defecto ``self.k``).
+            chunk_size (int): Filas por bloque al calcular distancias.
+
+        Returns:
+            ndarray: Etiqueta de cluster por fila.
+        """
+        centers = self.centroids[k or self.k]
+        X = self.scaler.transform(feature_matrix(dataset, self.variables)).astype(np.float32)
+        labels = np.empty(len(X), dtype=np.int64)
+        center_norms = (centers ** 2).sum(axis=1)
+        for start in range(0, len(X), chunk_size):
+            block = X[start:start + chunk_size]
+            # ||x - c||² sin el término ||x||², que no cambia el argmin
+            labels[start:start + chunk_size] = np.argmin(center_norms - 2 * block @ centers.T, axis=1)
+        return labels
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def k_sweep(dataset, ks=range(1, 10), k=3, mode="exact", previous=None, n_jobs=None, threads_per_job=1,
+            silhouette_sample=10_000, batch_size=4096, random_state=42, variables=VARS):
+    """
+    Ajusta KMeans para cada k en paralelo sobre la misma matriz escalada.
+
+    Args:
+        dataset (DataFrame): Partidos con las columnas ``variables``.
+        ks (iterable): Valores de k del método del codo.
+        k (int): k elegido (debe estar en ``ks``); sus etiquetas se devuelven.
+        mode (str): 'exact' (KMeans) o 'minibatch' (MiniBatchKMeans).
+        previous (ClusterModel): Solución anterior; sus centroides inicializan cada k.
+        n_jobs (int): Ajustes en paralelo. Por defecto, núcleos / ``threads_per_job``.
+        threads_per_job (int): Hilos de cada ajuste.
+        silhouette_sample (int): Filas de la muestra para la silueta (0 = no calcularla).
+        batch_size (int): Tamaño de lote de MiniBatchKMeans.
+
+    Returns:
+        model (ClusterModel): Escalador, centroides, inercia y silueta por k.
+        labels (ndarray): Etiquetas de ``dataset`` para el k elegido.
+    """
+    ks = list(ks)
+    if k not in ks:
+        raise ValueError(f"k={k} is not in the sweep {ks}")
+    scaler = StandardScaler().fit(feature_matrix(dataset, variables))
+    X = scaler.transform(feature_matrix(dataset, variables)).astype(np.float32)
+
+    def initial_centers(n_clusters):
+        if previous is None or previous.variables != list(variables) or n_clusters not in previous.centroids:
+            return "k-means++"
+        # Centroides anteriores, llevados a la escala actual
+        centers = previous.scaler.inverse_transform(previous.centroids[n_clusters])
+        return scaler.transform(centers).astype(np.float32)
+
+    n_jobs = n_jobs or default_workers(threads_per_job)
+    outputs = Parallel(n_jobs=min(n_jobs, len(ks)), backend="loky")(
+        delayed(_fit_one)(X, n_clusters, mode, initial_centers(n_clusters), random_state, batch_size,
+                          silhouette_sample, threads_per_job)
+        for n_clusters in ks)
+
+    labels = {}
+    centroids, inertia, silhouette = {}, {}, {}
+    for n_clusters, centers, fitted_labels, fitted_inertia, fitted_silhouette in outputs:
+        centroids[n_clusters] = centers
+        inertia[n_clusters] = fitted_inertia
+        silhouette[n_clusters] = fitted_silhouette
+        labels[n_clusters] = fitted_labels
+    model = ClusterModel(variables, scaler, centroids, inertia, silhouette, k, mode)
+    return model, labels[k]
+
+
+def stream_fit(chunks, k=3, batch_size=4096, random_state=42, variables=VARS, previous=None):
+    """
+    MiniBatchKMeans por bloques, para históricos que no caben en memoria.
+
+    Hace dos pasadas: una para el escalador (``partial_fit``) y otra para los
+    centroides, así que ``chunks`` debe ser una función que devuelva un
+    iterador nuevo de DataFrames en cada llamada (p. ej. una temporada por bloque).
+
+    Returns:
+        ClusterModel: Modelo con la solución de ``k`` (sin barrido ni silueta).
+    """
+    scaler = StandardScaler()
+    for chunk in chunks():
+        scaler.partial_fit(feature_matrix(chunk, variables))
+
+    init = "k-means++"
+    if previous is not None and k in previous.centroids and previous.variables == list(variables):
+        init = scaler.transform(previous.scaler.inverse_transform(previous.centroids[k])).astype(np.float32)
+    model = _estimator(k, "minibatch", init, random_state, batch_size)
+    inertia = 0.0
+    rows = 0
+    with stage(f"kmeans.stream_fit[k={k}]") as current:
+        for chunk in chunks():
+            X = scaler.transform(feature_matrix(chunk, variables)).astype(np.float32)
+            if len(X) < k:
+                continue
+            model.partial_fit(X)
+            rows += len(X)
+        current.rows = rows
+    # Inercia final con los centroides definitivos (tercera pasada, sólo predicción)
+    for chunk in chunks():
+        X = scaler.transform(feature_matrix(chunk, variables)).astype(np.float32)
+        inertia += -model.score(X)
+    return ClusterModel(variables, scaler, {k: model.cluster_centers_.astype(np.float32)},
+                        {k: inertia}, {k: None}, k, "minibatch")
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""Comparación de regresores supervisados (MSE/MAE de goles local y visitante).
+
+Lógica del cuaderno PROYECTO FINAL ANALISIS DE MODELOS (el script exportado
+está en ``py/proyecto_final_analisis_de_modelos.py``). matplotlib y seaborn
+sólo se importan al dibujar.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from .match_data import load_matches
+from .team_form import build_form_features
+from .rolling_features import build_rolling_features, feature_columns
+from .ratings import RATING_FEATURES, rating_features
+from .evaluation_engine import run_model_evaluation
+from .model_catalog import STACKING_BASE_MODELS, build_models
+from .multi_output import make_multioutput
+from .stacking import compute_out_of_fold
+from .preprocessing import create_preprocessor as build_preprocessor
+from .instrumentation import instrumented
+from .model_cache import default_cache
+
+# Function to preprocess the data
+# matches=None loads the default seasons; other leagues/seasons come from match_data.scan_matches
+# rolling=True uses the pre-match rolling features (rolling_features.py) instead of HF/AW,
+# which include the match being predicted
+# ratings=True adds the pre-match Elo and attack/defence ratings (ratings.py)
+@instrumented()
+def preprocess_data(matches=None, rolling=False, ratings=False):
+    # Load the dataset from the local season cache
+    if matches is None:
+        matches = load_matches()
+
+    if rolling:
+        X = matches[["HomeTeam", "AwayTeam"]].join(build_rolling_features(matches))
+    else:
+        matches["goal_difference"] = matches["FTHG"] - matches["FTAG"]
+        matches["HF"], matches["AW"], _ = build_form_features(matches, window=5)
+
+        features = ["FTHG", "FTAG", "HS", "AS", "HST", "AST", "HC", "AC", "HY", "AY", "HR", "AR", "HF", "AW", "HomeTeam", "AwayTeam"]
+        X = matches[features]
+    if ratings:
+        X = X.join(rating_features(matches))
+    X = X.fillna(0)
+    y_home = matches["FTHG"]
+    y_away = matches["FTAG"]
+
+    return train_test_split(X, y_home, test_size=0.2, random_state=42), train_test_split(X, y_away, test_size=0.2, random_state=42)
+
+# Function to create the preprocessing step shared by every model
+# sparse_float32=True outputs CSR float32: LinearRegression (lsqr), KNN (brute force),
+# trees, XGB and CatBoost all consume it without densifying or upcasting to float64
+# numeric_features defaults to HF/AW (e.g. rolling_features.feature_columns() with rolling=True)
+@instrumented()
+def create_preprocessor(sparse_float32=False, numeric_features=None):
+    numeric_features = numeric_features or ["HF", "AW"]
+    categorical_features = ["HomeTeam", "AwayTeam"]
+
+    return build_preprocessor(numeric_features, categorical_features, sparse_float32=sparse_float32)
+
+# Function to evaluate models
+# The preprocessor is fitted once and the (model, target) jobs run on a process pool;
+# n_jobs defaults to cores / threads_per_worker.
+# multioutput=True fits one model per entry for both goals instead of one per target
+# params overrides hyperparameters per model name (e.g. tuning.load_tuned_params())
+# oof_stacking=True scores the Stacking Regressor from the out-of-fold predictions of its
+# base models (computed once per target, see stacking.py) instead of refitting them inside
+# the stack; oof_cache keeps those predictions in a .npz between runs
+# numeric_features is passed to create_preprocessor
+@instrumented()
+def evaluate_models(X_train, X_test, y_home_train, y_home_test, y_away_train, y_away_test,
+                    n_jobs=None, threads_per_worker=1, multioutput=False, sparse_float32=False, params=None,
+                    oof_stacking=False, oof_cache=None, numeric_features=None):
+    models = build_models(params)
+    # Meta-modelo del stack antes de envolverlo en MultiOutputRegressor
+    meta_learner = models["Stacking Regressor"].final_estimator
+
+    if multioutput:
+        models = {name: make_multioutput(model) for name, model in models.items()}
+        targets = {("Home", "Away"): (np.column_stack([y_home_train, y_away_train]),
+                                      np.column_stack([y_home_test, y_away_test]))}
+    else:
+        targets = {"Home": (y_home_train, y_home_test), "Away": (y_away_train, y_away_test)}
+
+    if oof_stacking:
+        base_models = {name: models[name] for name in STACKING_BASE_MODELS.values()}
+        others = {name: model for name, model in models.items()
+                  if name not in base_models and name != "Stacking Regressor"}
+        oof = compute_out_of_fold(base_models, create_preprocessor(sparse_float32, numeric_features), X_train, X_test, targets,
+                                  n_jobs=n_jobs, threads_per_worker=threads_per_worker, cache=oof_cache)
+        scores = pd.concat([
+            run_model_evaluation(others, create_preprocessor(sparse_float32, numeric_features), X_train, X_test, targets,
+                                 n_jobs=n_jobs, threads_per_worker=threads_per_worker),
+            oof.scores(list(base_models)),
+            # Un meta-modelo por columna objetivo, también en modo multi-salida
+            oof.evaluate(meta_learner, list(base_models), name="Stacking Regressor"),
+        ]).set_index(["Model", "Target"])
+    else:
+        scores = run_model_evaluation(
+            models, create_preprocessor(sparse_float32, numeric_features), X_train, X_test, targets,
+            n_jobs=n_jobs, threads_per_worker=threads_per_worker,
+        ).set_index(["Model", "Target"])
+
+    results = []
+
+    for model_name in models:
+        home_mse, home_mae = scores.loc[(model_name, "Home"), ["MSE", "MAE"]]
+        away_mse, away_mae = scores.loc[(model_name, "Away"), ["MSE", "MAE"]]
+
+        # Average metrics
+        avg_mse = (home_mse + away_mse) / 2
+        avg_mae = (home_mae + away_mae) / 2
+
+        results.append({
+            "Model": model_name,
+            "Home MSE": home_mse,
+            "Away MSE": away_mse,
+            "Average MSE": avg_mse,
+            "Home MAE": home_mae,
+            "Away MAE": away_mae,
+            "Average MAE": avg_mae
+        })
+
+    return pd.DataFrame(results)
+
+# Function to plot results
+def plot_results(results, metric):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    models = results["Model"]
+    values = results[f"Average {metric}"]
+    plt.bar(models, values)
+    plt.title(f"Average {metric} per Model")
+    plt.ylabel(metric)
+    plt.xlabel("Model")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    plt.show()
+
+# Function to sort the results and pick the best model
+def select_best_model(results):
+    results_df = pd.DataFrame(results).sort_values(by="Average MSE")
+    return results_df.iloc[0]['Model'], results_df
+
+# Function to plot MSE and MAE side by side
+def plot_mse_mae_side_by_side(results):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    x = results["Model"]
+    mse = results["Average MSE"]
+    mae = results["Average MAE"]
+    bar_width = 0.35
+    index = np.arange(len(x))
+
+    plt.bar(index, mse, bar_width, label="Average MSE")
+    plt.bar(index + bar_width, mae, bar_width, label="Average MAE")
+
+    plt.title("Average MSE and MAE per Model")
+    plt.xlabel("Model")
+    plt.ylabel("Metric Value")
+    plt.xticks(index + bar_width / 2, x, rotation=45, ha="right")
+    plt.legend()
+    plt.tight_layout()
+    plt.show()
+
+# Function to plot home vs. away metrics
+def plot_home_away_metrics(results, metric):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    x = results["Model"]
+    home = results[f"Home {metric}"]
+    away = results[f"Away {metric}"]
+
+    plt.plot(x, home, marker="o", label=f"Home {metric}")
+    plt.plot(x, away, marker="o", label=f"Away {metric}")
+
+    plt.title(f"Home vs. Away {metric} per Model")
+    plt.xlabel("Model")
+    plt.ylabel(metric)
+    plt.xticks(rotation=45, ha="right")
+    plt.legend()
+    plt.tight_layout()
+    plt.show()
+
+# Function to plot heatmap of metrics
+def plot_metrics_heatmap(results):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    metrics = results.set_index("Model")[[
+        "Home MSE", "Away MSE", "Average MSE",
+        "Home MAE", "Away MAE", "Average MAE"
+    ]]
+    plt.figure(figsize=(12, 8))
+    sns.heatmap(metrics, annot=True, fmt=".2f", cmap="viridis", cbar=True)
+    plt.title("Heatmap of Evaluation Metrics per Model")
+    plt.tight_layout()
+    plt.show()
+
+# Main function
+# plots=False only prints the table (e.g. from the command line without a display)
+# rolling=True evaluates on the pre-match rolling features, ratings=True adds the team ratings
+def main(plots=True, matches=None, rolling=False, ratings=False, **evaluate_kwargs):
+    start = time.time()
+    # Preprocess data
+    (X_train, X_test, y_home_train, y_home_test), (_, _, y_away_train, y_away_test) = preprocess_data(
+        matches, rolling, ratings)
+    if rolling or ratings:
+        numeric_features = (feature_columns() if rolling else ["HF", "AW"]) + (RATING_FEATURES if ratings else [])
+        evaluate_kwargs.setdefault("numeric_features", numeric_features)
+
+    # Evaluate models
+    results = evaluate_models(X_train, X_test, y_home_train, y_home_test, y_away_train, y_away_test,
+                              **evaluate_kwargs)
+
+    # Select the best model
+    best_model_name, results_df = select_best_model(results)
+    print(f"The best model based on average MSE is: {best_model_name}")
+    print(f"Metrics: {results_df}")
+    cache = default_cache()
+    if cache is not None:
+        stats = cache.stats(since=start)
+        print(f"Model cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+    if not plots:
+        return results_df
+
+    # Plot results
+    plot_results(results, "MSE")
+    plot_results(results, "MAE")
+    plot_mse_mae_side_by_side(results)
+    plot_home_away_metrics(results, "MSE")
+    plot_home_away_metrics(results, "MAE")
+    plot_metrics_heatmap(results)
+    return results_df
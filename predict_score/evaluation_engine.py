@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Evaluación en paralelo de varios regresores sobre el mismo split.
+
+El preprocesador se ajusta una sola vez por split; las matrices resultantes se
+vuelcan a disco y cada proceso del pool las abre con ``mmap_mode='c'``, de
+modo que todos comparten la misma copia en la caché de páginas. Cada trabajo
+(modelo, objetivo) corre en un proceso con un presupuesto de hilos fijo para
+que XGBoost, CatBoost o Random Forest no saturen los núcleos.
+
+``run_out_of_fold`` usa el mismo pool para las predicciones fuera de pliegue
+de los modelos base del stacking (ver ``stacking``).
+"""
+
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+from sklearn.model_selection import KFold
+from threadpoolctl import threadpool_limits
+
+from .instrumentation import configure, settings, stage
+from .model_cache import fit_cached
+
+# Parámetros con los que cada librería controla sus hilos
+THREAD_PARAMS = ("n_jobs", "thread_count", "nthread")
+
+
+def limit_threads(estimator, threads):
+    """
+    Fija el número de hilos de ``estimator`` (y de sus sub-estimadores).
+
+    Returns:
+        estimator: El mismo estimador, modificado.
+    """
+    params = estimator.get_params(deep=True)
+    limits = {key: threads for key in params if key.split("__")[-1] in THREAD_PARAMS}
+    if type(estimator).__name__.startswith("CatBoost") and "thread_count" not in limits:
+        limits["thread_count"] = threads
+    if limits:
+        estimator.set_params(**limits)
+    return estimator
+
+
+def default_workers(threads_per_worker=1):
+    return max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+
+def _fit_predict(model_name, target, model, X_train_path, X_test_path, y_train, threads, trace_settings,
+                 fold=None):
+    # Los workers de loky se reutilizan entre llamadas: la traza se fija en cada trabajo
+    configure(**trace_settings)
+    # Copia en escritura: las páginas siguen compartidas, pero las librerías que
+    # exigen buffers escribibles (CatBoost) aceptan los arrays
+    X_train = joblib.load(X_train_path, mmap_mode="c")
+    X_test = joblib.load(X_test_path, mmap_mode="c")
+    label = f"{model_name}/{target}"
+    if fold is not None:
+        # Pliegue (número, filas de ajuste, filas a predecir) de X_train
+        number, fit_rows, predict_rows = fold
+        X_train, X_test, y_train = X_train[fit_rows], X_train[predict_rows], y_train[fit_rows]
+        label = f"{label}/fold{number}"
+    with threadpool_limits(limits=threads):
+        start = time.perf_counter()
+        model = limit_threads(model, threads)
+        with stage(f"fit[{label}]", rows=X_train.shape[0], threads=threads):
+            # Con la caché de modelos activada, mismos datos e hiperparámetros: se carga de la caché
+            model = fit_cached(model, X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+        with stage(f"predict[{label}]", rows=X_test.shape[0]):
+            y_pred = model.predict(X_test)
+    return model_name, target, np.asarray(y_pred, dtype=float), fit_seconds
+
+
+def run_model_evaluation(models, preprocessor, X_train, X_test, targets, n_jobs=None, threads_per_worker=1):
+    """
+    Entrena y evalúa cada (modelo, objetivo) en un pool de procesos.
+
+    Args:
+        models (dict): Nombre -> estimador sin ajustar.
+        preprocessor (ColumnTransformer): Se ajusta una vez sobre ``X_train``.
+        X_train, X_test (DataFrame): Características del split.
+        targets (dict): Nombre del objetivo -> (y_train, y_test), p. ej. 'Home' y 'Away'.
+            Para modelos multi-salida la clave es una tupla de nombres, p. ej.
+            ('Home', 'Away'), con ``y`` de dos columnas; se ajusta una vez y se
+            devuelve una fila por salida.
+        n_jobs (int): Procesos del pool. Por defecto, núcleos / ``threads_per_worker``.
+        threads_per_worker (int): Hilos permitidos a cada modelo.
+
+    Returns:
+        DataFrame: Una fila por (modelo, objetivo) con MSE, MAE y segundos de ajuste,
+        en el mismo orden que ``models``.
+    """
+    n_jobs = n_jobs or default_workers(threads_per_worker)
+    X_train_matrix = preprocessor.fit_transform(X_train)
+    X_test_matrix = preprocessor.transform(X_test)
+
+    with tempfile.TemporaryDirectory(prefix="predict_score_eval_") as tmp:
+        X_train_path = os.path.join(tmp, "X_train.joblib")
+        X_test_path = os.path.join(tmp, "X_test.joblib")
+        joblib.dump(X_train_matrix, X_train_path)
+        joblib.dump(X_test_matrix, X_test_path)
+
+        jobs = [
+            delayed(_fit_predict)(name, target, clone(model), X_train_path, X_test_path,
+                                  np.asarray(y_train), threads_per_worker, settings())
+            for name, model in models.items()
+            for target, (y_train, _) in targets.items()
+        ]
+        outputs = Parallel(n_jobs=n_jobs, backend="loky")(jobs)
+
+    rows = []
+    for model_name, target, y_pred, fit_seconds in outputs:
+        names = target if isinstance(target, tuple) else (target,)
+        y_test = np.asarray(targets[target][1], dtype=float).reshape(len(y_pred), len(names))
+        y_pred = y_pred.reshape(len(y_pred), len(names))
+        for i, name in enumerate(names):
+            rows.append({
+                "Model": model_name,
+                "Target": name,
+                "MSE": mean_squared_error(y_test[:, i], y_pred[:, i]),
+                "MAE": mean_absolute_error(y_test[:, i], y_pred[:, i]),
+                "Fit seconds": fit_seconds,
+            })
+    return pd.DataFrame(rows)
+
+
+def run_out_of_fold(models, preprocessor, X_train, X_test, targets, cv=5, n_jobs=None, threads_per_worker=1):
+    """
+    Predicciones fuera de pliegue de cada (modelo, objetivo) en el pool de procesos.
+
+    Reproduce lo que ``StackingRegressor`` hace con cada estimador base: con
+    ``KFold(cv)`` (sin barajar, como ``cross_val_predict``) predice cada fila
+    de ``X_train`` con un modelo que no la ha visto y, además, ajusta el
+    modelo con todo ``X_train`` para predecir ``X_test``. Todos los ajustes
+    (``cv + 1`` por modelo y objetivo) van al mismo pool.
+
+    Args:
+        models (dict): Nombre -> estimador sin ajustar.
+        preprocessor (ColumnTransformer): Se ajusta una vez sobre ``X_train``.
+        targets (dict): Como en ``run_model_evaluation``.
+        cv (int): Número de pliegues.
+
+    Returns:
+        dict: (modelo, objetivo) -> (predicciones fuera de pliegue de ``X_train``,
+        predicciones de ``X_test``, segundos de ajuste de los ``cv + 1`` modelos).
+    """
+    n_jobs = n_jobs or default_workers(threads_per_worker)
+    X_train_matrix = preprocessor.fit_transform(X_train)
+    X_test_matrix = preprocessor.transform(X_test)
+    folds = [(number, fit_rows, predict_rows)
+             for number, (fit_rows, predict_rows) in enumerate(KFold(cv).split(X_train_matrix))]
+
+    with tempfile.TemporaryDirectory(prefix="predict_score_oof_") as tmp:
+        X_train_path = os.path.join(tmp, "X_train.joblib")
+        X_test_path = os.path.join(tmp, "X_test.joblib")
+        joblib.dump(X_train_matrix, X_train_path)
+        joblib.dump(X_test_matrix, X_test_path)
+
+        keys = [(name, target) for name in models for target in targets]
+        jobs = [
+            delayed(_fit_predict)(name, target, clone(models[name]), X_train_path, X_test_path,
+                                  np.asarray(targets[target][0]), threads_per_worker, settings(), fold)
+            for name, target in keys
+            for fold in folds + [None]
+        ]
+        outputs = Parallel(n_jobs=n_jobs, backend="loky")(jobs)
+
+    predictions = {}
+    for i, key in enumerate(keys):
+        key_outputs = outputs[i * (cv + 1):(i + 1) * (cv + 1)]
+        y_oof = None
+        for (number, _, predict_rows), (_, _, y_pred, _) in zip(folds, key_outputs):
+            if y_oof is None:
+                y_oof = np.empty((X_train_matrix.shape[0],) + y_pred.shape[1:])
+            y_oof[predict_rows] = y_pred
+        predictions[key] = (y_oof, key_outputs[-1][2], sum(output[3] for output in key_outputs))
+    return predictions
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Predicción vectorizada de muchos partidos a la vez.
+
+En lugar de construir un DataFrame de una fila y llamar a ``predict`` por
+partido, se construye la matriz de características de toda la jornada (o de
+la temporada completa) en una pasada y se hace un único ``transform`` y un
+único ``predict`` por modelo.
+"""
+
+import numpy as np
+import pandas as pd
+
+OUTCOMES = np.array(["H", "D", "A"])  # Mismo convenio que la columna FTR
+
+
+def fixtures_frame(fixtures):
+    """
+    Normaliza los partidos a un DataFrame con columnas HomeTeam y AwayTeam.
+
+    Args:
+        fixtures: DataFrame con HomeTeam/AwayTeam o iterable de pares (local, visitante).
+    """
+    if isinstance(fixtures, pd.DataFrame):
+        return fixtures[["HomeTeam", "AwayTeam"]].reset_index(drop=True)
+    return pd.DataFrame(list(fixtures), columns=["HomeTeam", "AwayTeam"])
+
+
+def build_fixture_features(fixtures, form_store):
+    """
+    Construye HomeTeam, AwayTeam, HF y AF para todos los partidos en una pasada.
+
+    Raises:
+        ValueError: Si algún equipo no aparece en el histórico de ``form_store``.
+    """
+    frame = fixtures_frame(fixtures)
+    teams = pd.unique(frame[["HomeTeam", "AwayTeam"]].to_numpy().ravel())
+    unknown = [team for team in teams if team not in form_store]
+    if unknown:
+        raise ValueError(f"Teams not in the dataset: {unknown}")
+
+    frame["HF"] = [form_store.home_form(team) for team in frame["HomeTeam"]]
+    frame["AF"] = [form_store.away_form(team) for team in frame["AwayTeam"]]
+    return frame
+
+
+def predict_goals(X, home_model, away_model=None):
+    """
+    Devuelve una matriz (n, 2) con los goles local y visitante predichos.
+
+    Si ``away_model`` es None, ``home_model`` debe predecir ambos goles a la vez
+    (p. ej. el MLP de ``mlp.build_mlp``).
+    """
+    if away_model is None:
+        predictions = home_model.predict(X)
+        return np.asarray(predictions, dtype=float).reshape(-1, 2)
+    return np.column_stack([
+        np.asarray(home_model.predict(X), dtype=float).ravel(),
+        np.asarray(away_model.predict(X), dtype=float).ravel(),
+    ])
+
+
+def outcomes(home_goals, away_goals):
+    """Resultado 'H', 'D' o 'A' a partir de los goles (ya redondeados)."""
+    return OUTCOMES[1 - np.sign(np.asarray(home_goals) - np.asarray(away_goals)).astype(int)]
+
+
+def predict_fixtures(fixtures, preprocessor, home_model, away_model=None, form_store=None, features=None):
+    """
+    Predice el marcador de muchos partidos con un solo transform y un solo
+    predict por modelo.
+
+    Args:
+        fixtures: DataFrame con HomeTeam/AwayTeam o iterable de pares (local, visitante).
+        preprocessor (ColumnTransformer): Preprocesador ya ajustado.
+        home_model: Modelo de goles locales, o modelo de dos salidas si ``away_model`` es None.
+        away_model: Modelo de goles visitantes.
+        form_store (TeamFormStore): Forma actual de los equipos. Obligatorio salvo
+            que se pase ``features``.
+        features (DataFrame): Características ya construidas (HomeTeam, AwayTeam, HF, AF).
+
+    Returns:
+        DataFrame: HomeTeam, AwayTeam, home_goals y away_goals (predicción continua),
+        home_score y away_score (redondeados) y outcome ('H', 'D' o 'A').
+    """
+    if features is None:
+        features = build_fixture_features(fixtures, form_store)
+    goals = predict_goals(preprocessor.transform(features), home_model, away_model)
+    scores = np.rint(goals).astype(int)
+
+    return pd.DataFrame({
+        "HomeTeam": features["HomeTeam"].to_numpy(),
+        "AwayTeam": features["AwayTeam"].to_numpy(),
+        "home_goals": goals[:, 0],
+        "away_goals": goals[:, 1],
+        "home_score": scores[:, 0],
+        "away_score": scores[:, 1],
+        "outcome": outcomes(scores[:, 0], scores[:, 1]),
+    })
+
+
+def season_grid(teams):
+    """Todos los cruces local/visitante entre ``teams`` (380 partidos para 20 equipos)."""
+    teams = list(teams)
+    return [(home, away) for home in teams for away in teams if home != away]
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""Random Forest y Gradient Boosting (XGBoost) para los goles local y visitante.
+
+Lógica del cuaderno ADSP - EVALUAR MODELOS RF y GB (el script exportado está
+en ``py/adsp_evaluar_modelos_rf_y_gb_predecir_resultado_.py``). XGBoost sólo
+se importa al entrenar el Gradient Boosting.
+"""
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error
+from .match_data import load_matches
+from .team_form import TeamFormStore, build_form_features
+from .fixture_prediction import predict_fixtures
+from .multi_output import GOAL_TARGETS, make_multioutput
+from .preprocessing import create_preprocessor as build_preprocessor
+from .model_bundle import save_bundle
+from .instrumentation import instrumented
+from .model_cache import fit_cached
+
+# Load and preprocess the dataset
+# matches=None loads every season from the local cache; other leagues/seasons come from match_data.scan_matches
+@instrumented()
+def load_and_preprocess_data(matches=None):
+    if matches is None:
+        matches = load_matches()
+
+    # Create features
+    matches['goal_difference'] = matches['FTHG'] - matches['FTAG']
+    # Rolling 5-match form; the store keeps the latest form for O(1) lookups at prediction time
+    matches['HF'], matches['AF'], form_store = build_form_features(matches, window=5)
+
+    features = ['FTHG', 'FTAG', 'HS', 'AS', 'HST', 'AST', 'HC', 'AC', 'HY', 'AY', 'HR', 'AR', 'HF', 'AF', 'HomeTeam', 'AwayTeam']
+    matches.fillna(0, inplace=True)
+    return matches, features, form_store
+
+# Training metadata stored with each model bundle
+def training_metadata(matches, model_name, y_home_test, y_home_pred, y_away_test, y_away_pred):
+    return {
+        'model': model_name,
+        'training_rows': len(matches),
+        'first_date': str(matches['Date'].min().date()),
+        'last_date': str(matches['Date'].max().date()),
+        'home_mse': float(mean_squared_error(y_home_test, y_home_pred)),
+        'away_mse': float(mean_squared_error(y_away_test, y_away_pred)),
+    }
+
+"""## train_test_split"""
+
+# Prepare train/test split
+@instrumented()
+def prepare_data(matches, features, target):
+    X = matches[features]
+    y = matches[target]
+
+    X_train, X_test, y_train, y_test = train_test_split(X,y,random_state = 123, test_size = 0.2)
+
+    return X_train, X_test, y_train, y_test
+
+# Create preprocessing pipeline
+# sparse_float32=True keeps the one-hot matrix as CSR float32 (RF and XGB consume it without upcasting)
+@instrumented()
+def create_preprocessor(sparse_float32=False):
+    numeric_features = ['HF', 'AF']
+    categorical_features = ['HomeTeam', 'AwayTeam']
+
+    return build_preprocessor(numeric_features, categorical_features, sparse_float32=sparse_float32)
+
+# Train a Random Forest model
+# With y_train = matches[GOAL_TARGETS] a single forest predicts both goals (native multi-output)
+# params overrides the defaults, e.g. tuning.load_tuned_params().get("Random Forest")
+# With the model cache enabled (model_cache.py), unchanged data and parameters load the fitted forest
+@instrumented()
+def train_random_forest(X_train, y_train, params=None):
+    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    model.set_params(**(params or {}))
+    return fit_cached(model, X_train, y_train)
+
+"""# Train a Random Forest model
+def train_random_forest(X_train, y_train):
+    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    model.fit(X_train, y_train)
+    return model
+"""
+
+# Predict match outcome
+def predict_match(home_team, away_team, historical_matches, preprocessor, home_model, away_model, form_store=None):
+    # away_model=None means home_model is multi-output and predicts both goals in one call
+    # Team form comes from the ring-buffer store; build it only if the caller didn't pass one
+    if form_store is None:
+        form_store = TeamFormStore.from_matches(historical_matches)
+
+    # Validate if teams exist in the dataset
+    if home_team not in form_store:
+        print(f"Error: '{home_team}' does not exist in the dataset.")
+        return None
+
+    if away_team not in form_store:
+        print(f"Error: '{away_team}' does not exist in the dataset.")
+        return None
+
+    # Predict scores (same batch path as predict_fixtures, with a single fixture)
+    prediction = predict_fixtures([(home_team, away_team)], preprocessor, home_model, away_model, form_store).iloc[0]
+    home_goals = prediction['home_score']
+    away_goals = prediction['away_score']
+
+    print(f'Predicted goals: {home_team} {home_goals} - {away_goals} {away_team}')
+
+    if home_goals > away_goals:
+        return f'{home_team} wins'
+    elif home_goals < away_goals:
+        return f'{away_team} wins'
+    else:
+        return 'Draw'
+
+# Main function
+def main(home_team, away_team, matches=None):
+    # Load and preprocess data
+    matches, features, form_store = load_and_preprocess_data(matches)
+
+    # Split data for home and away goal prediction
+    X_train, X_test, y_home_train, y_home_test = prepare_data(matches, features, 'FTHG')
+    _, _, y_away_train, y_away_test = prepare_data(matches, features, 'FTAG')
+
+    # Preprocessing pipeline
+    preprocessor = create_preprocessor()
+    X_train = preprocessor.fit_transform(X_train)
+    X_test = preprocessor.transform(X_test)
+
+    # Train models
+    home_goal_model = train_random_forest(X_train, y_home_train)
+    away_goal_model = train_random_forest(X_train, y_away_train)
+
+    # Evaluate models
+    y_home_pred = home_goal_model.predict(X_test)
+    y_away_pred = away_goal_model.predict(X_test)
+
+    print(f'Home Goal Prediction RMSE: {np.sqrt(mean_squared_error(y_home_test, y_home_pred))}')
+    print(f'Away Goal Prediction RMSE: {np.sqrt(mean_squared_error(y_away_test, y_away_pred))}')
+    print(f'Home Goal Prediction MSE: {mean_squared_error(y_home_test, y_home_pred)}')
+    print(f'Away Goal Prediction MSE: {mean_squared_error(y_away_test, y_away_pred)}')
+
+
+    # Calcular métricas
+    metrics = {
+      "Model": ["Random Forest"],
+      "MSE": [mean_squared_error(y_home_test, y_home_pred), [mean_squared_error(y_away_test, y_away_pred)]],
+    }
+
+    # Save preprocessor, both models and form state in one bundle (load with model_bundle.load_bundle)
+    save_bundle('modelo_rf.joblib', preprocessor, home_goal_model, away_goal_model, form_store,
+                metadata=training_metadata(matches, 'Random Forest', y_home_test, y_home_pred, y_away_test, y_away_pred))
+
+    # Example prediction
+    historical_matches = matches.copy()
+    result = predict_match(home_team, away_team, historical_matches, preprocessor, home_goal_model, away_goal_model, form_store)
+    print(f'Match prediction: {result}')
+
+#### GRADIENT BOOSTING
+
+# Reemplazar la función de entrenamiento con Gradient Boosting
+@instrumented()
+def train_gradient_boosting(X_train, y_train, params=None):
+    """
+    Entrena un modelo de Gradient Boosting utilizando XGBoost.
+    Args:
+        X_train (array): Características de entrenamiento.
+        y_train (array): Etiquetas de entrenamiento.
+        params (dict): Hiperparámetros que sustituyen a los de abajo
+            (p. ej. ``tuning.load_tuned_params().get("XGBRegressor")``).
+    Returns:
+        model: Modelo entrenado (de la caché de ``model_cache`` si ya se entrenó con lo mismo).
+    """
+    from xgboost import XGBRegressor
+
+    model = XGBRegressor(
+        n_estimators=100,  # Número de árboles
+        learning_rate=0.1,  # Tasa de aprendizaje
+        max_depth=6,       # Profundidad máxima de los árboles
+        subsample=0.8,     # Submuestreo de filas
+        colsample_bytree=0.8,  # Submuestreo de columnas
+        random_state=42
+    )
+    model.set_params(**(params or {}))
+    if getattr(y_train, 'ndim', 1) > 1:
+        # Dos columnas objetivo: un XGBRegressor por salida dentro de un solo objeto
+        model = make_multioutput(model)
+    return fit_cached(model, X_train, y_train)
+
+# Main function adaptada para GB
+def main_gradient_boosting(home_team, away_team, matches=None):
+    # Load and preprocess data
+    matches, features, form_store = load_and_preprocess_data(matches)
+
+    # Split data for home and away goal prediction
+    X_train, X_test, y_home_train, y_home_test = prepare_data(matches, features, 'FTHG')
+    _, _, y_away_train, y_away_test = prepare_data(matches, features, 'FTAG')
+
+    # Preprocessing pipeline
+    preprocessor = create_preprocessor()
+    X_train = preprocessor.fit_transform(X_train)
+    X_test = preprocessor.transform(X_test)
+
+    # Train Gradient Boosting models
+    home_goal_model = train_gradient_boosting(X_train, y_home_train)
+    away_goal_model = train_gradient_boosting(X_train, y_away_train)
+
+    # Evaluate models
+    y_home_pred = home_goal_model.predict(X_test)
+    y_away_pred = away_goal_model.predict(X_test)
+
+    # Evaluar el rendimiento utilizando RMSE
+    home_rmse = np.sqrt(mean_squared_error(y_home_test, y_home_pred))
+    home_mse = mean_squared_error(y_home_test, y_home_pred)
+    away_rmse = np.sqrt(mean_squared_error(y_away_test, y_away_pred))
+    away_mse = mean_squared_error(y_away_test, y_away_pred)
+    print(f'Home Goal Prediction RMSE: {home_rmse}')
+    print(f'Away Goal Prediction RMSE: {away_rmse}')
+    print(f'Home Goal Prediction MSE: {home_mse}')
+    print(f'Away Goal Prediction MSE: {away_mse}')
+
+    save_bundle('modelo_gb.joblib', preprocessor, home_goal_model, away_goal_model, form_store,
+                metadata=training_metadata(matches, 'XGBoost', y_home_test, y_home_pred, y_away_test, y_away_pred))
+
+    # Example prediction
+    historical_matches = matches.copy()
+    result = predict_match(home_team, away_team, historical_matches, preprocessor, home_goal_model, away_goal_model, form_store)
+    print(f'Match prediction: {result}')
+
+#### MULTI-OUTPUT
+
+# Main function con un único modelo para los goles local y visitante
+def main_multioutput(home_team, away_team, train_model=train_random_forest, matches=None):
+    """
+    Entrena un solo modelo multi-salida (FTHG, FTAG) en lugar de dos modelos
+    separados y lo guarda en un único fichero.
+    Args:
+        home_team (str): Equipo local del ejemplo.
+        away_team (str): Equipo visitante del ejemplo.
+        train_model: train_random_forest (multi-salida nativo) o train_gradient_boosting.
+        matches (DataFrame): Partidos; por defecto todas las temporadas de la caché.
+    El preprocesador, el modelo y la forma se guardan en un único bundle.
+    """
+    # Load and preprocess data
+    matches, features, form_store = load_and_preprocess_data(matches)
+
+    # Split data once with both targets
+    X_train, X_test, y_train, y_test = prepare_data(matches, features, GOAL_TARGETS)
+
+    # Preprocessing pipeline
+    preprocessor = create_preprocessor()
+    X_train = preprocessor.fit_transform(X_train)
+    X_test = preprocessor.transform(X_test)
+
+    # Train a single model for both goals
+    goal_model = train_model(X_train, y_train)
+
+    # Evaluate models
+    y_pred = goal_model.predict(X_test)
+    home_mse = mean_squared_error(y_test['FTHG'], y_pred[:, 0])
+    away_mse = mean_squared_error(y_test['FTAG'], y_pred[:, 1])
+    print(f'Home Goal Prediction RMSE: {np.sqrt(home_mse)}')
+    print(f'Away Goal Prediction RMSE: {np.sqrt(away_mse)}')
+    print(f'Home Goal Prediction MSE: {home_mse}')
+    print(f'Away Goal Prediction MSE: {away_mse}')
+
+    # One bundle with the single multi-output model
+    save_bundle('modelo_goles.joblib', preprocessor, goal_model, None, form_store,
+                metadata=training_metadata(matches, type(goal_model).__name__,
+                                           y_test['FTHG'], y_pred[:, 0], y_test['FTAG'], y_pred[:, 1]))
+
+    # Example prediction: one predict call returns both goals
+    result = predict_match(home_team, away_team, matches, preprocessor, goal_model, None, form_store)
+    print(f'Match prediction: {result}')
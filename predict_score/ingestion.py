@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""Ingesta incremental de resultados nuevos.
+
+``ingest`` recibe partidos nuevos (p. ej. el CSV de la última jornada) y:
+
+- los añade a la partición de su temporada sin duplicar los que ya estén
+  por (Date, HomeTeam, AwayTeam) (``match_data.append_matches``);
+- calcula ``goal_difference``, ``HF`` y ``AF`` sólo de las filas nuevas con el
+  ``TeamFormStore`` guardado tras la ingesta anterior, y las anexa a la
+  tabla de features como un fichero ``part-NNNNN.parquet`` más;
+- marca como desactualizados los bundles indicados (``model_bundle.mark_stale``).
+
+La forma guardada tras la ingesta (``FeatureStore.form_store``) es la que usa
+``predict-score predict`` (y ``prediction_server``) en lugar de la congelada en
+el bundle: ``refresh_form`` la actualiza, sin reentrenar, para los equipos de la
+tabla. Las temporadas nuevas también entran en ``load_matches``
+(``match_data.default_seasons``), así que el siguiente entrenamiento ya las incluye.
+
+El coste de una ingesta diaria depende de los partidos nuevos, no del
+histórico: ni se concatenan las temporadas ni se recalcula la forma de los
+equipos que no han jugado.
+
+La tabla de features sigue el orden cronológico (los scripts de
+entrenamiento calculan la forma en el orden de ``SEASONS``). Si llega un
+partido anterior al último registrado de alguno de sus equipos, se
+recalcula HF/AF sólo de los equipos afectados y la tabla se compacta.
+
+Uso:
+    python -m predict_score.ingestion jornada.csv --bundle modelo_rf.joblib --bundle mlp_score_predictor.npz
+"""
+
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .match_data import CACHE_DIR, DEFAULT_LEAGUE, MATCH_KEY, append_matches, load_matches, normalize_columns
+from .model_bundle import mark_stale
+from .team_form import SIDES, TeamFormStore, _rolling_sums_by_group, build_form_features, iter_form_features
+
+FEATURE_COLUMNS = MATCH_KEY + ["FTHG", "FTAG", "goal_difference", "HF", "AF"]
+STATE_FILE = "state.joblib"
+
+
+class FeatureStore:
+    """
+    Tabla de features de sólo anexado en ``<cache>/<liga>/features/``.
+
+    Cada ingesta escribe un ``part-NNNNN.parquet`` con sus filas. ``state.joblib``
+    guarda el ``TeamFormStore`` tras la última fila, la fecha del último partido
+    de cada equipo por lado y la versión (número de ingestas).
+
+    Args:
+        league (str): Liga de la caché.
+        cache_dir (str): Directorio de la caché (por defecto el de ``match_data``).
+        window (int): Ventana de la forma.
+    """
+
+    def __init__(self, league=DEFAULT_LEAGUE, cache_dir=None, window=5):
+        self.league = league
+        self.cache_dir = cache_dir
+        self.window = window
+        self.path = os.path.join(cache_dir or CACHE_DIR, league, "features")
+        self._state = None
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, STATE_FILE))
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = joblib.load(os.path.join(self.path, STATE_FILE))
+        return self._state
+
+    @property
+    def version(self):
+        return self.state["version"] if self.exists() else 0
+
+    @property
+    def form_store(self):
+        """Forma actual de los equipos, lista para ``predict_fixtures``."""
+        return self.state["form_store"]
+
+    def parts(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path)
+                      if name.startswith("part-") and name.endswith(".parquet"))
+
+    def read(self, columns=None, since=None):
+        """
+        Tabla de features en orden cronológico.
+
+        Args:
+            columns (list): Columnas a leer (por defecto ``FEATURE_COLUMNS``).
+            since (Timestamp): Sólo partidos desde esa fecha; los ficheros cuyo
+                rango de fechas queda antes no se leen.
+        """
+        columns = list(columns or FEATURE_COLUMNS)
+        filters = [("Date", ">=", pd.Timestamp(since))] if since is not None else None
+        frames = [pd.read_parquet(part, columns=columns, filters=filters) for part in self.parts()]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def build(self, matches=None, seasons=None):
+        """
+        Crea la tabla desde cero (en la primera ingesta o para regenerarla).
+
+        Args:
+            matches (DataFrame): Partidos; por defecto ``load_matches(seasons)``.
+            seasons (list): Temporadas; por defecto las de ``load_matches``, incluidas
+                las más nuevas que ya estén en la caché.
+        """
+        if matches is None:
+            matches = load_matches(seasons, self.league, cache_dir=self.cache_dir)
+        table = matches[MATCH_KEY + ["FTHG", "FTAG"]].sort_values("Date", kind="stable").reset_index(drop=True)
+        table["goal_difference"] = table["FTHG"] - table["FTAG"]
+        table["HF"], table["AF"], form_store = build_form_features(table, self.window)
+        self._rewrite(table, form_store, version=self.version + 1)
+        return table
+
+    def _rewrite(self, table, form_store, version):
+        for part in self.parts():
+            os.remove(part)
+        self._write_part(table, 0)
+        self._save_state(form_store, _last_dates(table), version, n_parts=1)
+
+    def _write_part(self, rows, number):
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, f"part-{number:05d}.parquet")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        rows[FEATURE_COLUMNS].to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def _save_state(self, form_store, last_dates, version, n_parts):
+        self._state = {"form_store": form_store, "last_dates": last_dates, "version": version,
+                       "n_parts": n_parts, "window": self.window}
+        tmp_path = os.path.join(self.path, f"{STATE_FILE}.{os.getpid()}.tmp")
+        joblib.dump(self._state, tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, STATE_FILE))
+
+    def append(self, matches):
+        """
+        Añade partidos nuevos a la tabla calculando sólo su forma.
+
+        Args:
+            matches (DataFrame): Partidos con ``MATCH_KEY``, FTHG y FTAG que no estén ya en la tabla.
+
+        Returns:
+            dict: Filas añadidas (``rows``) y equipos cuya forma se recalculó por
+            llegar partidos atrasados (``recomputed_teams``).
+        """
+        rows = matches[MATCH_KEY + ["FTHG", "FTAG"]].sort_values("Date", kind="stable").reset_index(drop=True)
+        rows["goal_difference"] = rows["FTHG"] - rows["FTAG"]
+        last_dates = self.state["last_dates"]
+        late = {side: sorted({team for team, date in zip(rows[f"{side}Team"], rows["Date"])
+                              if team in last_dates[side] and date < last_dates[side][team]})
+                for side in SIDES}
+        if late["Home"] or late["Away"]:
+            return self._insert_late(rows, late)
+
+        form_store = self.form_store
+        # Misma definición que build_form_features, con la forma guardada como historia previa
+        rows = next(iter_form_features([rows], form_store))
+
+        self._write_part(rows, self.state["n_parts"])
+        for side in SIDES:
+            last_dates[side].update(rows.groupby(f"{side}Team")["Date"].max().to_dict())
+        self._save_state(form_store, last_dates, self.state["version"] + 1, self.state["n_parts"] + 1)
+        return {"rows": rows, "recomputed_teams": []}
+
+    def _insert_late(self, rows, late):
+        # Partidos atrasados: se reordena la tabla y se recalcula la forma sólo de
+        # los equipos con filas nuevas en ese lado; el resto conserva sus valores
+        table = pd.concat([self.read(), rows], ignore_index=True).sort_values("Date", kind="stable")
+        table = table.reset_index(drop=True)
+        goal_difference = table["goal_difference"].to_numpy(dtype=float)
+        for side, column in zip(SIDES, ("HF", "AF")):
+            affected = table[f"{side}Team"].isin(set(rows[f"{side}Team"])).to_numpy()
+            codes, _ = pd.factorize(table.loc[affected, f"{side}Team"])
+            sums, counts = _rolling_sums_by_group(codes, goal_difference[affected], self.window)
+            table.loc[affected, column] = np.where(counts >= self.window, sums / self.window, np.nan)
+        self._rewrite(table, TeamFormStore.from_matches(table, self.window), self.state["version"] + 1)
+        new_keys = pd.MultiIndex.from_frame(rows[MATCH_KEY])
+        added = table[pd.MultiIndex.from_frame(table[MATCH_KEY]).isin(new_keys)].reset_index(drop=True)
+        return {"rows": added, "recomputed_teams": sorted(set(late["Home"]) | set(late["Away"]))}
+
+    def compact(self):
+        """Junta todos los ``part-*.parquet`` en uno (sin recalcular nada)."""
+        self._rewrite(self.read(), self.form_store, self.state["version"])
+
+
+def _last_dates(table):
+    return {side: table.groupby(f"{side}Team")["Date"].max().to_dict() for side in SIDES}
+
+
+def refresh_form(predictor, league=DEFAULT_LEAGUE, cache_dir=None):
+    """
+    Actualiza la forma congelada de un bundle (o ``.npz``) con la de la tabla de features.
+
+    Sólo cambian los equipos que están en la tabla de ``league``; los demás
+    (p. ej. los de otras ligas de un bundle entrenado con ``--leagues E0 E1``)
+    conservan la forma del bundle.
+
+    Args:
+        predictor: ``ModelBundle`` o ``NumpyScorePredictor``.
+        league (str): Liga de la tabla de features.
+
+    Returns:
+        int: Versión de la tabla usada, o None si no hay tabla o su ventana no es
+        la del bundle (entonces se deja la forma del bundle).
+    """
+    from .numpy_inference import FormSnapshot
+
+    store = FeatureStore(league, cache_dir)
+    if not store.exists():
+        return None
+    frozen = predictor.form_store
+    window = getattr(frozen, "window", None)
+    if window is not None and window != store.state["window"]:
+        return None
+    current = store.form_store
+    if frozen is None or all(team in current for team in frozen.teams):
+        predictor.form_store = current
+        return store.version
+    teams = list(current.teams) + [team for team in frozen.teams if team not in current]
+    sources = [current if team in current else frozen for team in teams]
+    predictor.form_store = FormSnapshot(
+        teams,
+        np.array([source.home_form(team) for source, team in zip(sources, teams)], dtype=float),
+        np.array([source.away_form(team) for source, team in zip(sources, teams)], dtype=float))
+    return store.version
+
+
+def ingest(matches, league=DEFAULT_LEAGUE, cache_dir=None, window=5, bundles=()):
+    """
+    Añade resultados nuevos a la caché y a la tabla de features.
+
+    Args:
+        matches (DataFrame): Partidos nuevos (columnas de football-data; al menos
+            Date, HomeTeam, AwayTeam, FTHG y FTAG). Los ya guardados se ignoran.
+        league (str): Liga de la caché.
+        bundles (iterable): Bundles (``.joblib``) o exportaciones (``.npz``) entrenados
+            con los datos anteriores; se marcan como desactualizados si entra algo nuevo.
+
+    Returns:
+        dict: Partidos recibidos, añadidos y duplicados, equipos afectados,
+        equipos recalculados por partidos atrasados, versión de la tabla y bundles marcados.
+    """
+    received = normalize_columns(matches)
+    store = FeatureStore(league, cache_dir, window)
+    if not store.exists():
+        # Primera ingesta: la tabla se construye con lo que ya hay en la caché
+        store.build()
+
+    append_matches(received, league, cache_dir)
+    # Lo que la tabla de features no tiene todavía (sólo se leen las fechas recientes)
+    since = received["Date"].min() if len(received) else None
+    known = store.read(MATCH_KEY, since=since) if since is not None else store.read(MATCH_KEY)
+    unique = received.drop_duplicates(subset=MATCH_KEY)
+    new = unique[~pd.MultiIndex.from_frame(unique[MATCH_KEY]).isin(pd.MultiIndex.from_frame(known[MATCH_KEY]))]
+
+    result = {"received": len(received), "added": len(new), "duplicates": len(received) - len(new),
+              "teams": [], "recomputed_teams": [], "version": store.version, "stale_bundles": []}
+    if new.empty:
+        return result
+
+    appended = store.append(new)
+    teams = sorted(set(new["HomeTeam"]) | set(new["AwayTeam"]))
+    last_date = new["Date"].max().date()
+    for path in bundles:
+        mark_stale(path, len(new), teams, last_date)
+    result.update(teams=teams, recomputed_teams=appended["recomputed_teams"], version=store.version,
+                  stale_bundles=list(bundles))
+    return result
+
+
+def ingest_csv(paths, league=DEFAULT_LEAGUE, bundles=(), cache_dir=None):
+    """Ingesta de uno o varios CSV de football-data con un resumen por pantalla (CLI)."""
+    matches = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    result = ingest(matches, league, cache_dir, bundles=bundles)
+    print(f"{result['added']} new matches, {result['duplicates']} already stored "
+          f"(feature table version {result['version']})")
+    if result["recomputed_teams"]:
+        print(f"Late results: recomputed form of {', '.join(result['recomputed_teams'])}")
+    for path in result["stale_bundles"]:
+        print(f"Marked {path} as stale")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append new match results to the local store")
+    parser.add_argument("csv", nargs="+", help="football-data CSV files with the new matches")
+    parser.add_argument("--league", default=DEFAULT_LEAGUE)
+    parser.add_argument("--bundle", action="append", default=[], help="bundle to mark as stale (repeatable)")
+    args = parser.parse_args(argv)
+    ingest_csv(args.csv, args.league, args.bundle)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""Instrumentación de las etapas del pipeline.
+
+Cada etapa (carga, features, preprocesador, entrenamiento, evaluación,
+KMeans...) se envuelve con ``stage`` o ``instrumented`` y, si hay una traza
+activa, se escribe un evento con tiempo de pared, tiempo de CPU, pico de RSS
+del proceso y número de filas. Sin traza activa el coste es una comprobación.
+
+La traza se activa con variables de entorno (así también la heredan los
+procesos del pool de ``evaluation_engine``) o con ``configure``:
+
+    PREDICT_SCORE_TRACE=trace.jsonl         un evento JSON por línea
+    PREDICT_SCORE_TRACE=trace.json          formato Chrome trace (chrome://tracing, Perfetto)
+    PREDICT_SCORE_PROFILE=cprofile          además, un .prof por etapa
+    PREDICT_SCORE_PROFILE=pyinstrument      perfil por muestreo (requiere pyinstrument)
+    PREDICT_SCORE_PROFILE_DIR=profiles/     dónde guardar los perfiles
+
+Resumen de una traza:
+    python -m predict_score.instrumentation trace.jsonl
+"""
+
+import contextlib
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+TRACE_ENV = "PREDICT_SCORE_TRACE"
+PROFILE_ENV = "PREDICT_SCORE_PROFILE"
+PROFILE_DIR_ENV = "PREDICT_SCORE_PROFILE_DIR"
+PROFILERS = ("cprofile", "pyinstrument")
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def configure(trace_path=None, profile=None, profile_dir=None):
+    """
+    Activa (o desactiva con ``trace_path=None``) la traza de este proceso y
+    de los procesos hijos que se lancen después.
+
+    Args:
+        trace_path (str): Fichero de traza; '.json' escribe formato Chrome, si no JSON lines.
+        profile (str): 'cprofile', 'pyinstrument' o None.
+        profile_dir (str): Carpeta de los perfiles (por defecto, junto a la traza).
+    """
+    if profile is not None and profile not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profile}', expected one of {PROFILERS}")
+    for name, value in ((TRACE_ENV, trace_path), (PROFILE_ENV, profile), (PROFILE_DIR_ENV, profile_dir)):
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = str(value)
+
+
+def settings():
+    """Configuración actual, para reenviarla a procesos ya creados (p. ej. workers de loky)."""
+    return {
+        "trace_path": os.environ.get(TRACE_ENV) or None,
+        "profile": os.environ.get(PROFILE_ENV) or None,
+        "profile_dir": os.environ.get(PROFILE_DIR_ENV) or None,
+    }
+
+
+def trace_path():
+    return os.environ.get(TRACE_ENV) or None
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KiB, macOS en bytes
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def count_rows(obj):
+    """Filas de un DataFrame/array/matriz dispersa, o de la primera de una tupla."""
+    if isinstance(obj, (tuple, list)) and obj:
+        return count_rows(obj[0])
+    shape = getattr(obj, "shape", None)
+    if shape:
+        return int(shape[0])
+    return None
+
+
+def _write_event(path, event):
+    chrome = path.endswith(".json")
+    with _lock:
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        # Una sola escritura en modo append por evento: varios procesos pueden compartir el fichero
+        with open(path, "a") as f:
+            if chrome:
+                # Formato de array del Chrome trace: el corchete de cierre es opcional
+                f.write(("[\n" if new_file else "") + json.dumps(event) + ",\n")
+            else:
+                f.write(json.dumps(event) + "\n")
+
+
+def _chrome_event(record):
+    return {
+        "name": record["stage"],
+        "cat": "predict_score",
+        "ph": "X",
+        "ts": record["start_us"],
+        "dur": record["wall_seconds"] * 1e6,
+        "pid": record["pid"],
+        "tid": record["tid"],
+        "args": {key: value for key, value in record.items()
+                 if key not in ("stage", "start_us", "pid", "tid")},
+    }
+
+
+@contextlib.contextmanager
+def _profiled(name):
+    profiler_name = os.environ.get(PROFILE_ENV)
+    if not profiler_name:
+        yield None
+        return
+    directory = os.environ.get(PROFILE_DIR_ENV) or (os.path.dirname(os.path.abspath(trace_path())) + "/profiles")
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.{os.getpid()}.{time.time_ns()}")
+
+    if profiler_name == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield base + ".prof"
+        finally:
+            profiler.disable()
+            profiler.dump_stats(base + ".prof")
+    elif profiler_name == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield base + ".html"
+        finally:
+            profiler.stop()
+            with open(base + ".html", "w") as f:
+                f.write(profiler.output_html())
+    else:
+        raise ValueError(f"Unknown profiler '{profiler_name}', expected one of {PROFILERS}")
+
+
+class Stage:
+    """Etapa en curso; ``rows`` y ``attrs`` se pueden completar dentro del bloque."""
+
+    def __init__(self, name, rows=None, **attrs):
+        self.name = name
+        self.rows = rows
+        self.attrs = attrs
+
+
+@contextlib.contextmanager
+def stage(name, rows=None, **attrs):
+    """
+    Mide el bloque como una etapa de la traza.
+
+    Ejemplo:
+        with stage("mlp.fit", rows=X_train.shape[0], epochs=50):
+            model.fit(...)
+
+    Yields:
+        Stage: Permite fijar ``rows`` u otros atributos cuando se conocen al final.
+    """
+    current = Stage(name, rows, **attrs)
+    path = trace_path()
+    if path is None:
+        yield current
+        return
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    parent = stack[-1] if stack else None
+    stack.append(name)
+
+    start_us = time.time_ns() / 1000.0
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    rss_start = _peak_rss_mb()
+    error = profile_file = None
+    try:
+        with _profiled(name) as profile_file:
+            yield current
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        stack.pop()
+        rss_end = _peak_rss_mb()
+        record = {
+            "stage": name,
+            "parent": parent,
+            "start_us": start_us,
+            "wall_seconds": time.perf_counter() - wall_start,
+            "cpu_seconds": time.process_time() - cpu_start,
+            "peak_rss_mb": rss_end,
+            "peak_rss_growth_mb": rss_end - rss_start if rss_end is not None else None,
+            "rows": current.rows,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            **current.attrs,
+        }
+        if profile_file:
+            record["profile"] = profile_file
+        if error:
+            record["error"] = error
+        _write_event(path, _chrome_event(record) if path.endswith(".json") else record)
+
+
+def instrumented(name=None, rows=count_rows):
+    """
+    Decorador: registra cada llamada a la función como una etapa.
+
+    Args:
+        name (str): Nombre de la etapa (por defecto, el de la función).
+        rows (callable): Cuenta filas; se prueba con el primer argumento y,
+            si no da resultado, con el valor devuelto.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if trace_path() is None:
+                return func(*args, **kwargs)
+            with stage(stage_name, rows=rows(args[0]) if args else None) as current:
+                result = func(*args, **kwargs)
+                if current.rows is None:
+                    current.rows = rows(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def read_trace(path):
+    """Lee una traza JSON lines o Chrome y devuelve una lista de registros planos."""
+    with open(path) as f:
+        text = f.read()
+    if path.endswith(".json"):
+        events = json.loads(text.rstrip().rstrip(",") + ("" if text.rstrip().endswith("]") else "]"))
+        return [{"stage": event["name"], "pid": event["pid"], **event["args"]} for event in events]
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def summarize(path):
+    """
+    Agrega una traza por etapa.
+
+    Returns:
+        DataFrame: Llamadas, tiempo de pared/CPU total y máximo, pico de RSS y filas por etapa,
+        ordenado por tiempo total.
+    """
+    import pandas as pd
+
+    records = pd.DataFrame(read_trace(path))
+    summary = records.groupby("stage").agg(
+        calls=("wall_seconds", "size"),
+        wall_seconds=("wall_seconds", "sum"),
+        max_wall_seconds=("wall_seconds", "max"),
+        cpu_seconds=("cpu_seconds", "sum"),
+        peak_rss_mb=("peak_rss_mb", "max"),
+        rows=("rows", "max"),
+    )
+    return summary.sort_values("wall_seconds", ascending=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m predict_score.instrumentation TRACE")
+    print(summarize(sys.argv[1]).to_string())
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Cliente de carga para ``prediction_server``.
+
+Abre ``--concurrency`` conexiones keep-alive contra una instancia local y
+envía peticiones /predict con partidos aleatorios entre los equipos que
+conoce el servidor. Al terminar imprime el throughput, las latencias medidas
+en el cliente y las estadísticas del servidor (/stats).
+
+Uso:
+    python -m predict_score.load_test --requests 5000 --concurrency 64 --model rf
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+
+async def http_request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def open_connection(host, port, unix_socket):
+    if unix_socket:
+        return await asyncio.open_unix_connection(unix_socket)
+    return await asyncio.open_connection(host, port)
+
+
+async def worker(args, fixtures, counter, latencies, failures):
+    reader, writer = await open_connection(args.host, args.port, args.unix_socket)
+    try:
+        while counter[0] < args.requests:
+            counter[0] += 1
+            home, away = random.choice(fixtures)
+            start = time.perf_counter()
+            status, _ = await http_request(reader, writer, "POST", "/predict",
+                                           {"home": home, "away": away, "model": args.model})
+            latencies.append(time.perf_counter() - start)
+            failures[0] += status != 200
+    finally:
+        writer.close()
+
+
+async def run(args):
+    reader, writer = await open_connection(args.host, args.port, args.unix_socket)
+    _, health = await http_request(reader, writer, "GET", "/health")
+    writer.close()
+    args.model = args.model or health["models"][0]
+
+    teams = args.teams or ["Arsenal", "Chelsea", "Liverpool", "Man City", "Man United", "Tottenham"]
+    fixtures = [(home, away) for home in teams for away in teams if home != away]
+
+    counter, failures, latencies = [0], [0], []
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(args, fixtures, counter, latencies, failures)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await open_connection(args.host, args.port, args.unix_socket)
+    _, server_stats = await http_request(reader, writer, "GET", "/stats")
+    writer.close()
+
+    latencies_ms = np.array(latencies) * 1000.0
+    return {
+        "model": args.model,
+        "requests": len(latencies),
+        "failures": failures[0],
+        "concurrency": args.concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "client_latency_ms": dict(zip(("p50", "p90", "p99"),
+                                      np.percentile(latencies_ms, [50, 90, 99]).round(3).tolist())),
+        "server": server_stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for prediction_server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix-socket")
+    parser.add_argument("--model", help="bundle name on the server (default: first one)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--teams", nargs="+", help="teams to draw fixtures from")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
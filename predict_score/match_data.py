@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+"""Carga compartida de partidos con caché columnar local.
+
+Los CSV de football-data.co.uk se descargan (o se extraen de
+``dataset/PremierLeague.csv`` en modo sin conexión) una sola vez por
+temporada y se guardan como Parquet en ``<cache>/<liga>/<temporada>.parquet``.
+Las lecturas posteriores sólo leen las columnas proyectadas y con tipos fijos.
+
+``load_matches`` concatena unas temporadas de una liga. Para consultas sobre
+muchas ligas y temporadas están ``scan_matches`` e ``iter_matches``: sólo
+abren las particiones de las ligas y temporadas pedidas, leen las columnas
+proyectadas y aplican los filtros en la lectura del Parquet; ``iter_matches``
+además devuelve los partidos por bloques, sin juntar nunca todo el histórico.
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+BASE_URL = "https://www.football-data.co.uk/mmz4281/{season}/{league}.csv"
+
+# Temporadas en el mismo orden en el que los scripts concatenaban los CSV
+SEASONS = ["2425", "2324", "2223", "2122", "2021", "1920"]
+DEFAULT_LEAGUE = "E0"
+
+# Divisiones de football-data.co.uk con el mismo formato de CSV
+LEAGUES = [
+    "E0", "E1", "E2", "E3", "EC", "SC0", "SC1", "SC2", "SC3", "D1", "D2", "I1", "I2",
+    "SP1", "SP2", "F1", "F2", "N1", "B1", "P1", "T1", "G1",
+]
+
+DATASET_DIR = Path(__file__).resolve().parent / "dataset"
+BOOTSTRAP_CSV = DATASET_DIR / "PremierLeague.csv"
+CACHE_DIR = Path(os.environ.get("PREDICT_SCORE_CACHE_DIR", DATASET_DIR / "cache"))
+
+# Columnas que usan los modelos. HF/AF del CSV (faltas) no se leen porque
+# todos los scripts las sobrescriben con el estado de forma.
+MATCH_COLUMNS = [
+    "Div", "Date", "HomeTeam", "AwayTeam", "FTHG", "FTAG", "FTR",
+    "HTHG", "HTAG", "HTR", "HS", "AS", "HST", "AST",
+    "HC", "AC", "HY", "AY", "HR", "AR",
+]
+
+# Identifica un partido: las ingestas descartan filas con una clave ya guardada
+MATCH_KEY = ["Date", "HomeTeam", "AwayTeam"]
+
+TEXT_COLUMNS = ["Div", "Time", "HomeTeam", "AwayTeam", "FTR", "HTR", "Referee"]
+DATE_COLUMNS = ["Date"]
+# El resto de columnas (estadísticas y cuotas) se guardan como float32
+
+
+def _is_offline(offline):
+    if offline is not None:
+        return offline
+    return os.environ.get("PREDICT_SCORE_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def season_code(dates):
+    """
+    Calcula el código de temporada de football-data ('2425') para cada fecha.
+
+    Las temporadas empiezan en agosto; la 19/20 terminó en julio de 2020.
+    """
+    start = dates.dt.year.where(dates.dt.month >= 8, dates.dt.year - 1)
+    return (start % 100).map("{:02d}".format) + ((start + 1) % 100).map("{:02d}".format)
+
+
+def season_start(season):
+    """Primer día (1 de agosto) de una temporada ('1516' -> 2015-08-01)."""
+    year = int(season[:2])
+    return pd.Timestamp(year=(2000 if year < 90 else 1900) + year, month=8, day=1)
+
+
+def season_range(since, until=None):
+    """
+    Códigos de temporada, de la más antigua a la más reciente, que contienen
+    partidos entre ``since`` y ``until`` (por defecto, hoy).
+    """
+    first, last = (season_code(pd.Series([pd.Timestamp(date)]))[0]
+                   for date in (since, until if until is not None else pd.Timestamp.today()))
+    seasons = [first]
+    while seasons[-1] != last:
+        start = season_start(seasons[-1]).year + 1
+        seasons.append(f"{start % 100:02d}{(start + 1) % 100:02d}")
+    return seasons
+
+
+def normalize_columns(df):
+    """
+    Descarta columnas sin nombre y fija los tipos de las columnas conocidas.
+
+    Args:
+        df (DataFrame): Datos tal como salen de ``pd.read_csv``.
+
+    Returns:
+        DataFrame: Datos con fechas parseadas, texto como ``object`` y números en float32.
+    """
+    df = df.loc[:, [c for c in df.columns if not str(c).startswith("Unnamed")]]
+    df = df.dropna(subset=["HomeTeam", "AwayTeam"]).copy()
+    for column in df.columns:
+        if column in DATE_COLUMNS:
+            if not pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column], dayfirst=True)
+        elif column in TEXT_COLUMNS:
+            df[column] = df[column].astype(object)
+        else:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float32")
+    return df.reset_index(drop=True)
+
+
+def partition_path(league, season, cache_dir=None):
+    return Path(cache_dir or CACHE_DIR) / league / f"{season}.parquet"
+
+
+def _write_partition(df, path):
+    # Escritura atómica: varios workers pueden calentar la caché a la vez
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def bootstrap_from_csv(csv_path=None, cache_dir=None, partitions=None):
+    """
+    Llena la caché a partir de un CSV local con varias temporadas (por defecto
+    ``dataset/PremierLeague.csv``), sin acceder a la red.
+
+    Sólo se escriben particiones que no existen: las que ya están en la caché
+    (descargadas o con partidos añadidos por ``append_matches``) no se tocan.
+    Las filas duplicadas (Date, HomeTeam, AwayTeam) se descartan.
+
+    Args:
+        partitions (iterable): Pares (liga, temporada) a escribir; por defecto
+            todos los del CSV.
+
+    Returns:
+        list: Pares (liga, temporada) escritos en la caché.
+    """
+    wanted = set(partitions) if partitions is not None else None
+    df = normalize_columns(pd.read_csv(csv_path or BOOTSTRAP_CSV))
+    df = df.drop_duplicates(subset=MATCH_KEY)
+    written = []
+    for (league, season), part in df.groupby([df["Div"], season_code(df["Date"])], sort=False):
+        path = partition_path(league, season, cache_dir)
+        if (wanted is not None and (league, season) not in wanted) or path.exists():
+            continue
+        _write_partition(part.reset_index(drop=True), path)
+        written.append((league, season))
+    return written
+
+
+def append_matches(matches, league=DEFAULT_LEAGUE, cache_dir=None):
+    """
+    Añade partidos nuevos a la caché sin duplicar los que ya estén.
+
+    Sólo se leen y reescriben las temporadas de los partidos recibidos (una
+    partición tiene como mucho una temporada de partidos), no el histórico.
+
+    Args:
+        matches (DataFrame): Partidos con al menos ``MATCH_KEY`` (p. ej. el CSV de la jornada).
+        league (str): Liga de la caché donde se guardan.
+
+    Returns:
+        DataFrame: Filas realmente añadidas (normalizadas), en el orden recibido.
+    """
+    matches = normalize_columns(matches).drop_duplicates(subset=MATCH_KEY)
+    added = []
+    for season, part in matches.groupby(season_code(matches["Date"]), sort=False):
+        path = partition_path(league, season, cache_dir)
+        if path.exists():
+            existing = pd.read_parquet(path)
+            known = pd.MultiIndex.from_frame(existing[MATCH_KEY])
+            part = part[~pd.MultiIndex.from_frame(part[MATCH_KEY]).isin(known)]
+            if part.empty:
+                continue
+            # Vuelve a fijar tipos por si el CSV nuevo trae columnas que la temporada no tenía
+            combined = normalize_columns(pd.concat([existing, part], ignore_index=True))
+        else:
+            combined = part.reset_index(drop=True)
+        _write_partition(combined, path)
+        added.append(part)
+    if not added:
+        return matches.iloc[:0]
+    return pd.concat(added, ignore_index=True)
+
+
+def cached_seasons(league=DEFAULT_LEAGUE, cache_dir=None):
+    """Temporadas de ``league`` que hay en la caché, de la más antigua a la más reciente."""
+    folder = Path(cache_dir or CACHE_DIR) / league
+    if not folder.is_dir():
+        return []
+    seasons = [path.stem for path in folder.glob("*.parquet") if len(path.stem) == 4 and path.stem.isdigit()]
+    return sorted(seasons, key=season_start)
+
+
+def default_seasons(league=DEFAULT_LEAGUE, cache_dir=None):
+    """
+    ``SEASONS`` más las temporadas posteriores que ya estén en la caché (p. ej.
+    las que ha ido añadiendo la ingesta), en el mismo orden que ``SEASONS``.
+    """
+    newest = season_start(SEASONS[0])
+    newer = [s for s in cached_seasons(league, cache_dir) if season_start(s) > newest]
+    return newer[::-1] + SEASONS
+
+
+def _download_partition(league, season, cache_dir):
+    df = normalize_columns(pd.read_csv(BASE_URL.format(season=season, league=league)))
+    _write_partition(df, partition_path(league, season, cache_dir))
+
+
+def fetch_partitions(seasons=None, league=DEFAULT_LEAGUE, offline=None, refresh=False, cache_dir=None):
+    """
+    Trae a la caché las temporadas pedidas que falten.
+
+    En modo online descarga las temporadas que faltan (o todas si ``refresh``);
+    si la red falla, o en modo offline, las que no están en la caché se sacan
+    del CSV local. Las particiones existentes nunca se reescriben desde el CSV.
+
+    Returns:
+        list: Temporadas que no están en la caché ni se han podido obtener.
+    """
+    seasons = seasons or SEASONS
+    offline = _is_offline(offline)
+    missing = [s for s in seasons if refresh or not partition_path(league, s, cache_dir).exists()]
+
+    if not offline:
+        for season in list(missing):
+            try:
+                _download_partition(league, season, cache_dir)
+                missing.remove(season)
+            except OSError:
+                pass
+
+    if missing:
+        bootstrap_from_csv(cache_dir=cache_dir, partitions=[(league, s) for s in missing])
+        missing = [s for s in missing if not partition_path(league, s, cache_dir).exists()]
+    return missing
+
+
+def ensure_partitions(seasons=None, league=DEFAULT_LEAGUE, offline=None, refresh=False, cache_dir=None):
+    """
+    Garantiza que cada temporada pedida está en la caché (ver ``fetch_partitions``).
+
+    Raises:
+        FileNotFoundError: Si alguna temporada no está en la caché ni en el CSV local.
+    """
+    missing = fetch_partitions(seasons, league, offline=offline, refresh=refresh, cache_dir=cache_dir)
+    if missing:
+        raise FileNotFoundError(f"No cached data for {league} seasons {missing}")
+
+
+def _fill_missing(df, columns, available):
+    # Columnas pedidas que no existen en la temporada (p. ej. cuotas de casas nuevas)
+    for column in columns:
+        if column not in available:
+            df[column] = pd.Series(dtype=object if column in TEXT_COLUMNS else "float32", index=df.index)
+    return df[list(columns)]
+
+
+def read_partition(league, season, columns=MATCH_COLUMNS, cache_dir=None):
+    """
+    Lee una temporada de la caché, proyectando ``columns`` (None = todas).
+
+    Las columnas pedidas que no existan en esa temporada se devuelven vacías.
+    """
+    import pyarrow.parquet as pq
+
+    path = partition_path(league, season, cache_dir)
+    if columns is None:
+        return pd.read_parquet(path)
+    available = set(pq.read_schema(path).names)
+    df = pd.read_parquet(path, columns=[c for c in columns if c in available])
+    return _fill_missing(df, columns, available)
+
+
+def load_matches(seasons=None, league=DEFAULT_LEAGUE, columns=MATCH_COLUMNS, offline=None,
+                 refresh=False, cache_dir=None):
+    """
+    Devuelve los partidos de varias temporadas concatenados en un único DataFrame.
+
+    Args:
+        seasons (list): Códigos de temporada ('2425', ...). Por defecto ``SEASONS`` y
+            las temporadas más nuevas ya guardadas en la caché (``default_seasons``).
+        league (str): Código de liga de football-data ('E0' = Premier League).
+        columns (list): Columnas a leer. ``None`` lee todas, incluidas las cuotas.
+        offline (bool): Sin red; se usa la caché o ``PremierLeague.csv``. Por defecto
+            se toma de la variable de entorno ``PREDICT_SCORE_OFFLINE``.
+        refresh (bool): Vuelve a descargar las temporadas aunque estén en caché.
+        cache_dir (str): Directorio de la caché. Por defecto ``PREDICT_SCORE_CACHE_DIR``
+            o ``dataset/cache``.
+
+    Returns:
+        matches (DataFrame): Partidos en el orden de ``seasons``.
+    """
+    seasons = seasons or default_seasons(league, cache_dir)
+    ensure_partitions(seasons, league, offline=offline, refresh=refresh, cache_dir=cache_dir)
+    dfs = [read_partition(league, season, columns, cache_dir) for season in seasons]
+    return pd.concat(dfs, ignore_index=True)
+
+
+def select_partitions(leagues=None, seasons=None, since=None, until=None):
+    """
+    Particiones (liga, temporada) que puede tocar una consulta.
+
+    Las temporadas salen de ``seasons`` o, si no se dan, del rango
+    ``since``-``until`` (``SEASONS`` si tampoco hay fechas); las que quedan
+    fuera de ese rango de fechas ni se abren. El orden es por temporada (de la
+    más antigua a la más reciente) y dentro de ella por liga, de modo que los
+    partidos de cada equipo se recorren en orden cronológico aunque cambie de
+    división.
+    """
+    leagues = leagues or [DEFAULT_LEAGUE]
+    if seasons is None:
+        seasons = season_range(since, until) if since is not None else SEASONS
+    first = season_code(pd.Series([pd.Timestamp(since)]))[0] if since is not None else None
+    last = season_code(pd.Series([pd.Timestamp(until)]))[0] if until is not None else None
+    seasons = [s for s in seasons if (first is None or season_start(s) >= season_start(first))
+               and (last is None or season_start(s) <= season_start(last))]
+    return [(league, season) for season in sorted(set(seasons), key=season_start) for league in leagues]
+
+
+def _date_filters(since, until, filters):
+    filters = list(filters or [])
+    if since is not None:
+        filters.append(("Date", ">=", pd.Timestamp(since)))
+    if until is not None:
+        filters.append(("Date", "<=", pd.Timestamp(until)))
+    return filters
+
+
+def iter_matches(leagues=None, seasons=None, since=None, until=None, columns=MATCH_COLUMNS, filters=None,
+                 chunk_size=100_000, skip_missing=False, offline=None, cache_dir=None):
+    """
+    Recorre los partidos de varias ligas y temporadas por bloques.
+
+    Cada bloque sale de una sola partición y tiene como mucho ``chunk_size``
+    filas, así que la memoria no depende del tamaño del histórico. Sólo se
+    leen las columnas de ``columns`` y las del filtro; los filtros se aplican
+    en la lectura (los grupos de filas del Parquet que no los cumplen no se
+    descomprimen).
+
+    Args:
+        leagues (list): Códigos de liga (por defecto ``[DEFAULT_LEAGUE]``; ``LEAGUES`` = todas).
+        seasons (list): Temporadas; por defecto, las del rango ``since``-``until``.
+        since, until (str o Timestamp): Fechas límite (incluidas) de los partidos.
+        columns (list): Columnas a devolver. ``None`` lee todas las de cada partición.
+        filters (list): Condiciones ``(columna, operador, valor)`` que deben
+            cumplirse todas, como en ``pd.read_parquet``. Las temporadas sin la
+            columna filtrada no tienen filas que las cumplan y se saltan.
+        chunk_size (int): Filas máximas por bloque.
+        skip_missing (bool): Salta las particiones que no existen en football-data
+            (ligas sin datos en alguna temporada) en lugar de fallar.
+
+    Yields:
+        DataFrame: Bloque de partidos, en el orden de ``select_partitions``.
+
+    Raises:
+        FileNotFoundError: Si falta alguna partición y no se pide ``skip_missing``.
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    partitions = select_partitions(leagues, seasons, since, until)
+    missing = set()
+    for league in dict.fromkeys(league for league, _ in partitions):
+        league_seasons = [season for other, season in partitions if other == league]
+        absent = fetch_partitions(league_seasons, league, offline=offline, cache_dir=cache_dir)
+        if absent and not skip_missing:
+            raise FileNotFoundError(f"No cached data for {league} seasons {absent}")
+        missing.update((league, season) for season in absent)
+
+    filters = _date_filters(since, until, filters)
+    for league, season in partitions:
+        if (league, season) in missing:
+            continue
+        path = partition_path(league, season, cache_dir)
+        available = set(pq.read_schema(path).names)
+        if any(column not in available for column, _, _ in filters):
+            continue
+        wanted = list(columns) if columns is not None else None
+        read = [c for c in wanted if c in available] if wanted is not None else None
+        dataset = ds.dataset(path, format="parquet")
+        expression = pq.filters_to_expression(filters) if filters else None
+        for table in _rebatch(dataset.to_batches(columns=read, filter=expression, batch_size=chunk_size),
+                              chunk_size):
+            df = table.to_pandas()
+            yield _fill_missing(df, wanted, available) if wanted is not None else df
+
+
+def _rebatch(batches, chunk_size):
+    # El filtro se aplica después de leer cada lote, así que los lotes filtrados
+    # salen pequeños; se juntan hasta ``chunk_size`` filas
+    import pyarrow as pa
+
+    pending, rows = [], 0
+    for batch in batches:
+        if not batch.num_rows:
+            continue
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size)
+            pending, rows = table.slice(chunk_size).to_batches(), rows - chunk_size
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+
+def scan_matches(leagues=None, seasons=None, since=None, until=None, columns=MATCH_COLUMNS, filters=None,
+                 skip_missing=False, offline=None, cache_dir=None):
+    """
+    Partidos de varias ligas y temporadas en un DataFrame, en orden cronológico.
+
+    Misma consulta que ``iter_matches`` (proyección, filtros y poda de
+    particiones): sólo se junta lo que la cumple, nunca el histórico completo.
+    Si no se proyecta ``Date`` el orden es el de las particiones.
+    """
+    chunks = list(iter_matches(leagues, seasons, since, until, columns, filters,
+                               skip_missing=skip_missing, offline=offline, cache_dir=cache_dir))
+    if not chunks:
+        return pd.DataFrame(columns=list(columns or MATCH_COLUMNS))
+    matches = pd.concat(chunks, ignore_index=True)
+    if "Date" in matches:
+        # Dentro de cada temporada las ligas se leen una tras otra
+        matches = matches.sort_values("Date", kind="stable", ignore_index=True)
+    return matches
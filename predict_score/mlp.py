@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+"""MLP de goles (local y visitante) con TensorFlow/Keras.
+
+Lógica del cuaderno Modelo-Usando-DeepLearning.ipynb (el script exportado
+está en ``py/DeepLearning_Model.py``). Importar este módulo carga
+TensorFlow, así que el resto del paquete sólo lo importa al entrenar o
+ajustar el MLP; para predecir sin TensorFlow está ``numpy_inference``.
+"""
+
+#### DEEP LEARNING
+
+import os
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import mean_squared_error
+from sklearn.preprocessing import StandardScaler
+from tensorflow.keras.models import Model, Sequential
+from tensorflow.keras.layers import Concatenate, Dense, Dropout, Embedding, Flatten, Input
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import BackupAndRestore, EarlyStopping, ModelCheckpoint
+from .match_data import DEFAULT_LEAGUE, iter_matches, load_matches, season_code
+from .team_form import TeamFormStore, build_form_features, iter_form_features
+from . import fixture_prediction
+from .preprocessing import create_preprocessor
+from .model_bundle import save_bundle
+from .numpy_inference import export_npz
+from .instrumentation import instrumented, stage
+from .model_cache import fit_cached
+
+# Paso 1: Cargar y preprocesar los datos
+@instrumented()
+def load_and_preprocess_data(matches=None):
+    """
+    Carga los datos históricos de partidos de fútbol desde la caché local
+    (ver ``match_data.load_matches``; otras ligas y temporadas se pasan en
+    ``matches``, p. ej. con ``match_data.scan_matches``), realiza
+    ingeniería de características y prepara las columnas relevantes para la predicción.
+
+    - Se calculan estadísticas de forma reciente de los equipos locales y visitantes (HF y AF).
+    - Se agregan nuevas columnas derivadas como la diferencia de goles.
+    - Se seleccionan las características principales y las columnas objetivo.
+
+    Args:
+        matches (DataFrame): Partidos ya cargados; por defecto ``load_matches()``.
+
+    Returns:
+        matches (DataFrame): Datos preprocesados.
+        features (list): Lista de columnas de entrada.
+        targets (list): Lista de columnas objetivo ('FTHG', 'FTAG').
+    """
+    if matches is None:
+        matches = load_matches()
+
+    # Ingeniería de características
+    matches['goal_difference'] = matches['FTHG'] - matches['FTAG']
+    matches['HF'], matches['AF'], _ = build_form_features(matches, window=5)
+    matches.fillna(0, inplace=True)
+
+    features = ['HF', 'AF', 'HomeTeam', 'AwayTeam']
+    targets = ['FTHG', 'FTAG']  # Predicciones para ambos equipos
+    return matches, features, targets
+
+# Paso 2: Preprocesar las características
+@instrumented()
+def preprocess_features(matches, features, targets, sparse_float32=False):
+    """
+    Prepara los datos para el modelo: normaliza los datos numéricos y
+    convierte las columnas categóricas a codificaciones one-hot.
+
+    Args:
+        sparse_float32 (bool): Devuelve X como CSR float32 (e y en float32) para
+            alimentar un MLP con entrada dispersa sin densificar el bloque one-hot.
+
+    Returns:
+        X_preprocessed (numpy array): Matriz de características transformadas.
+        y (DataFrame): Valores objetivo.
+        preprocessor (ColumnTransformer): Objeto que encapsula las transformaciones aplicadas.
+    """
+    numeric_features = ['HF', 'AF']
+    categorical_features = ['HomeTeam', 'AwayTeam']
+
+    preprocessor = create_preprocessor(numeric_features, categorical_features, sparse_float32=sparse_float32)
+
+    X = matches[features]
+    y = matches[targets].astype('float32') if sparse_float32 else matches[targets]
+
+    X_preprocessed = preprocessor.fit_transform(X)
+    return X_preprocessed, y, preprocessor
+
+# Paso 3: Construir el modelo
+def build_mlp(input_dim, sparse_input=False):
+    """
+    Define y compila una red neuronal multi-capa (MLP) para predecir
+    los goles de los equipos local y visitante.
+
+    - Tiene tres capas ocultas totalmente conectadas (dense).
+    - Incluye dropout para reducir el sobreajuste.
+
+    Args:
+        input_dim (int): Dimensión de entrada.
+        sparse_input (bool): La entrada es una matriz dispersa; la primera capa
+            multiplica directamente el SparseTensor sin densificarlo.
+
+    Returns:
+        model (Sequential): Modelo MLP compilado.
+    """
+    model = Sequential([
+        Input(shape=(input_dim,), sparse=sparse_input),
+        Dense(128, activation='relu'),
+        Dropout(0.3),
+        Dense(64, activation='relu'),
+        Dropout(0.2),
+        Dense(32, activation='relu'),
+        Dense(2)  # Dos salidas: una para cada equipo
+    ])
+    model.compile(optimizer=Adam(learning_rate=0.001), loss='mean_squared_error', metrics=['mse'])
+    return model
+
+# Paso 4: Predecir goles para un nuevo partido
+def predict_score(preprocessor, model, home_team, away_team):
+    """
+    Realiza una predicción para un nuevo partido entre dos equipos dados.
+
+    Args:
+        preprocessor (ColumnTransformer): Objeto preprocesador para transformar las características.
+        model (Sequential): Modelo entrenado.
+        home_team (str): Nombre del equipo local.
+        away_team (str): Nombre del equipo visitante.
+
+    Returns:
+        predictions (array): Goles predichos para el equipo local y visitante.
+    """
+    new_match = pd.DataFrame({
+        'HF': [1.5],  # Ejemplo de forma
+        'AF': [1.2],
+        'HomeTeam': [home_team],
+        'AwayTeam': [away_team]
+    })
+    new_match_preprocessed = preprocessor.transform(new_match)
+    predictions = model.predict(new_match_preprocessed)
+    return predictions[0]
+
+# Paso 4b: Predecir muchos partidos a la vez
+def predict_fixtures(preprocessor, model, fixtures, form_store):
+    """
+    Predice una jornada completa (o toda la temporada) con un único
+    ``transform`` y un único ``model.predict``.
+
+    Args:
+        preprocessor (ColumnTransformer): Objeto preprocesador para transformar las características.
+        model (Sequential): Modelo entrenado.
+        fixtures: Pares (local, visitante) o DataFrame con HomeTeam/AwayTeam.
+        form_store (TeamFormStore): Forma actual de los equipos.
+
+    Returns:
+        predictions (DataFrame): Goles predichos y resultado ('H', 'D', 'A') por partido.
+    """
+    return fixture_prediction.predict_fixtures(fixtures, preprocessor, model, form_store=form_store)
+
+# Paso 5: Función principal para ejecutar el pipeline completo
+def main(sparse_float32=False, matches=None):
+    """
+    Orquesta todo el flujo de trabajo:
+    - Carga y preprocesa los datos.
+    - Divide los datos en entrenamiento y prueba.
+    - Entrena el modelo de red neuronal.
+    - Evalúa el rendimiento del modelo.
+    - Predice un partido de ejemplo entre dos equipos.
+
+    Args:
+        sparse_float32 (bool): Entrena con la matriz CSR float32 y entrada dispersa.
+        matches (DataFrame): Partidos de entrenamiento; por defecto ``load_matches()``.
+    """
+    # Cargar y preprocesar datos
+    matches, features, targets = load_and_preprocess_data(matches)
+    X, y, preprocessor = preprocess_features(matches, features, targets, sparse_float32=sparse_float32)
+
+    # Dividir en conjuntos de entrenamiento y prueba
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=123)
+
+    # Crear y entrenar modelo
+    input_dim = X_train.shape[1]
+    model = build_mlp(input_dim, sparse_input=sparse_float32)
+    with stage("mlp.fit", rows=X_train.shape[0], epochs=50, batch_size=32):
+        # Con los mismos datos y arquitectura se cargan los pesos de la caché de modelos
+        model = fit_cached(model, X_train, y_train, epochs=50, batch_size=32, validation_split=0.1, verbose=1)
+
+    # Evaluar modelo
+    y_pred = model.predict(X_test)
+    mse = mean_squared_error(y_test, y_pred)
+    print(f"Mean Squared Error: {mse}")
+
+    # Guardar modelo, preprocesador y estado de forma en un único bundle
+    form_store = TeamFormStore.from_matches(matches)
+    save_bundle("mlp_score_predictor.joblib", preprocessor, model, None, form_store,
+                metadata={"model": "MLP", "training_rows": len(matches), "mse": float(mse)})
+    # Exportación sin TensorFlow para los workers de predicción (numpy_inference)
+    export_npz("mlp_score_predictor.npz", preprocessor, model, form_store)
+
+    # Predecir ejemplo
+    home_team = 'Man City'
+    away_team = 'Liverpool'
+    predicted_scores = predict_score(preprocessor, model, home_team, away_team)
+    print(f"Predicted score - {home_team}: {predicted_scores[0]:.2f}, {away_team}: {predicted_scores[1]:.2f}")
+
+    # Predecir en un solo lote todos los cruces de la temporada más reciente
+    seasons = season_code(matches['Date'])
+    teams = matches.loc[seasons == seasons.max(), 'HomeTeam'].unique()
+    season_predictions = predict_fixtures(preprocessor, model, fixture_prediction.season_grid(teams), form_store)
+    print(season_predictions['outcome'].value_counts())
+
+#### MODO EMBEDDINGS + tf.data
+
+# Paso 2b: Codificar equipos como enteros en lugar de one-hot
+class TeamEmbeddingEncoder:
+    """
+    Convierte HF/AF y los nombres de equipo en las entradas del modelo con embeddings.
+
+    Sustituye al ColumnTransformer: los equipos pasan a ser un id entero
+    (0 = equipo desconocido) y HF/AF se normalizan. ``transform`` devuelve un
+    diccionario con las tres entradas del modelo, así que el encoder y el
+    modelo se usan igual que el preprocesador y el MLP en ``model_bundle`` y
+    ``fixture_prediction``.
+    """
+
+    def __init__(self, numeric_features=('HF', 'AF')):
+        self.numeric_features = list(numeric_features)
+        self.teams = []
+        self.scaler = StandardScaler()
+
+    @property
+    def n_teams(self):
+        return len(self.teams)
+
+    def fit(self, X, y=None):
+        self.teams = sorted(pd.unique(X[['HomeTeam', 'AwayTeam']].to_numpy().ravel()))
+        self.scaler.fit(X[self.numeric_features].to_numpy(dtype=np.float32))
+        return self
+
+    def transform(self, X):
+        team_ids = pd.Index(self.teams)
+        return {
+            'numeric': self.scaler.transform(X[self.numeric_features].to_numpy(dtype=np.float32)).astype(np.float32),
+            'home_team': (team_ids.get_indexer(X['HomeTeam']) + 1).astype(np.int32),
+            'away_team': (team_ids.get_indexer(X['AwayTeam']) + 1).astype(np.int32),
+        }
+
+    def partial_fit(self, X, y=None):
+        """Amplía el vocabulario y las medias de HF/AF con un bloque más de partidos."""
+        self.teams = sorted(set(self.teams) | set(pd.unique(X[['HomeTeam', 'AwayTeam']].to_numpy().ravel())))
+        self.scaler.partial_fit(X[self.numeric_features].to_numpy(dtype=np.float32))
+        return self
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X).transform(X)
+
+# Paso 3b: Modelo con embeddings de equipo
+def build_embedding_mlp(n_teams, n_numeric=2, embedding_dim=8):
+    """
+    MLP cuyas entradas de equipo son ids enteros con una tabla de embeddings
+    por rol (local/visitante) en lugar de dos bloques one-hot.
+
+    El número de parámetros crece en ``embedding_dim`` por equipo nuevo (no
+    en 128 como la primera capa densa sobre el one-hot).
+
+    Args:
+        n_teams (int): Equipos del vocabulario (el id 0 se reserva para desconocidos).
+        n_numeric (int): Columnas numéricas (HF, AF).
+        embedding_dim (int): Dimensión de cada embedding.
+
+    Returns:
+        model (Model): Modelo compilado con entradas 'numeric', 'home_team' y 'away_team'.
+    """
+    numeric = Input(shape=(n_numeric,), name='numeric')
+    home_team = Input(shape=(), dtype='int32', name='home_team')
+    away_team = Input(shape=(), dtype='int32', name='away_team')
+
+    home_embedding = Embedding(n_teams + 1, embedding_dim, name='home_embedding')(home_team)
+    away_embedding = Embedding(n_teams + 1, embedding_dim, name='away_embedding')(away_team)
+    x = Concatenate()([numeric, Flatten()(home_embedding), Flatten()(away_embedding)])
+    x = Dense(64, activation='relu')(x)
+    x = Dropout(0.2)(x)
+    x = Dense(32, activation='relu')(x)
+    outputs = Dense(2)(x)  # Dos salidas: una para cada equipo
+
+    model = Model(inputs=[numeric, home_team, away_team], outputs=outputs)
+    model.compile(optimizer=Adam(learning_rate=0.001), loss='mean_squared_error', metrics=['mse'])
+    return model
+
+# Paso 4c: Pipeline tf.data
+def make_dataset(inputs, y=None, batch_size=256, shuffle=False, seed=123):
+    """
+    Dataset tf.data con caché, barajado por época, lotes y prefetch.
+
+    Args:
+        inputs (dict): Salida de ``TeamEmbeddingEncoder.transform``.
+        y (array): Goles (n, 2); None para predecir.
+        batch_size (int): Tamaño de lote.
+        shuffle (bool): Baraja en cada época (entrenamiento).
+    """
+    tensors = inputs if y is None else (inputs, np.asarray(y, dtype=np.float32))
+    dataset = tf.data.Dataset.from_tensor_slices(tensors).cache()
+    if shuffle:
+        dataset = dataset.shuffle(len(inputs['numeric']), seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+# Paso 5b: Entrenamiento con early stopping y checkpoints
+def train_embedding_model(encoder, X_train, y_train, X_valid, y_valid, epochs=200, batch_size=256,
+                          patience=10, embedding_dim=8, checkpoint_dir='checkpoints/mlp_embedding'):
+    """
+    Entrena el modelo con embeddings.
+
+    - ``EarlyStopping`` para cuando la pérdida de validación deja de mejorar y
+      restaura los mejores pesos.
+    - ``ModelCheckpoint`` guarda los mejores pesos en ``checkpoint_dir``.
+    - ``BackupAndRestore`` guarda el estado al final de cada época: si el
+      entrenamiento se interrumpe, volver a llamar a la función continúa desde
+      la última época completada.
+
+    Returns:
+        model (Model): Modelo con los mejores pesos.
+        history (History): Historial de Keras.
+    """
+    train_dataset = make_dataset(encoder.transform(X_train), y_train, batch_size, shuffle=True)
+    valid_dataset = make_dataset(encoder.transform(X_valid), y_valid, batch_size)
+    return fit_embedding_model(encoder, train_dataset, valid_dataset, len(X_train), epochs, batch_size,
+                               patience, embedding_dim, checkpoint_dir)
+
+def fit_embedding_model(encoder, train_dataset, valid_dataset, rows, epochs=200, batch_size=256,
+                        patience=10, embedding_dim=8, checkpoint_dir='checkpoints/mlp_embedding'):
+    """Entrena el modelo con embeddings sobre datasets tf.data ya construidos (ver ``train_embedding_model``)."""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    model = build_embedding_mlp(encoder.n_teams, len(encoder.numeric_features), embedding_dim)
+    callbacks = [
+        EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True),
+        ModelCheckpoint(os.path.join(checkpoint_dir, 'best.weights.h5'), monitor='val_loss',
+                        save_best_only=True, save_weights_only=True),
+        BackupAndRestore(os.path.join(checkpoint_dir, 'backup')),
+    ]
+    with stage("mlp_embedding.fit", rows=rows, max_epochs=epochs, batch_size=batch_size):
+        # El barajado lo hace el propio dataset
+        history = model.fit(train_dataset, validation_data=valid_dataset, epochs=epochs,
+                            callbacks=callbacks, shuffle=False, verbose=2)
+    return model, history
+
+def main_embedding(epochs=200, batch_size=256, checkpoint_dir='checkpoints/mlp_embedding', matches=None):
+    """
+    Igual que ``main`` pero con ids de equipo + embeddings, tf.data, early
+    stopping y checkpoints. Guarda ``mlp_embedding_score_predictor.joblib``.
+    """
+    matches, features, targets = load_and_preprocess_data(matches)
+    X_train, X_test, y_train, y_test = train_test_split(
+        matches[features], matches[targets], test_size=0.2, random_state=123)
+    # Validación para el early stopping (como validation_split=0.1 en main)
+    X_fit, X_valid, y_fit, y_valid = train_test_split(X_train, y_train, test_size=0.1, random_state=123)
+
+    encoder = TeamEmbeddingEncoder().fit(X_fit)
+    model, history = train_embedding_model(encoder, X_fit, y_fit, X_valid, y_valid, epochs, batch_size,
+                                           checkpoint_dir=checkpoint_dir)
+    print(f"Stopped after {len(history.history['loss'])} epochs")
+
+    y_pred = model.predict(make_dataset(encoder.transform(X_test), batch_size=batch_size), verbose=0)
+    mse = mean_squared_error(y_test, y_pred)
+    print(f"Mean Squared Error: {mse}")
+
+    form_store = TeamFormStore.from_matches(matches)
+    save_bundle("mlp_embedding_score_predictor.joblib", encoder, model, None, form_store,
+                metadata={"model": "MLP embeddings", "training_rows": len(matches), "mse": float(mse),
+                          "epochs": len(history.history['loss'])})
+    export_npz("mlp_embedding_score_predictor.npz", encoder, model, form_store)
+
+    seasons = season_code(matches['Date'])
+    teams = matches.loc[seasons == seasons.max(), 'HomeTeam'].unique()
+    season_predictions = predict_fixtures(encoder, model, fixture_prediction.season_grid(teams), form_store)
+    print(season_predictions['outcome'].value_counts())
+
+#### MODO POR BLOQUES (muchas ligas y temporadas)
+
+# Columnas que necesita el modelo con embeddings: el resto ni se lee del Parquet
+STREAM_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']
+
+def iter_feature_chunks(query, chunk_size=100_000, form_store=None):
+    """
+    Partidos con HF/AF por bloques, en orden, sin cargar el histórico completo.
+
+    Args:
+        query (dict): Argumentos de ``match_data.iter_matches`` (leagues, since, until...).
+        form_store (TeamFormStore): Estado donde acumular la forma; al terminar
+            queda con la forma tras el último partido.
+    """
+    form_store = form_store if form_store is not None else TeamFormStore(5)
+    chunks = iter_matches(columns=STREAM_COLUMNS, chunk_size=chunk_size, **query)
+    for chunk in iter_form_features(chunks, form_store):
+        yield chunk.fillna({'HF': 0, 'AF': 0})
+
+def split_labels(n_rows, chunk_number, seed=123):
+    """
+    Reparto fijo de las filas de un bloque: 20 % 'test', 8 % 'valid' (10 % del
+    resto, como en ``main_embedding``) y 'fit'. Depende sólo del número de
+    bloque, así que es el mismo en todas las pasadas.
+    """
+    draws = np.random.default_rng([seed, chunk_number]).random(n_rows)
+    return np.where(draws < 0.2, 'test', np.where(draws < 0.28, 'valid', 'fit'))
+
+def make_streaming_dataset(encoder, query, part, rows=None, chunk_size=100_000, batch_size=256, shuffle_buffer=None,
+                           seed=123):
+    """
+    Dataset tf.data que en cada época vuelve a recorrer los bloques de
+    ``iter_feature_chunks`` y se queda con las filas de ``part``.
+
+    Args:
+        part (str): 'fit', 'valid' o 'test' (ver ``split_labels``).
+        rows (int): Filas de ``part`` si ya se conocen; Keras sabe entonces cuántos lotes tiene cada época.
+        shuffle_buffer (int): Barajado aproximado con un buffer de ese tamaño (entrenamiento).
+    """
+    def generator():
+        for number, chunk in enumerate(iter_feature_chunks(query, chunk_size)):
+            selected = chunk[split_labels(len(chunk), number, seed) == part]
+            yield encoder.transform(selected), selected[['FTHG', 'FTAG']].to_numpy(dtype=np.float32)
+
+    signature = (
+        {'numeric': tf.TensorSpec((None, len(encoder.numeric_features)), tf.float32),
+         'home_team': tf.TensorSpec((None,), tf.int32),
+         'away_team': tf.TensorSpec((None,), tf.int32)},
+        tf.TensorSpec((None, 2), tf.float32),
+    )
+    dataset = tf.data.Dataset.from_generator(generator, output_signature=signature).unbatch()
+    if rows is not None:
+        dataset = dataset.apply(tf.data.experimental.assert_cardinality(rows))
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+def main_embedding_chunked(leagues=None, since=None, until=None, chunk_size=100_000, epochs=200, batch_size=256,
+                           checkpoint_dir='checkpoints/mlp_embedding', skip_missing=False):
+    """
+    ``main_embedding`` sobre muchas ligas y temporadas sin juntar nunca el
+    histórico: cada pasada lee del almacén Parquet sólo las columnas del
+    modelo, por bloques de ``chunk_size`` partidos, y calcula su forma.
+
+    Una primera pasada ajusta el vocabulario de equipos y la normalización de
+    HF/AF (``partial_fit``) y deja la forma final para el bundle; después cada
+    época vuelve a recorrer los bloques. Guarda los mismos ficheros que
+    ``main_embedding``.
+    """
+    query = {'leagues': leagues, 'since': since, 'until': until, 'skip_missing': skip_missing}
+    encoder = TeamEmbeddingEncoder()
+    form_store = TeamFormStore(5)
+    counts = {'fit': 0, 'valid': 0, 'test': 0}
+    first_date = last_date = None
+    with stage("mlp_embedding.scan", chunk_size=chunk_size):
+        for number, chunk in enumerate(iter_feature_chunks(query, chunk_size, form_store)):
+            labels = split_labels(len(chunk), number)
+            if (labels == 'fit').any():
+                encoder.partial_fit(chunk[labels == 'fit'])
+            for part in counts:
+                counts[part] += int((labels == part).sum())
+            first_date = chunk['Date'].min() if first_date is None else min(first_date, chunk['Date'].min())
+            last_date = chunk['Date'].max() if last_date is None else max(last_date, chunk['Date'].max())
+    if not counts['fit']:
+        raise ValueError(f"No matches to train on for {query}")
+    print(f"{sum(counts.values())} matches, {encoder.n_teams} teams ({counts})")
+
+    train_dataset = make_streaming_dataset(encoder, query, 'fit', counts['fit'], chunk_size, batch_size,
+                                           shuffle_buffer=10_000)
+    valid_dataset = make_streaming_dataset(encoder, query, 'valid', counts['valid'], chunk_size, batch_size)
+    model, history = fit_embedding_model(encoder, train_dataset, valid_dataset, counts['fit'], epochs, batch_size,
+                                         checkpoint_dir=checkpoint_dir)
+    print(f"Stopped after {len(history.history['loss'])} epochs")
+
+    mse = model.evaluate(make_streaming_dataset(encoder, query, 'test', counts['test'], chunk_size, batch_size),
+                         verbose=0, return_dict=True)['mse']
+    print(f"Mean Squared Error: {mse}")
+
+    save_bundle("mlp_embedding_score_predictor.joblib", encoder, model, None, form_store,
+                metadata={"model": "MLP embeddings", "training_rows": sum(counts.values()), "mse": float(mse),
+                          "epochs": len(history.history['loss']), "leagues": list(leagues or [DEFAULT_LEAGUE]),
+                          "first_date": str(first_date.date()), "last_date": str(last_date.date())})
+    export_npz("mlp_embedding_score_predictor.npz", encoder, model, form_store)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Paquete versionado con todo lo necesario para predecir sin reentrenar.
+
+Un bundle es un único fichero joblib sin comprimir con el preprocesador
+ajustado, los modelos de goles (dos regresores o uno multi-salida), el
+vocabulario de equipos, el estado de forma (``TeamFormStore``) y metadatos
+del entrenamiento. Al no estar comprimido se carga con ``mmap_mode='r'``:
+los arrays que los modelos usan tal cual (buffers de forma, escalador,
+matriz de entrenamiento de KNN, coeficientes lineales, pesos del MLP) quedan
+mapeados y se comparten en la caché de páginas entre procesos. Los árboles de
+scikit-learn copian sus nodos al deserializarse, pero se leen del mismo
+fichero mapeado, sin descomprimir ni reentrenar.
+
+Cuando la ingesta añade partidos, los bundles afectados se marcan con un
+fichero ``<bundle>.stale`` al lado (``mark_stale``); volver a guardarlo lo borra.
+"""
+
+import datetime
+import json
+import os
+import platform
+
+import joblib
+import numpy as np
+
+from . import fixture_prediction
+
+BUNDLE_FORMAT = "predict_score.model_bundle"
+BUNDLE_VERSION = 1
+STALE_SUFFIX = ".stale"
+
+
+def is_keras_model(model):
+    """True si ``model`` es un modelo Keras (tiene ``get_weights`` y ``to_json``)."""
+    return hasattr(model, "get_weights") and hasattr(model, "to_json")
+
+
+def _pack_model(model):
+    # Los modelos Keras se guardan como arquitectura JSON + lista de pesos numpy
+    if model is not None and is_keras_model(model):
+        return {"keras_json": model.to_json(), "weights": [np.asarray(w) for w in model.get_weights()]}
+    return model
+
+
+def _unpack_model(model):
+    if isinstance(model, dict) and "keras_json" in model:
+        from tensorflow.keras.models import model_from_json
+
+        keras_model = model_from_json(model["keras_json"])
+        keras_model.set_weights(model["weights"])
+        return keras_model
+    return model
+
+
+class ModelBundle:
+    """
+    Modelos de goles listos para predecir, con su preprocesador y estado de forma.
+
+    Attributes:
+        preprocessor (ColumnTransformer): Preprocesador ya ajustado.
+        home_model: Modelo de goles locales, o modelo de dos salidas si ``away_model`` es None.
+        away_model: Modelo de goles visitantes.
+        form_store (TeamFormStore): Forma de los equipos al final del histórico.
+        teams (list): Vocabulario de equipos conocidos.
+        metadata (dict): Versión, fecha, filas de entrenamiento, métricas...
+        stale (dict): Marca de ``mark_stale`` si hay datos más nuevos que el bundle; None si no.
+    """
+
+    def __init__(self, preprocessor, home_model, away_model=None, form_store=None, teams=None, metadata=None):
+        self.preprocessor = preprocessor
+        self.home_model = home_model
+        self.away_model = away_model
+        self.form_store = form_store
+        if teams is None:
+            teams = sorted(form_store.teams) if form_store is not None else []
+        self.teams = list(teams)
+        self.metadata = dict(metadata or {})
+        self.stale = None
+
+    @property
+    def joint(self):
+        return self.away_model is None
+
+    def predict_fixtures(self, fixtures):
+        """Predice muchos partidos a la vez (ver ``fixture_prediction.predict_fixtures``)."""
+        return fixture_prediction.predict_fixtures(
+            fixtures, self.preprocessor, self.home_model, self.away_model, self.form_store)
+
+
+def save_bundle(path, preprocessor, home_model, away_model=None, form_store=None, metadata=None):
+    """
+    Guarda un bundle versionado en ``path``.
+
+    Args:
+        path (str): Fichero de destino (p. ej. 'modelo_rf.joblib').
+        preprocessor (ColumnTransformer): Preprocesador ya ajustado.
+        home_model: Modelo de goles locales (o multi-salida).
+        away_model: Modelo de goles visitantes; None si ``home_model`` predice ambos.
+        form_store (TeamFormStore): Estado de forma tras el último partido.
+        metadata (dict): Metadatos adicionales (temporadas, métricas, ...).
+
+    Returns:
+        ModelBundle: El bundle guardado.
+    """
+    import sklearn
+
+    bundle = ModelBundle(preprocessor, home_model, away_model, form_store, metadata=metadata)
+    bundle.metadata.update({
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "home_model": type(home_model).__name__,
+        "away_model": type(away_model).__name__ if away_model is not None else None,
+        "n_teams": len(bundle.teams),
+        "python": platform.python_version(),
+        "sklearn": sklearn.__version__,
+        "numpy": np.__version__,
+    })
+    payload = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "preprocessor": preprocessor,
+        "home_model": _pack_model(home_model),
+        "away_model": _pack_model(away_model),
+        "form_store": form_store,
+        "teams": bundle.teams,
+        "metadata": bundle.metadata,
+    }
+    # Sin compresión para poder cargarlo con mmap_mode
+    joblib.dump(payload, path, compress=0)
+    clear_stale(path)
+    return bundle
+
+
+def load_bundle(path, mmap_mode="r"):
+    """
+    Carga un bundle guardado con ``save_bundle``.
+
+    Args:
+        path (str): Fichero del bundle.
+        mmap_mode (str): Modo de mapeo de joblib; None carga todo en memoria.
+
+    Returns:
+        ModelBundle: Bundle listo para predecir.
+
+    Raises:
+        ValueError: Si el fichero no es un bundle o su versión no está soportada.
+    """
+    payload = joblib.load(path, mmap_mode=mmap_mode)
+    if not isinstance(payload, dict) or payload.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"{path} is not a model bundle")
+    if payload["version"] > BUNDLE_VERSION:
+        raise ValueError(f"Unsupported bundle version {payload['version']} (max {BUNDLE_VERSION})")
+
+    bundle = ModelBundle(
+        payload["preprocessor"],
+        _unpack_model(payload["home_model"]),
+        _unpack_model(payload["away_model"]),
+        payload["form_store"],
+        teams=payload["teams"],
+        metadata=payload["metadata"],
+    )
+    bundle.stale = stale_info(path)
+    return bundle
+
+
+def _stale_path(path):
+    return f"{os.fspath(path)}{STALE_SUFFIX}"
+
+
+def mark_stale(path, new_matches, teams, last_date=None):
+    """
+    Marca el bundle (o exportación ``.npz``) de ``path`` como desactualizado.
+
+    Las marcas se acumulan hasta que el bundle se vuelve a guardar: el número
+    de partidos nuevos se suma y los equipos afectados se unen.
+
+    Args:
+        path (str): Fichero del bundle.
+        new_matches (int): Partidos añadidos desde que se entrenó.
+        teams (iterable): Equipos con partidos nuevos.
+        last_date (str): Fecha del partido más reciente añadido.
+    """
+    info = stale_info(path) or {"new_matches": 0, "teams": []}
+    info["new_matches"] += int(new_matches)
+    info["teams"] = sorted(set(info["teams"]) | set(teams))
+    info["marked_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    if last_date is not None:
+        info["last_date"] = str(last_date)
+    with open(_stale_path(path), "w") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def stale_info(path):
+    """Marca de ``mark_stale`` del bundle de ``path`` (None si está al día)."""
+    try:
+        with open(_stale_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def clear_stale(path):
+    try:
+        os.remove(_stale_path(path))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""Caché en disco de modelos ya ajustados, direccionada por contenido.
+
+La clave de un modelo es un hash de los datos con los que se ajusta (X e y;
+la lista de columnas va en X o se pasa en ``features``), del estimador (clase
+e hiperparámetros; arquitectura y compilación en Keras), de los argumentos de
+``fit`` y de las versiones de las librerías. Si nada de eso cambia, volver a
+ejecutar un análisis carga el modelo en lugar de reentrenarlo. Los parámetros
+que sólo cambian hilos o mensajes (``n_jobs``, ``verbose``...) no cuentan.
+
+La caché está desactivada por defecto. ``PREDICT_SCORE_MODEL_CACHE`` la
+activa: con una ruta, los modelos se guardan ahí como ``<clave>.joblib``; con
+``on``, en ``models/`` dentro de ``PREDICT_SCORE_CACHE_DIR`` o, si no está
+definida, de la caché del usuario (``~/.cache/predict_score``), nunca dentro
+del paquete. Cuando el total supera ``PREDICT_SCORE_MODEL_CACHE_MB`` (2048 por defecto) se borran
+los usados hace más tiempo: cada acierto actualiza la fecha del fichero.
+Aciertos, fallos y expulsiones se anotan en ``events.log``, también desde los
+procesos del pool de ``evaluation_engine``.
+
+Uso:
+    export PREDICT_SCORE_MODEL_CACHE=on
+    python -m predict_score.model_cache            # estadísticas
+    python -m predict_score.model_cache --clear
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+
+from .model_bundle import is_keras_model
+
+CACHE_ENV = "PREDICT_SCORE_MODEL_CACHE"
+SIZE_ENV = "PREDICT_SCORE_MODEL_CACHE_MB"
+DEFAULT_MAX_MB = 2048
+EVENTS_FILE = "events.log"
+
+# No cambian el modelo ajustado, sólo cómo se entrena o cuánto informa
+IGNORED_PARAMS = ("n_jobs", "thread_count", "nthread", "verbose", "verbosity", "silent", "allow_writing_files")
+
+
+def _strip_names(config):
+    # Keras numera las capas por proceso (dense, dense_1...): el nombre no es parte del modelo
+    if isinstance(config, dict):
+        return {key: _strip_names(value) for key, value in config.items() if key != "name"}
+    if isinstance(config, list):
+        return [_strip_names(value) for value in config]
+    return config
+
+
+def estimator_spec(estimator):
+    """Lo que identifica a un estimador sin ajustar: clase, parámetros y versión de su librería."""
+    module = type(estimator).__module__.split(".")[0]
+    version = getattr(sys.modules.get(module), "__version__", None)
+    spec = {"class": f"{type(estimator).__module__}.{type(estimator).__qualname__}", "version": version}
+    if is_keras_model(estimator):
+        spec["config"] = _strip_names(estimator.get_config())
+        spec["compile"] = _strip_names(estimator.get_compile_config())
+    else:
+        spec["params"] = {key: value for key, value in estimator.get_params(deep=True).items()
+                          if key.split("__")[-1] not in IGNORED_PARAMS}
+    return spec
+
+
+class ModelCache:
+    """
+    Directorio de modelos ajustados con expulsión LRU por tamaño.
+
+    Args:
+        path (str): Directorio de la caché.
+        max_bytes (int): Tamaño máximo de los modelos guardados.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_MB * 2**20):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+
+    def key(self, estimator, X, y=None, features=None, fit_params=None):
+        """Hash de los datos, las columnas, el estimador y los argumentos de ``fit``."""
+        y = None if y is None else np.asarray(y)
+        return joblib.hash({"estimator": estimator_spec(estimator), "X": X, "y": y,
+                            "features": None if features is None else list(features),
+                            "fit_params": fit_params or {}})
+
+    def _model_path(self, key):
+        return os.path.join(self.path, f"{key}.joblib")
+
+    def _log(self, event, key):
+        os.makedirs(self.path, exist_ok=True)
+        # Una línea por evento en modo append: varios procesos pueden escribir a la vez
+        with open(os.path.join(self.path, EVENTS_FILE), "a") as f:
+            f.write(f"{time.time():.3f} {event} {key}\n")
+
+    def get(self, key, like=None):
+        """
+        Modelo guardado con ``key`` o None.
+
+        Args:
+            like: Modelo Keras con la misma arquitectura; recibe los pesos guardados
+                (y conserva su compilación) en lugar de reconstruirse.
+        """
+        path = self._model_path(key)
+        try:
+            stored = joblib.load(path)
+            os.utime(path)
+        except (FileNotFoundError, EOFError):
+            self._log("miss", key)
+            return None
+        self._log("hit", key)
+        if isinstance(stored, dict) and "keras_weights" in stored:
+            like.set_weights(stored["keras_weights"])
+            return like
+        return stored
+
+    def put(self, key, model):
+        os.makedirs(self.path, exist_ok=True)
+        if is_keras_model(model):
+            model = {"keras_weights": [np.asarray(w) for w in model.get_weights()]}
+        path = self._model_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """(ruta, bytes, fecha de último uso) de cada modelo guardado."""
+        entries = []
+        for name in os.listdir(self.path) if os.path.isdir(self.path) else []:
+            if name.endswith(".joblib"):
+                try:
+                    stat = os.stat(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((os.path.join(self.path, name), stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """Borra los modelos usados hace más tiempo hasta quedar por debajo de ``max_bytes``."""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self._log("evict", os.path.basename(path)[:-len(".joblib")])
+
+    def stats(self, since=None):
+        """
+        Aciertos, fallos y expulsiones (desde ``since``, en segundos de época) y ocupación actual.
+        """
+        counts = {"hits": 0, "misses": 0, "evictions": 0}
+        names = {"hit": "hits", "miss": "misses", "evict": "evictions"}
+        events_path = os.path.join(self.path, EVENTS_FILE)
+        if os.path.exists(events_path):
+            with open(events_path) as f:
+                for line in f:
+                    stamp, event, _ = line.split(" ", 2)
+                    if since is None or float(stamp) >= since:
+                        counts[names[event]] += 1
+        entries = self.entries()
+        lookups = counts["hits"] + counts["misses"]
+        counts.update(hit_rate=counts["hits"] / lookups if lookups else 0.0, models=len(entries),
+                      bytes=sum(size for _, size, _ in entries))
+        return counts
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.remove(path)
+        if os.path.exists(os.path.join(self.path, EVENTS_FILE)):
+            os.remove(os.path.join(self.path, EVENTS_FILE))
+
+
+def _user_cache_dir():
+    path = os.environ.get("PREDICT_SCORE_CACHE_DIR")
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "predict_score")
+
+
+def default_cache():
+    """Caché configurada por variables de entorno, o None si está desactivada (por defecto)."""
+    path = os.environ.get(CACHE_ENV, "")
+    if path.lower() in ("", "0", "off", "false", "no"):
+        return None
+    if path.lower() in ("1", "on", "true", "yes"):
+        path = os.path.join(_user_cache_dir(), "models")
+    return ModelCache(path, int(float(os.environ.get(SIZE_ENV, DEFAULT_MAX_MB)) * 2**20))
+
+
+def fit_cached(estimator, X, y, cache=None, features=None, **fit_params):
+    """
+    Ajusta ``estimator`` o, si ya se ajustó con lo mismo, lo carga de la caché.
+
+    Args:
+        estimator: Estimador sin ajustar (scikit-learn, XGBoost, CatBoost o Keras compilado).
+        cache (ModelCache): Por defecto ``default_cache()`` (None, sin caché, salvo que
+            se active con ``PREDICT_SCORE_MODEL_CACHE``); False la salta.
+        features (list): Columnas de X, si X es una matriz sin nombres.
+        **fit_params: Argumentos de ``fit`` (p. ej. ``epochs`` en Keras).
+
+    Returns:
+        El estimador ajustado (el cargado de la caché si había acierto).
+    """
+    cache = default_cache() if cache is None else cache
+    if not cache:
+        estimator.fit(X, y, **fit_params)
+        return estimator
+    key = cache.key(estimator, X, y, features, fit_params)
+    model = cache.get(key, like=estimator)
+    if model is not None:
+        return model
+    estimator.fit(X, y, **fit_params)
+    cache.put(key, estimator)
+    return estimator
+
+
+class CachedEstimator(RegressorMixin, BaseEstimator):
+    """
+    Envuelve un estimador (p. ej. un Pipeline) para que ``fit`` pase por ``fit_cached``.
+
+    Attributes:
+        estimator_: El estimador ajustado (o cargado de la caché).
+    """
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+
+    def fit(self, X, y, **fit_params):
+        self.estimator_ = fit_cached(clone(self.estimator), X, y, **fit_params)
+        return self
+
+    def predict(self, X):
+        return self.estimator_.predict(X)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fitted-model cache statistics")
+    parser.add_argument("--clear", action="store_true", help="delete every cached model and the event log")
+    args = parser.parse_args(argv)
+
+    cache = default_cache()
+    if cache is None:
+        sys.exit(f"The model cache is disabled (set {CACHE_ENV}=on or to a directory)")
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(f"{cache.path}: {stats['models']} models, {stats['bytes'] / 2**20:.1f} MB "
+          f"(limit {cache.max_bytes / 2**20:.0f} MB)")
+    print(f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+          f"{stats['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    main()
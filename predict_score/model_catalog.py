@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Catálogo de regresores que compara ``evaluate_models``.
+
+Vive en su propio módulo para que el motor de evaluación, los benchmarks y
+el resto de herramientas usen exactamente los mismos modelos e hiperparámetros.
+XGBoost y CatBoost se importan al construir los modelos, no al importar el módulo.
+"""
+
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor, StackingRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+# Estimadores base del StackingRegressor: alias -> modelo del catálogo
+STACKING_BASE_MODELS = {"lr": "Linear Regression", "rf": "Random Forest", "gb": "Gradient Boosting"}
+
+
+def build_models(params=None):
+    """
+    Devuelve los regresores sin ajustar, en el orden en que se reportan.
+
+    Args:
+        params (dict): Nombre del modelo -> hiperparámetros que sustituyen a los
+            de por defecto (p. ej. ``tuning.load_tuned_params()``).
+
+    Returns:
+        models (dict): Nombre del modelo -> estimador.
+    """
+    from catboost import CatBoostRegressor
+    from xgboost import XGBRegressor
+
+    models = {
+        "Linear Regression": LinearRegression(),
+        "Random Forest": RandomForestRegressor(n_estimators=100, random_state=42),
+        "Gradient Boosting": GradientBoostingRegressor(random_state=42),
+        "Decision Tree (no max_depth)": DecisionTreeRegressor(random_state=42),
+        "Decision Tree (max_depth=3)": DecisionTreeRegressor(max_depth=3, random_state=42),
+        "KNeighbors (default)": KNeighborsRegressor(),
+        "KNeighbors (n_neighbors=5)": KNeighborsRegressor(n_neighbors=5),
+        "XGBRegressor": XGBRegressor(random_state=42, verbosity=0),
+        # allow_writing_files=False: sin catboost_info/ en el directorio de trabajo
+        "CatBoostRegressor": CatBoostRegressor(random_state=42, silent=True, allow_writing_files=False),
+    }
+
+    # Add StackingRegressor
+    estimators = [(alias, clone(models[name])) for alias, name in STACKING_BASE_MODELS.items()]
+    models["Stacking Regressor"] = StackingRegressor(estimators=estimators, final_estimator=LinearRegression())
+
+    for name, overrides in (params or {}).items():
+        if name in models:
+            models[name].set_params(**overrides)
+    return models
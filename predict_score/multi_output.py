@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Modo multi-salida: un único modelo predice los goles local y visitante.
+
+Random Forest, árboles de decisión, KNN y la regresión lineal admiten varias
+salidas de forma nativa (un solo bosque / árbol / índice de vecinos para las
+dos columnas). El resto (Gradient Boosting, XGBoost, CatBoost, Stacking) se
+envuelve en ``MultiOutputRegressor``, que sigue siendo un solo objeto a
+serializar y una sola llamada a ``predict``.
+"""
+
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+GOAL_TARGETS = ["FTHG", "FTAG"]
+
+NATIVE_MULTIOUTPUT = (
+    RandomForestRegressor,
+    ExtraTreesRegressor,
+    DecisionTreeRegressor,
+    KNeighborsRegressor,
+    LinearRegression,
+)
+
+
+def supports_multioutput(estimator):
+    return isinstance(estimator, NATIVE_MULTIOUTPUT + (MultiOutputRegressor,))
+
+
+def make_multioutput(estimator):
+    """
+    Devuelve un estimador que acepta ``y`` con dos columnas (FTHG, FTAG).
+
+    Args:
+        estimator: Regresor sin ajustar.
+
+    Returns:
+        El propio estimador si es multi-salida nativo o un ``MultiOutputRegressor``.
+    """
+    if supports_multioutput(estimator):
+        return estimator
+    return MultiOutputRegressor(estimator)
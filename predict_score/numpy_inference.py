@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""Exportación del MLP de goles a ``.npz`` e inferencia sólo con NumPy.
+
+``export_npz`` guarda en un único ``.npz`` los pesos de las capas densas (y
+de los embeddings si es el modelo de ``main_embedding``), la media y escala
+de HF/AF, el vocabulario de equipos y la forma actual de cada equipo.
+``NumpyScorePredictor`` reproduce el forward pass con NumPy: la capa one-hot
+se resuelve como una suma de filas de la primera matriz de pesos en lugar de
+multiplicar por la matriz dispersa. Cargar el ``.npz`` y predecir no importa
+TensorFlow ni scikit-learn.
+
+Uso:
+    predictor = NumpyScorePredictor.load("mlp_score_predictor.npz")
+    predictor.predict_fixtures([("Man City", "Liverpool"), ("Arsenal", "Chelsea")])
+"""
+
+import numpy as np
+
+from . import fixture_prediction
+from .model_bundle import clear_stale, stale_info
+
+NPZ_FORMAT = "predict_score.numpy_mlp"
+NPZ_VERSION = 1
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+}
+
+
+def _dense_layers(model):
+    layers = []
+    for layer in model.layers:
+        if type(layer).__name__ == "Dense":
+            kernel, bias = layer.get_weights()
+            layers.append((kernel.astype(np.float32), bias.astype(np.float32), layer.get_config()["activation"]))
+    return layers
+
+
+def _one_hot_parameters(preprocessor):
+    """Escalador y vocabularios de un ColumnTransformer ('num' + 'cat') ya ajustado."""
+    params = {}
+    offset = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "num":
+            scaler = transformer.named_steps["scaler"] if hasattr(transformer, "named_steps") else transformer
+            params["numeric_features"] = np.array(columns)
+            params["numeric_mean"] = scaler.mean_.astype(np.float32)
+            params["numeric_scale"] = scaler.scale_.astype(np.float32)
+            offset += len(columns)
+        elif name == "cat":
+            for column, categories in zip(columns, transformer.categories_):
+                key = "home" if column == "HomeTeam" else "away"
+                params[f"{key}_teams"] = np.array(categories, dtype=str)
+                params[f"{key}_offset"] = np.int64(offset)
+                offset += len(categories)
+    return params
+
+
+def export_npz(path, preprocessor, model, form_store=None):
+    """
+    Exporta el MLP de ``mlp`` (one-hot o embeddings) a ``.npz``.
+
+    Args:
+        path (str): Fichero de destino.
+        preprocessor: ColumnTransformer ajustado o ``TeamEmbeddingEncoder``.
+        model: Modelo Keras entrenado (``mlp.build_mlp`` o ``mlp.build_embedding_mlp``).
+        form_store (TeamFormStore): Forma actual; permite predecir sólo con los nombres.
+    """
+    arrays = {"format": np.array(NPZ_FORMAT), "version": np.int64(NPZ_VERSION)}
+    dense = _dense_layers(model)
+
+    if hasattr(preprocessor, "transformers_"):
+        params = _one_hot_parameters(preprocessor)
+        kernel = dense[0][0]
+        n_numeric = len(params["numeric_features"])
+        # La primera capa se parte en bloques: numérico, one-hot local y one-hot visitante
+        home_offset, away_offset = int(params.pop("home_offset")), int(params.pop("away_offset"))
+        arrays.update(params)
+        arrays["kind"] = np.array("one_hot")
+        arrays["numeric_kernel"] = kernel[:n_numeric]
+        arrays["home_table"] = kernel[home_offset:home_offset + len(params["home_teams"])]
+        arrays["away_table"] = kernel[away_offset:away_offset + len(params["away_teams"])]
+        arrays["first_bias"] = dense[0][1]
+        arrays["first_activation"] = np.array(dense[0][2])
+        dense = dense[1:]
+    else:
+        teams = np.array(preprocessor.teams, dtype=str)
+        arrays.update({
+            "kind": np.array("embedding"),
+            "numeric_features": np.array(preprocessor.numeric_features),
+            "numeric_mean": preprocessor.scaler.mean_.astype(np.float32),
+            "numeric_scale": preprocessor.scaler.scale_.astype(np.float32),
+            "home_teams": teams,
+            "away_teams": teams,
+            # La fila 0 es el id de equipo desconocido
+            "home_table": model.get_layer("home_embedding").get_weights()[0].astype(np.float32),
+            "away_table": model.get_layer("away_embedding").get_weights()[0].astype(np.float32),
+        })
+
+    for i, (kernel, bias, activation) in enumerate(dense):
+        arrays[f"dense_{i}_kernel"] = kernel
+        arrays[f"dense_{i}_bias"] = bias
+        arrays[f"dense_{i}_activation"] = np.array(activation)
+    arrays["n_dense"] = np.int64(len(dense))
+
+    if form_store is not None:
+        form_teams = list(form_store.teams)
+        arrays["form_teams"] = np.array(form_teams, dtype=str)
+        arrays["form_home"] = np.array([form_store.home_form(team) for team in form_teams], dtype=np.float32)
+        arrays["form_away"] = np.array([form_store.away_form(team) for team in form_teams], dtype=np.float32)
+
+    np.savez_compressed(path, **arrays)
+    clear_stale(path)
+
+
+class FormSnapshot:
+    """Forma HF/AF congelada en la exportación (misma interfaz que ``TeamFormStore`` para predecir)."""
+
+    def __init__(self, teams, home_form, away_form):
+        self.teams = {team: i for i, team in enumerate(teams)}
+        self._home = home_form
+        self._away = away_form
+
+    def __contains__(self, team):
+        return team in self.teams
+
+    def __len__(self):
+        return len(self.teams)
+
+    def home_form(self, team):
+        index = self.teams.get(team)
+        return 0.0 if index is None else float(self._home[index])
+
+    def away_form(self, team):
+        index = self.teams.get(team)
+        return 0.0 if index is None else float(self._away[index])
+
+
+class NumpyScorePredictor:
+    """
+    Forward pass del MLP de goles con NumPy.
+
+    Hace de preprocesador y de modelo a la vez (``transform`` + ``predict``),
+    así que funciona con ``fixture_prediction.predict_fixtures`` y con
+    ``prediction_server`` igual que un ``ModelBundle``.
+    """
+
+    def __init__(self, arrays):
+        self.kind = str(arrays["kind"])
+        self.numeric_features = [str(name) for name in arrays["numeric_features"]]
+        self.mean = arrays["numeric_mean"]
+        self.scale = arrays["numeric_scale"]
+        self.home_index = {team: i for i, team in enumerate(arrays["home_teams"].tolist())}
+        self.away_index = {team: i for i, team in enumerate(arrays["away_teams"].tolist())}
+        self.home_table = arrays["home_table"]
+        self.away_table = arrays["away_table"]
+        if self.kind == "one_hot":
+            self.numeric_kernel = arrays["numeric_kernel"]
+            self.first_bias = arrays["first_bias"]
+            self.first_activation = str(arrays["first_activation"])
+        self.dense = [(arrays[f"dense_{i}_kernel"], arrays[f"dense_{i}_bias"], str(arrays[f"dense_{i}_activation"]))
+                      for i in range(int(arrays["n_dense"]))]
+        self.form_store = None
+        self.stale = None
+        if "form_teams" in arrays:
+            self.form_store = FormSnapshot(arrays["form_teams"].tolist(), arrays["form_home"], arrays["form_away"])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        if str(arrays.get("format")) != NPZ_FORMAT:
+            raise ValueError(f"{path} is not an exported score MLP")
+        if int(arrays["version"]) > NPZ_VERSION:
+            raise ValueError(f"Unsupported export version {int(arrays['version'])} (max {NPZ_VERSION})")
+        predictor = cls(arrays)
+        predictor.stale = stale_info(path)
+        return predictor
+
+    def _team_rows(self, table, index, teams, unknown_row):
+        rows = np.array([index.get(team, -1) for team in teams], dtype=np.int64)
+        if unknown_row is None:
+            # One-hot con handle_unknown='ignore': un equipo desconocido no aporta nada
+            known = rows >= 0
+            block = np.zeros((len(rows), table.shape[1]), dtype=np.float32)
+            block[known] = table[rows[known]]
+            return block
+        return table[np.where(rows >= 0, rows + 1, unknown_row)]
+
+    def transform(self, features):
+        return features
+
+    def predict(self, features):
+        """
+        Goles local y visitante para un DataFrame con HF, AF, HomeTeam y AwayTeam.
+
+        Returns:
+            ndarray: Matriz (n, 2) float32.
+        """
+        numeric = (features[self.numeric_features].to_numpy(dtype=np.float32) - self.mean) / self.scale
+        if self.kind == "one_hot":
+            x = (numeric @ self.numeric_kernel
+                 + self._team_rows(self.home_table, self.home_index, features["HomeTeam"], None)
+                 + self._team_rows(self.away_table, self.away_index, features["AwayTeam"], None)
+                 + self.first_bias)
+            x = ACTIVATIONS[self.first_activation](x)
+        else:
+            x = np.concatenate([
+                numeric,
+                self._team_rows(self.home_table, self.home_index, features["HomeTeam"], 0),
+                self._team_rows(self.away_table, self.away_index, features["AwayTeam"], 0),
+            ], axis=1)
+        for kernel, bias, activation in self.dense:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+    def predict_fixtures(self, fixtures):
+        """Igual que ``ModelBundle.predict_fixtures``, con la forma guardada en la exportación."""
+        return fixture_prediction.predict_fixtures(fixtures, self, self, None, self.form_store)
+
+    def predict_score(self, home_team, away_team):
+        """Goles predichos (local, visitante) para un partido."""
+        goals = self.predict_fixtures([(home_team, away_team)])
+        return goals.loc[0, "home_goals"], goals.loc[0, "away_goals"]
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""Cuotas de las casas de apuestas: probabilidades implícitas y apuestas de valor.
+
+Los CSV de football-data.co.uk traen decenas de columnas de cuotas (B365H,
+PSCH, MaxA, AvgC>2.5, BFEAHH...) que los cargadores no leen. Aquí cada
+mercado se convierte en una matriz ``(partidos, casas, resultados)``:
+
+- ``1x2``: victoria local, empate y victoria visitante (``<casa>[C]H/D/A``);
+- ``ou25``: más y menos de 2,5 goles (``<casa>[C]>2.5`` / ``<2.5``);
+- ``ah``: hándicap asiático local y visitante (``<casa>[C]AHH`` / ``AHA``,
+  con la línea en ``AHh`` / ``AHCh``).
+
+La ``C`` marca las cuotas de cierre. Sobre esas matrices, sin bucles por
+partido ni por casa, se calculan las probabilidades implícitas (``1 / cuota``),
+el margen de cada casa (``overround``), las probabilidades sin margen
+(normalizando o con el método de la potencia) y la probabilidad de consenso,
+la media de las casas que cotizan cada partido. ``scan_value`` compara las
+probabilidades de un modelo con la mejor cuota disponible y marca los
+partidos con valor esperado positivo.
+
+Las columnas de máximos y medias (``Max``, ``Avg``, ``BbMx``, ``BbAv``) no son
+casas: no entran en el consenso salvo que no haya ninguna otra.
+
+Uso:
+    python -m predict_score.odds --leagues E0 --since 2020-08-01
+    python -m predict_score.odds --fixtures fixtures.csv --bundle modelo_rf.joblib
+"""
+
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import poisson
+
+from .season_simulation import match_outcome_probabilities, poisson_rates
+
+# Prefijos de football-data; los más largos primero para que 'BFE' no se lea como 'BF' + 'E'
+BOOKMAKERS = [
+    "1XB", "B365", "BFD", "BFE", "BMGM", "BbAv", "BbMx", "Avg", "Max", "BF", "BS", "BV", "BW", "CL", "GB", "IW",
+    "LB", "PS", "SB", "SJ", "SO", "SY", "VC", "WH", "P",
+]
+AGGREGATES = ("Max", "Avg", "BbMx", "BbAv")
+
+_BOOK = "|".join(sorted(BOOKMAKERS, key=len, reverse=True))
+# Mercado -> (expresión de las columnas, sufijo de cada resultado, nombres de los resultados)
+MARKETS = {
+    "1x2": (re.compile(rf"^({_BOOK})(C?)([HDA])$"), ("H", "D", "A"), ("H", "D", "A")),
+    "ou25": (re.compile(rf"^({_BOOK})(C?)([<>])2\.5$"), (">", "<"), ("Over", "Under")),
+    "ah": (re.compile(rf"^({_BOOK})(C?)AH([HA])$"), ("H", "A"), ("Home", "Away")),
+}
+# Línea del hándicap asiático (común a todas las casas), de apertura y de cierre
+AH_LINES = {False: ("AHh", "BbAHh"), True: ("AHCh",)}
+
+
+def odds_columns(columns, market="1x2", closing=False):
+    """
+    Columnas de cuotas de un mercado, agrupadas por casa.
+
+    Args:
+        columns (iterable): Columnas disponibles (p. ej. ``matches.columns``).
+        market (str): '1x2', 'ou25' o 'ah'.
+        closing (bool): Cuotas de cierre (``B365CH``...) en lugar de las de apertura.
+
+    Returns:
+        dict: Casa -> lista de columnas en el orden de los resultados (None si falta alguna).
+    """
+    pattern, suffixes, _ = MARKETS[market]
+    books = {}
+    for column in columns:
+        match = pattern.match(str(column))
+        if match and bool(match.group(2)) == closing:
+            books.setdefault(match.group(1), [None] * len(suffixes))[suffixes.index(match.group(3))] = column
+    return {book: columns for book, columns in books.items() if None not in columns}
+
+
+class OddsMatrix:
+    """
+    Cuotas de un mercado como matriz ``(partidos, casas, resultados)``.
+
+    Attributes:
+        market (str): Mercado ('1x2', 'ou25' o 'ah').
+        books (list): Casas, en el orden del segundo eje.
+        outcomes (tuple): Resultados, en el orden del tercer eje.
+        odds (array): Cuotas decimales en float64; NaN donde la casa no cotiza.
+        index (Index): Índice de los partidos.
+        line (array): Línea del hándicap asiático de cada partido (sólo 'ah').
+    """
+
+    def __init__(self, market, books, outcomes, odds, index, line=None):
+        self.market = market
+        self.books = list(books)
+        self.outcomes = tuple(outcomes)
+        self.odds = odds
+        self.index = index
+        self.line = line
+
+    @classmethod
+    def from_matches(cls, matches, market="1x2", closing=False):
+        """Lee todas las casas de ``matches`` en una sola copia de las columnas."""
+        books = odds_columns(matches.columns, market, closing)
+        outcomes = MARKETS[market][2]
+        columns = [column for book_columns in books.values() for column in book_columns]
+        values = matches[columns].to_numpy(dtype=float) if columns else np.empty((len(matches), 0))
+        # Cuotas <= 1 son huecos o errores de la fuente
+        odds = np.where(values > 1.0, values, np.nan).reshape(len(matches), len(books), len(outcomes))
+        line = None
+        if market == "ah":
+            line_columns = [column for column in AH_LINES[closing] if column in matches]
+            line = matches[line_columns[0]].to_numpy(dtype=float) if line_columns else np.full(len(matches), np.nan)
+        return cls(market, books, outcomes, odds, matches.index, line)
+
+    def _book_mask(self, books):
+        return np.isin(self.books, books)
+
+    def implied_probabilities(self):
+        """``1 / cuota`` para cada partido, casa y resultado."""
+        return 1.0 / self.odds
+
+    def overround(self):
+        """
+        Margen de cada casa en cada partido (suma de probabilidades implícitas - 1),
+        NaN si no cotiza todos los resultados. Matriz (partidos, casas).
+        """
+        return self.implied_probabilities().sum(axis=2) - 1.0
+
+    def fair_probabilities(self, method="basic", iterations=20, tolerance=1e-10):
+        """
+        Probabilidades sin el margen de la casa.
+
+        Args:
+            method (str): 'basic' divide por la suma de probabilidades implícitas;
+                'power' eleva cada una a la ``k`` que hace que sumen 1 (quita más
+                margen a las cuotas altas, donde las casas lo cargan más).
+            iterations (int): Pasos máximos de Newton del método de la potencia.
+            tolerance (float): Error de la suma a partir del cual se para.
+
+        Returns:
+            array: (partidos, casas, resultados).
+        """
+        implied = self.implied_probabilities()
+        if method == "basic":
+            return implied / implied.sum(axis=2, keepdims=True)
+        if method != "power":
+            raise ValueError(f"Unknown margin method: {method!r}")
+        # Newton sobre k en sum(p ** k) = 1, con todos los pares partido-casa cotizados a la vez
+        quoted = ~np.isnan(implied).any(axis=2)
+        log_p = np.log(implied[quoted])
+        # Arranque exacto si todas las probabilidades fueran iguales: n * (suma / n) ** k = 1
+        n = implied.shape[2]
+        k = np.log(n) / np.log(n / np.exp(log_p).sum(axis=1, keepdims=True))
+        # Cuando quedan menos de la mitad de pares sin converger se sigue sólo con ésos
+        rows, k_rows, log_rows = None, k, log_p
+        for _ in range(iterations):
+            powered = np.exp(k_rows * log_rows)
+            error = powered.sum(axis=1, keepdims=True) - 1.0
+            pending = np.abs(error[:, 0]) >= tolerance
+            if not pending.any():
+                break
+            k_rows -= error / (powered * log_rows).sum(axis=1, keepdims=True)
+            if rows is not None:
+                k[rows] = k_rows
+            if pending.mean() < 0.5:
+                rows = np.flatnonzero(pending) if rows is None else rows[pending]
+                k_rows, log_rows = k[rows], log_p[rows]
+        fair = np.full(implied.shape, np.nan)
+        fair[quoted] = np.exp(k * log_p)
+        return fair
+
+    def consensus(self, method="basic"):
+        """
+        Probabilidad de consenso: media de las probabilidades sin margen de las
+        casas que cotizan cada partido (las columnas de máximos y medias sólo
+        cuentan en los partidos sin ninguna casa).
+
+        Returns:
+            DataFrame: Una columna por resultado más ``books`` (casas usadas) y
+            ``overround`` (margen medio de esas casas).
+        """
+        fair = self.fair_probabilities(method)
+        overround = self.overround()
+        quoted = ~np.isnan(overround)
+        individual = quoted & ~self._book_mask(AGGREGATES)
+        fallback = quoted & self._book_mask(("Avg", "BbAv"))
+        used = np.where(individual.any(axis=1, keepdims=True), individual, fallback)
+        books = used.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            probabilities = np.where(used[:, :, None], fair, 0.0).sum(axis=1) / books[:, None]
+            margin = np.where(used, overround, 0.0).sum(axis=1) / books
+        frame = pd.DataFrame(probabilities, columns=list(self.outcomes), index=self.index)
+        frame["books"] = books
+        frame["overround"] = margin
+        if self.line is not None:
+            frame["line"] = self.line
+        return frame
+
+    def best_odds(self):
+        """
+        Mejor cuota de cada resultado y la casa que la ofrece. Las medias
+        (``Avg``, ``BbAv``) no se pueden apostar y no cuentan.
+
+        Returns:
+            odds (array): (partidos, resultados), NaN si nadie cotiza.
+            books (array): Casa de cada mejor cuota ('Max' = la columna de máximos).
+        """
+        averages = self._book_mask(("Avg", "BbAv"))[None, :, None]
+        odds = np.where(np.isnan(self.odds) | averages, -np.inf, self.odds)
+        best = odds.argmax(axis=1)
+        values = np.take_along_axis(odds, best[:, None, :], axis=1)[:, 0, :]
+        books = np.asarray(self.books + [None], dtype=object)[np.where(np.isfinite(values), best, -1)]
+        return np.where(np.isfinite(values), values, np.nan), books
+
+    def summary(self):
+        """Margen medio, mediano y número de partidos cotizados por casa."""
+        overround = self.overround()
+        quoted = ~np.isnan(overround)
+        with np.errstate(invalid="ignore"):
+            table = pd.DataFrame({"matches": quoted.sum(axis=0),
+                                  "mean_overround": np.nanmean(np.where(quoted, overround, np.nan), axis=0),
+                                  "median_overround": np.nanmedian(np.where(quoted, overround, np.nan), axis=0)},
+                                 index=pd.Index(self.books, name="Book"))
+        return table[table["matches"] > 0].sort_values("mean_overround")
+
+
+def implied_probabilities(matches, market="1x2", closing=False, method="basic"):
+    """
+    Probabilidades de consenso sin margen de todos los partidos de ``matches``.
+
+    Atajo de ``OddsMatrix.from_matches(...).consensus(method)``.
+    """
+    return OddsMatrix.from_matches(matches, market, closing).consensus(method)
+
+
+def model_probabilities(predictions, market="1x2"):
+    """
+    Probabilidades de un modelo de goles para un mercado.
+
+    Args:
+        predictions (DataFrame): Con H/D/A (1x2) u Over/Under (ou25) ya calculadas
+            (p. ej. ``ratings.DixonColes.outcome_probabilities``), o con
+            ``home_goals``/``away_goals`` (``predict_fixtures``), que se tratan
+            como tasas de Poisson independientes.
+
+    Returns:
+        array: (partidos, resultados).
+    """
+    outcomes = list(MARKETS[market][2])
+    if set(outcomes) <= set(predictions.columns):
+        return predictions[outcomes].to_numpy(dtype=float)
+    if market == "1x2":
+        return match_outcome_probabilities(predictions)[outcomes].to_numpy()
+    if market != "ou25":
+        raise ValueError(f"Goal predictions cannot be priced for the {market!r} market")
+    home, away, _ = poisson_rates(predictions)
+    under = poisson.cdf(2, home + away)
+    return np.column_stack([1.0 - under, under])
+
+
+def scan_value(predictions, matches, market="1x2", closing=False, min_edge=0.05, method="basic"):
+    """
+    Apuestas con valor: resultados en los que la probabilidad del modelo por la
+    mejor cuota disponible supera 1 + ``min_edge``.
+
+    Args:
+        predictions (DataFrame): Probabilidades o goles del modelo (ver
+            ``model_probabilities``), fila a fila con ``matches``.
+        matches (DataFrame): Partidos con HomeTeam, AwayTeam y las columnas de cuotas.
+        market (str): '1x2' u 'ou25'.
+        closing (bool): Usa las cuotas de cierre.
+        min_edge (float): Valor esperado mínimo por unidad apostada.
+        method (str): Método de ``fair_probabilities`` del consenso.
+
+    Returns:
+        DataFrame: Una fila por apuesta marcada (de más a menos valor) con el
+        partido, el resultado, la probabilidad del modelo y la de consenso, la
+        mejor cuota y su casa, el valor esperado (``edge``) y la fracción de Kelly.
+
+    Raises:
+        ValueError: Si ``predictions`` y ``matches`` no tienen las mismas filas o
+            ``matches`` no trae cuotas del mercado.
+    """
+    if len(predictions) != len(matches):
+        raise ValueError(f"{len(predictions)} predictions for {len(matches)} matches")
+    matrix = OddsMatrix.from_matches(matches, market, closing)
+    if not matrix.books:
+        raise ValueError(f"no {market} {'closing ' if closing else ''}odds columns in matches")
+    model = model_probabilities(predictions, market)
+    consensus = matrix.consensus(method)[list(matrix.outcomes)].to_numpy()
+    odds, books = matrix.best_odds()
+    with np.errstate(invalid="ignore"):
+        edge = model * odds - 1.0
+        rows, outcomes = np.nonzero(edge > min_edge)
+
+    flagged = pd.DataFrame({
+        "HomeTeam": matches["HomeTeam"].to_numpy()[rows],
+        "AwayTeam": matches["AwayTeam"].to_numpy()[rows],
+        "outcome": np.asarray(matrix.outcomes)[outcomes],
+        "model_probability": model[rows, outcomes],
+        "consensus_probability": consensus[rows, outcomes],
+        "odds": odds[rows, outcomes],
+        "book": books[rows, outcomes],
+        "edge": edge[rows, outcomes],
+        "kelly": edge[rows, outcomes] / (odds[rows, outcomes] - 1.0),
+    }, index=matches.index[rows])
+    if "Date" in matches:
+        flagged.insert(0, "Date", matches["Date"].to_numpy()[rows])
+    return flagged.sort_values("edge", ascending=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bookmaker margins, consensus probabilities and value bets")
+    parser.add_argument("--leagues", nargs="+", help="league codes (default: the default seasons)")
+    parser.add_argument("--since", help="first match date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last match date (YYYY-MM-DD)")
+    parser.add_argument("--market", choices=list(MARKETS), default="1x2")
+    parser.add_argument("--closing", action="store_true", help="use closing odds")
+    parser.add_argument("--method", choices=["basic", "power"], default="basic", help="margin removal")
+    parser.add_argument("--fixtures", help="fixtures CSV with odds columns (football-data fixtures.csv)")
+    parser.add_argument("--bundle", help="model bundle (.joblib) or MLP export (.npz) for --fixtures; "
+                                         "default: Dixon-Coles fitted on the history")
+    parser.add_argument("--min-edge", type=float, default=0.05, help="minimum expected value per unit staked")
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        fixtures = pd.read_csv(args.fixtures)
+        try:
+            if args.bundle:
+                from .cli import load_predictor
+
+                predictions = load_predictor(args.bundle).predict_fixtures(fixtures)
+            else:
+                from .match_data import load_matches
+                from .ratings import DixonColes
+
+                model = DixonColes().fit(load_matches())
+                # Dixon-Coles da H/D/A con su corrección; para más/menos goles bastan λ y μ
+                predictions = (model.outcome_probabilities(fixtures) if args.market == "1x2"
+                               else model.predict_fixtures(fixtures))
+            value = scan_value(predictions, fixtures, args.market, args.closing, args.min_edge, args.method)
+        except ValueError as error:
+            sys.exit(f"odds: {error}")
+        print(value.round(3).to_string(index=False) if len(value) else "No value bets")
+        return
+
+    from .match_data import load_matches, scan_matches
+
+    matches = (scan_matches(args.leagues, since=args.since, until=args.until, columns=None)
+               if args.leagues or args.since or args.until else load_matches(columns=None))
+    start = time.perf_counter()
+    matrix = OddsMatrix.from_matches(matches, args.market, args.closing)
+    consensus = matrix.consensus(args.method)
+    seconds = time.perf_counter() - start
+    print(matrix.summary().round(4).to_string())
+    print(f"{len(matches)} matches x {len(matrix.books)} books in {seconds:.3f}s; "
+          f"{int((consensus['books'] > 0).sum())} with a consensus")
+
+
+if __name__ == "__main__":
+    main()
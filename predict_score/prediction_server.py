@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""Servidor de predicción local con micro-batching.
+
+Carga una vez los bundles de ``model_bundle`` (RF, XGBoost, MLP...) y atiende
+peticiones HTTP por TCP o por socket Unix. Las peticiones concurrentes se
+acumulan durante una ventana de latencia configurable (o hasta ``max_batch``)
+y cada lote se resuelve con un único ``transform`` + ``predict`` por modelo.
+
+Endpoints:
+    POST /predict   {"home": "Man City", "away": "Liverpool", "model": "rf"}
+    GET  /stats     Latencias p50/p99, tamaños de lote y contadores.
+    GET  /health
+
+Los ``.npz`` de ``numpy_inference`` se sirven sin TensorFlow instalado.
+
+Uso:
+    python -m predict_score.prediction_server --bundle rf=modelo_rf.joblib --bundle mlp=mlp_score_predictor.npz
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .model_bundle import load_bundle
+from .numpy_inference import NumpyScorePredictor
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class ServerStats:
+    """Latencias recientes y contadores de peticiones y lotes."""
+
+    def __init__(self, max_samples=10000):
+        self.latencies = collections.deque(maxlen=max_samples)
+        self.batch_sizes = collections.Counter()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batch_sizes[size] += 1
+
+    def record_request(self, seconds, ok=True):
+        self.requests += 1
+        self.errors += not ok
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        latencies_ms = np.array(self.latencies) * 1000.0
+        percentiles = (np.percentile(latencies_ms, [50, 90, 99]).round(3).tolist()
+                       if len(latencies_ms) else [None, None, None])
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else None,
+            "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            "latency_ms": dict(zip(("p50", "p90", "p99"), percentiles)),
+        }
+
+
+class MicroBatcher:
+    """
+    Agrupa las peticiones que llegan dentro de ``window_ms`` y las predice juntas.
+
+    Args:
+        bundles (dict): Nombre del modelo -> ModelBundle.
+        window_ms (float): Tiempo máximo que espera la primera petición de un lote.
+        max_batch (int): Tamaño máximo de lote.
+        stats (ServerStats): Contadores compartidos con el servidor.
+    """
+
+    def __init__(self, bundles, window_ms=5.0, max_batch=256, stats=None):
+        self.bundles = bundles
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.stats = stats or ServerStats()
+        self.queue = asyncio.Queue()
+        # Un solo hilo: los modelos se usan de uno en uno y el bucle de eventos no se bloquea
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def predict(self, model, home, away):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((model, home, away, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.stats.record_batch(len(batch))
+            await loop.run_in_executor(self.executor, self._predict_batch, batch)
+
+    def _predict_batch(self, batch):
+        by_model = collections.defaultdict(list)
+        for item in batch:
+            by_model[item[0]].append(item)
+        for model, items in by_model.items():
+            try:
+                predictions = self.bundles[model].predict_fixtures([(home, away) for _, home, away, _ in items])
+                results = predictions.to_dict(orient="records")
+            except Exception as exc:  # El error se devuelve a cada petición del lote
+                results = [exc] * len(items)
+            for (_, _, _, future), result in zip(items, results):
+                future.get_loop().call_soon_threadsafe(_resolve, future, result)
+
+
+def _resolve(future, result):
+    if future.done():
+        return
+    if isinstance(result, Exception):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
+
+
+class PredictionServer:
+    """
+    Servidor HTTP/1.1 mínimo (keep-alive) sobre asyncio.
+
+    Args:
+        bundles (dict): Nombre del modelo -> ModelBundle, ya cargados.
+        window_ms (float): Ventana de micro-batching.
+        max_batch (int): Tamaño máximo de lote.
+    """
+
+    def __init__(self, bundles, window_ms=5.0, max_batch=256):
+        self.bundles = bundles
+        self.default_model = next(iter(bundles))
+        self.stats = ServerStats()
+        self.batcher = MicroBatcher(bundles, window_ms, max_batch, self.stats)
+
+    async def handle_predict(self, payload):
+        model = payload.get("model", self.default_model)
+        home, away = payload.get("home"), payload.get("away")
+        if model not in self.bundles:
+            return 404, {"error": f"Unknown model '{model}'", "models": list(self.bundles)}
+        form_store = self.bundles[model].form_store
+        for team in (home, away):
+            if team not in form_store:
+                return 400, {"error": f"'{team}' does not exist in the dataset."}
+        prediction = await self.batcher.predict(model, home, away)
+        return 200, {"model": model, **{key: _json_value(value) for key, value in prediction.items()}}
+
+    async def dispatch(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "models": list(self.bundles)}
+        if method == "GET" and path == "/stats":
+            return 200, self.stats.snapshot()
+        if method == "POST" and path == "/predict":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "Invalid JSON body"}
+            return await self.handle_predict(payload)
+        return 404, {"error": f"No route for {method} {path}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                start = time.perf_counter()
+                try:
+                    status, response = await self.dispatch(method, path, body)
+                except Exception as exc:
+                    status, response = 500, {"error": str(exc)}
+                if path == "/predict":
+                    self.stats.record_request(time.perf_counter() - start, ok=status == 200)
+
+                data = json.dumps(response).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8000, unix_socket=None):
+        batcher_task = asyncio.create_task(self.batcher.run())
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving {list(self.bundles)} on {unix_socket or f'http://{host}:{port}'}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+
+
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def parse_bundles(specs):
+    """Convierte ['rf=modelo_rf.joblib', 'mlp=mlp.npz', ...] en {'rf': ModelBundle, ...}."""
+    bundles = {}
+    for spec in specs:
+        name, _, path = spec.partition("=")
+        if not path:
+            name, path = name.rsplit(".", 1)[0], name
+        bundles[name] = NumpyScorePredictor.load(path) if path.endswith(".npz") else load_bundle(path)
+    return bundles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm prediction server with request micro-batching")
+    parser.add_argument("--bundle", action="append", required=True,
+                        help="name=path of a model bundle (repeatable)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix-socket", help="serve on a Unix socket instead of TCP")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="micro-batching latency window")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--league", help="serve with the ingested team form of this league (see ingestion)")
+    args = parser.parse_args(argv)
+
+    bundles = parse_bundles(args.bundle)
+    if args.league:
+        from .ingestion import refresh_form
+
+        for bundle in bundles.values():
+            refresh_form(bundle, args.league)
+    server = PredictionServer(bundles, args.window_ms, args.max_batch)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
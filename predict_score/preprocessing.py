@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Preprocesador compartido (StandardScaler + OneHotEncoder) de los modelos.
+
+Con ``sparse_float32=True`` la matriz de características sale siempre como
+CSR float32: el bloque one-hot no se densifica nunca y la parte numérica se
+escala en float32, de modo que ningún paso intermedio crea copias float64
+densas (que crecen con equipos × partidos al añadir ligas).
+"""
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+
+NUMERIC_FEATURES = ["HF", "AF"]
+CATEGORICAL_FEATURES = ["HomeTeam", "AwayTeam"]
+
+
+def _as_float32(X):
+    return np.asarray(X, dtype=np.float32)
+
+
+def create_preprocessor(numeric_features=None, categorical_features=None, sparse_float32=False):
+    """
+    Crea el ColumnTransformer que normaliza las columnas numéricas y codifica
+    los equipos en one-hot.
+
+    Args:
+        numeric_features (list): Columnas numéricas. Por defecto HF y AF.
+        categorical_features (list): Columnas categóricas. Por defecto HomeTeam y AwayTeam.
+        sparse_float32 (bool): Salida siempre CSR float32 en lugar del formato por
+            defecto de scikit-learn (float64, densa o dispersa según densidad).
+
+    Returns:
+        preprocessor (ColumnTransformer): Preprocesador sin ajustar.
+    """
+    numeric_features = list(numeric_features or NUMERIC_FEATURES)
+    categorical_features = list(categorical_features or CATEGORICAL_FEATURES)
+
+    if not sparse_float32:
+        return ColumnTransformer(
+            transformers=[
+                ("num", StandardScaler(), numeric_features),
+                ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
+            ]
+        )
+
+    # StandardScaler conserva float32 si la entrada ya lo es
+    numeric_transformer = Pipeline(steps=[
+        ("float32", FunctionTransformer(_as_float32)),
+        ("scaler", StandardScaler()),
+    ])
+    return ColumnTransformer(
+        transformers=[
+            ("num", numeric_transformer, numeric_features),
+            ("cat", OneHotEncoder(handle_unknown="ignore", dtype=np.float32), categorical_features),
+        ],
+        sparse_threshold=1.0,
+    )
+
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""Ratings de equipo: Elo y fuerzas de ataque/defensa (Dixon-Coles).
+
+``RatingEngine`` recorre los partidos en orden de fecha y guarda por equipo,
+en arrays que crecen por bloques (como ``TeamFormStore``), un Elo y una
+fuerza de ataque y otra de defensa en escala logarítmica. Cada partido
+actualiza ambos equipos en O(1): el Elo según el resultado esperado y las
+fuerzas con un paso de gradiente de la verosimilitud de Poisson de los
+goles. ``rating_features`` devuelve los ratings *previos* a cada partido, así
+que sirven como features sin mirar el resultado que se predice.
+
+``DixonColes`` ajusta el modelo de Dixon y Coles (1997): goles de Poisson con
+``log λ = casa + ataque[local] + defensa[visitante]`` y
+``log μ = ataque[visitante] + defensa[local]``, la corrección ``rho`` de los
+marcadores bajos (0-0, 1-0, 0-1, 1-1) y pesos ``exp(-xi * días)`` que restan
+importancia a los partidos antiguos. La verosimilitud y su gradiente se
+calculan con operaciones vectorizadas sobre todos los partidos
+(``np.bincount`` para acumular por equipo) y se optimizan con L-BFGS, de
+modo que varias ligas y décadas de partidos se ajustan en segundos. Un
+término ridge pequeño fija la escala de ataque y defensa, también cuando se
+juntan ligas que no se enfrentan entre sí.
+
+Uso:
+    python -m predict_score.ratings --leagues E0 E1 --since 2015-08-01 "Man City" Liverpool
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.stats import poisson
+
+from .fixture_prediction import fixtures_frame, outcomes
+
+RATING_FEATURES = ["home_elo", "away_elo", "elo_expected", "home_attack", "home_defence",
+                   "away_attack", "away_defence", "rating_home_goals", "rating_away_goals"]
+
+INITIAL_ELO = 1500.0
+ELO_SCALE = 400.0
+XI = 0.0019  # Decaimiento por día (la mitad del peso en ~1 año)
+
+
+def _unknown_teams(teams, known):
+    return [team for team in pd.unique(np.asarray(teams)) if team not in known]
+
+
+class RatingEngine:
+    """
+    Elo y fuerzas de ataque/defensa de cada equipo, actualizados partido a partido.
+
+    Args:
+        k (float): Factor K del Elo.
+        home_advantage (float): Ventaja de campo del Elo, en puntos.
+        learning_rate (float): Paso del gradiente de ataque/defensa.
+        home_goals (float): Goles medios del local; fija la ventaja de campo inicial
+            de las fuerzas (``log`` de la tasa de goles).
+        away_goals (float): Goles medios del visitante.
+    """
+
+    def __init__(self, k=20.0, home_advantage=60.0, learning_rate=0.02, home_goals=1.5, away_goals=1.15):
+        self.k = k
+        self.home_advantage = home_advantage
+        self.learning_rate = learning_rate
+        self.teams = {}
+        # Ordenada en log y ventaja de campo de las fuerzas, también aprendidas
+        self.intercept = np.log(away_goals)
+        self.home = np.log(home_goals) - np.log(away_goals)
+        self._elo = np.zeros(0)
+        self._attack = np.zeros(0)
+        self._defence = np.zeros(0)
+
+    def __contains__(self, team):
+        return team in self.teams
+
+    def __len__(self):
+        return len(self.teams)
+
+    def _team_index(self, team):
+        index = self.teams.get(team)
+        if index is None:
+            index = self.teams[team] = len(self.teams)
+            if index >= len(self._elo):
+                grow = max(16, len(self._elo))
+                self._elo = np.r_[self._elo, np.full(grow, INITIAL_ELO)]
+                self._attack = np.r_[self._attack, np.zeros(grow)]
+                self._defence = np.r_[self._defence, np.zeros(grow)]
+        return index
+
+    def _expected(self, h, a):
+        elo = 1.0 / (1.0 + 10.0 ** ((self._elo[a] - self._elo[h] - self.home_advantage) / ELO_SCALE))
+        home_rate = np.exp(self.intercept + self.home + self._attack[h] + self._defence[a])
+        away_rate = np.exp(self.intercept + self._attack[a] + self._defence[h])
+        return elo, home_rate, away_rate
+
+    def _run(self, homes, aways, home_goals, away_goals, features=None):
+        """
+        Actualiza los ratings partido a partido; si se pasa ``features`` (n, 9),
+        guarda en cada fila los ratings previos al partido.
+
+        Con muchos partidos el bucle trabaja con listas de floats de Python (una
+        operación con escalares de NumPy cuesta diez veces más) y vuelca el
+        estado al final; con pocos escribe directamente en los arrays, en O(1).
+        """
+        state = self._elo, self._attack, self._defence
+        elo, attack, defence = (values.tolist() for values in state) if len(homes) > 64 else state
+        k, advantage, rate, intercept, home = (self.k, self.home_advantage, self.learning_rate,
+                                               self.intercept, self.home)
+        rows = []
+        for h, a, x, y in zip(homes, aways, home_goals.tolist(), away_goals.tolist()):
+            expected = 1.0 / (1.0 + 10.0 ** ((elo[a] - elo[h] - advantage) / ELO_SCALE))
+            home_rate = math.exp(intercept + home + attack[h] + defence[a])
+            away_rate = math.exp(intercept + attack[a] + defence[h])
+            if features is not None:
+                rows.append((elo[h], elo[a], expected, attack[h], defence[h], attack[a], defence[a],
+                             home_rate, away_rate))
+            # Los partidos sin resultado (aplazados, jornadas futuras) no actualizan nada
+            if x != x or y != y:
+                continue
+            score = 1.0 if x > y else 0.5 if x == y else 0.0
+            # Multiplicador de la diferencia de goles (World Football Elo)
+            margin = abs(x - y)
+            change = k * (1.0 if margin <= 1 else 1.5 if margin == 2 else (11 + margin) / 8) * (score - expected)
+            elo[h] += change
+            elo[a] -= change
+            # Un paso del gradiente de la log-verosimilitud de Poisson de cada marcador
+            home_error = rate * (x - home_rate)
+            away_error = rate * (y - away_rate)
+            attack[h] += home_error
+            defence[a] += home_error
+            attack[a] += away_error
+            defence[h] += away_error
+            home += rate * 0.05 * home_error
+            intercept += rate * 0.05 * (home_error + away_error)
+        self._elo, self._attack, self._defence = (np.asarray(values, dtype=float) for values in (elo, attack, defence))
+        self.intercept, self.home = intercept, home
+        if features is not None and rows:
+            features[:] = rows
+
+    def update(self, home_team, away_team, home_goals, away_goals):
+        """Añade el resultado de un partido a los ratings de ambos equipos."""
+        self._run([self._team_index(home_team)], [self._team_index(away_team)],
+                  np.array([home_goals], dtype=float), np.array([away_goals], dtype=float))
+
+    def update_many(self, matches):
+        """Añade en orden los partidos de un DataFrame con HomeTeam, AwayTeam, FTHG y FTAG."""
+        self._run(*self._encode(matches))
+
+    def _encode(self, matches):
+        # Índice de cada equipo de local y de visitante (factorize evita iterar el texto fila a fila)
+        codes, names = pd.factorize(np.r_[matches["HomeTeam"].to_numpy(dtype=object),
+                                          matches["AwayTeam"].to_numpy(dtype=object)])
+        index = np.array([self._team_index(name) for name in names], dtype=np.int64)[codes]
+        return (index[:len(matches)].tolist(), index[len(matches):].tolist(),
+                matches["FTHG"].to_numpy(dtype=float), matches["FTAG"].to_numpy(dtype=float))
+
+    def stream(self, matches):
+        """
+        Recorre ``matches`` en orden de filas y devuelve los ratings previos a cada partido.
+
+        Returns:
+            array: Matriz (n, len(RATING_FEATURES)) en float64.
+        """
+        encoded = self._encode(matches)
+        features = np.empty((len(matches), len(RATING_FEATURES)))
+        self._run(*encoded, features=features)
+        return features
+
+    def features(self, fixtures):
+        """
+        Ratings actuales para partidos por jugar, sin actualizar nada.
+
+        Raises:
+            ValueError: Si algún equipo no aparece en el histórico.
+        """
+        frame = fixtures_frame(fixtures)
+        unknown = _unknown_teams(frame[["HomeTeam", "AwayTeam"]].to_numpy().ravel(), self.teams)
+        if unknown:
+            raise ValueError(f"Teams not in the dataset: {unknown}")
+        h = np.array([self.teams[team] for team in frame["HomeTeam"]], dtype=np.int64)
+        a = np.array([self.teams[team] for team in frame["AwayTeam"]], dtype=np.int64)
+        elo, home_rate, away_rate = self._expected(h, a)
+        values = np.column_stack([self._elo[h], self._elo[a], elo, self._attack[h], self._defence[h],
+                                  self._attack[a], self._defence[a], home_rate, away_rate])
+        return frame.join(pd.DataFrame(values, columns=RATING_FEATURES))
+
+    def ratings(self):
+        """Tabla de Elo, ataque y defensa por equipo, de mayor a menor Elo."""
+        n = len(self.teams)
+        table = pd.DataFrame({"Elo": self._elo[:n], "Attack": self._attack[:n], "Defence": self._defence[:n]},
+                             index=pd.Index(list(self.teams), name="Team"))
+        return table.sort_values("Elo", ascending=False)
+
+    @classmethod
+    def from_matches(cls, matches, **kwargs):
+        """Construye el estado recorriendo partidos históricos ordenados por fecha."""
+        engine = cls(**kwargs)
+        engine.stream(matches.sort_values("Date", kind="stable") if "Date" in matches else matches)
+        return engine
+
+
+def rating_features(matches, **kwargs):
+    """
+    Ratings previos a cada partido (``RATING_FEATURES``), con el índice de ``matches``.
+
+    Los partidos se recorren por fecha; la primera vez que juega un equipo
+    parte de ``INITIAL_ELO`` y fuerzas nulas.
+
+    Args:
+        matches (DataFrame): Partidos con Date, HomeTeam, AwayTeam, FTHG y FTAG.
+        **kwargs: Parámetros de ``RatingEngine``.
+    """
+    chronological = np.argsort(matches["Date"].to_numpy(), kind="stable")
+    values = RatingEngine(**kwargs).stream(matches.iloc[chronological])
+    features = pd.DataFrame(values, columns=RATING_FEATURES).astype(np.float32)
+    features = features.iloc[np.argsort(chronological)]
+    features.index = matches.index
+    return features
+
+
+class DixonColes:
+    """
+    Modelo de Dixon-Coles con pesos que decaen con la antigüedad de los partidos.
+
+    Args:
+        xi (float): Decaimiento por día de los pesos (0 = todos los partidos pesan igual).
+        alpha (float): Penalización ridge de ataque y defensa (por unidad de peso).
+        max_goals (int): Goles máximos por equipo en las probabilidades de resultado.
+
+    Attributes:
+        teams_ (Index): Equipos ajustados.
+        attack_, defence_ (array): Fuerzas por equipo en escala logarítmica.
+        home_ (float): Ventaja de campo (log).
+        rho_ (float): Corrección de los marcadores bajos.
+    """
+
+    def __init__(self, xi=XI, alpha=1e-4, max_goals=10):
+        self.xi = xi
+        self.alpha = alpha
+        self.max_goals = max_goals
+
+    def _weights(self, dates, reference):
+        if dates is None or not self.xi:
+            return None
+        days = (pd.Timestamp(reference) - pd.to_datetime(dates)).dt.days.to_numpy(dtype=float)
+        return np.exp(-self.xi * np.clip(days, 0, None))
+
+    @staticmethod
+    def _negative_log_likelihood(params, h, a, x, y, w, low, cases, n_teams, alpha):
+        attack, defence = params[:n_teams], params[n_teams:2 * n_teams]
+        home, rho = params[-2], params[-1]
+        log_lam = home + attack[h] + defence[a]
+        log_mu = attack[a] + defence[h]
+        lam, mu = np.exp(log_lam), np.exp(log_mu)
+
+        # Poisson y su derivada respecto de log λ y log μ
+        loglik = x * log_lam - lam + y * log_mu - mu
+        d_home, d_away = x - lam, y - mu
+        # Corrección tau, sólo en los marcadores bajos (``cases``: 0-0, 0-1, 1-0 y 1-1 como 0/1)
+        c00, c01, c10, c11 = cases
+        lam_low, mu_low = lam[low], mu[low]
+        both = c00 * lam_low * mu_low
+        tau = np.maximum(1 + rho * (c01 * lam_low + c10 * mu_low - both - c11), 1e-10)
+        loglik[low] += np.log(tau)
+        d_home[low] += rho * (c01 * lam_low - both) / tau
+        d_away[low] += rho * (c10 * mu_low - both) / tau
+        d_rho = (c01 * lam_low + c10 * mu_low - both - c11) / tau
+
+        # Se minimiza la media ponderada para que la escala no dependa del número de partidos
+        total = w.sum()
+        value = -(w @ loglik) / total + alpha * (attack @ attack + defence @ defence)
+        d_home, d_away = w * d_home / total, w * d_away / total
+        gradient = np.empty_like(params)
+        gradient[:n_teams] = -(np.bincount(h, d_home, n_teams) + np.bincount(a, d_away, n_teams)) + 2 * alpha * attack
+        gradient[n_teams:2 * n_teams] = (-(np.bincount(a, d_home, n_teams) + np.bincount(h, d_away, n_teams))
+                                         + 2 * alpha * defence)
+        gradient[-2] = -d_home.sum()
+        gradient[-1] = -(w[low] @ d_rho) / total
+        return value, gradient
+
+    def fit(self, matches, reference_date=None):
+        """
+        Ajusta ataque, defensa, ventaja de campo y rho por máxima verosimilitud.
+
+        Args:
+            matches (DataFrame): Partidos con HomeTeam, AwayTeam, FTHG, FTAG y Date
+                (sin Date, todos pesan igual). Los partidos sin resultado se ignoran.
+            reference_date: Fecha desde la que se cuenta la antigüedad (por defecto,
+                la del último partido).
+        """
+        played = matches.dropna(subset=["FTHG", "FTAG"])
+        teams = pd.Index(pd.unique(played[["HomeTeam", "AwayTeam"]].to_numpy().ravel()))
+        h = teams.get_indexer(played["HomeTeam"])
+        a = teams.get_indexer(played["AwayTeam"])
+        x = played["FTHG"].to_numpy(dtype=float)
+        y = played["FTAG"].to_numpy(dtype=float)
+        dates = played["Date"] if "Date" in played else None
+        w = self._weights(dates, reference_date if reference_date is not None else
+                          (dates.max() if dates is not None else None))
+        w = np.ones(len(x)) if w is None else w
+
+        # Arranque: ataque y defensa nulos y la media de goles como ventaja de campo
+        n = len(teams)
+        start = np.zeros(2 * n + 2)
+        start[:n] = np.log(max(np.average(y, weights=w), 0.1))
+        start[-2] = np.log(max(np.average(x, weights=w), 0.1)) - start[0]
+        low = np.flatnonzero((x <= 1) & (y <= 1))
+        cases = [((x[low] == i) & (y[low] == j)).astype(float) for i, j in ((0, 0), (0, 1), (1, 0), (1, 1))]
+        bounds = [(None, None)] * (2 * n + 1) + [(-0.2, 0.2)]
+        result = minimize(self._negative_log_likelihood, start, jac=True, method="L-BFGS-B", bounds=bounds,
+                          args=(h, a, x, y, w, low, cases, n, self.alpha))
+
+        self.teams_ = teams
+        self.attack_, self.defence_ = result.x[:n], result.x[n:2 * n]
+        self.home_, self.rho_ = float(result.x[-2]), float(result.x[-1])
+        self.n_iter_ = result.nit
+        return self
+
+    def _indices(self, frame):
+        unknown = _unknown_teams(frame[["HomeTeam", "AwayTeam"]].to_numpy().ravel(), self.teams_)
+        if unknown:
+            raise ValueError(f"Teams not in the dataset: {unknown}")
+        return self.teams_.get_indexer(frame["HomeTeam"]), self.teams_.get_indexer(frame["AwayTeam"])
+
+    def expected_goals(self, fixtures):
+        """Goles esperados (λ, μ) de local y visitante, como matriz (n, 2)."""
+        h, a = self._indices(fixtures_frame(fixtures))
+        return np.column_stack([np.exp(self.home_ + self.attack_[h] + self.defence_[a]),
+                                np.exp(self.attack_[a] + self.defence_[h])])
+
+    def score_matrix(self, fixtures):
+        """
+        Probabilidad de cada marcador hasta ``max_goals``, con la corrección de Dixon-Coles.
+
+        Returns:
+            array: (n, max_goals + 1, max_goals + 1); [i, x, y] = P(local x, visitante y).
+        """
+        rates = self.expected_goals(fixtures)
+        goals = np.arange(self.max_goals + 1)
+        lam, mu = rates[:, :1], rates[:, 1:]
+        joint = poisson.pmf(goals, lam)[:, :, None] * poisson.pmf(goals, mu)[:, None, :]
+        joint[:, 0, 0] *= 1 - lam[:, 0] * mu[:, 0] * self.rho_
+        joint[:, 0, 1] *= 1 + lam[:, 0] * self.rho_
+        joint[:, 1, 0] *= 1 + mu[:, 0] * self.rho_
+        joint[:, 1, 1] *= 1 - self.rho_
+        return joint / joint.sum(axis=(1, 2), keepdims=True)
+
+    def outcome_probabilities(self, fixtures):
+        """Probabilidades de victoria local, empate y victoria visitante (columnas H, D, A)."""
+        frame = fixtures_frame(fixtures)
+        joint = self.score_matrix(frame)
+        difference = np.subtract.outer(np.arange(self.max_goals + 1), np.arange(self.max_goals + 1))
+        probabilities = np.stack([joint[:, difference > 0].sum(axis=1), joint[:, difference == 0].sum(axis=1),
+                                  joint[:, difference < 0].sum(axis=1)], axis=1)
+        return pd.DataFrame(probabilities, columns=["H", "D", "A"])
+
+    def predict(self, X):
+        """Goles esperados de local y visitante para un DataFrame con HomeTeam y AwayTeam."""
+        return self.expected_goals(X)
+
+    def predict_fixtures(self, fixtures):
+        """
+        Predicción con el mismo formato que ``fixture_prediction.predict_fixtures``
+        (y, por tanto, utilizable en ``season_simulation``).
+        """
+        frame = fixtures_frame(fixtures)
+        goals = self.expected_goals(frame)
+        # Marcador más probable de la rejilla, no el redondeo de λ y μ
+        joint = self.score_matrix(frame).reshape(len(frame), -1)
+        home_score, away_score = np.divmod(joint.argmax(axis=1), self.max_goals + 1)
+        return pd.DataFrame({
+            "HomeTeam": frame["HomeTeam"].to_numpy(),
+            "AwayTeam": frame["AwayTeam"].to_numpy(),
+            "home_goals": goals[:, 0],
+            "away_goals": goals[:, 1],
+            "home_score": home_score,
+            "away_score": away_score,
+            "outcome": outcomes(home_score, away_score),
+        })
+
+    def log_likelihood(self, matches):
+        """Log-verosimilitud media (sin pesos) de partidos jugados con equipos conocidos."""
+        played = matches.dropna(subset=["FTHG", "FTAG"])
+        joint = self.score_matrix(played)
+        x = np.minimum(played["FTHG"].to_numpy(dtype=int), self.max_goals)
+        y = np.minimum(played["FTAG"].to_numpy(dtype=int), self.max_goals)
+        return float(np.log(joint[np.arange(len(played)), x, y]).mean())
+
+    def ratings(self):
+        """Tabla de ataque y defensa por equipo (más ataque y menos defensa es mejor)."""
+        table = pd.DataFrame({"Attack": self.attack_, "Defence": self.defence_}, index=self.teams_.rename("Team"))
+        return table.assign(Strength=table["Attack"] - table["Defence"]).sort_values("Strength", ascending=False)
+
+
+def main(argv=None):
+    from .match_data import load_matches, scan_matches
+
+    parser = argparse.ArgumentParser(description="Fit Dixon-Coles and Elo ratings and predict fixtures")
+    parser.add_argument("home", nargs="?", help="home team")
+    parser.add_argument("away", nargs="?", help="away team")
+    parser.add_argument("--leagues", nargs="+", help="league codes (default: the default seasons)")
+    parser.add_argument("--since", help="first match date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last match date (YYYY-MM-DD)")
+    parser.add_argument("--xi", type=float, default=XI, help="time decay per day of the Dixon-Coles weights")
+    parser.add_argument("--top", type=int, default=10, help="teams to list")
+    args = parser.parse_args(argv)
+
+    matches = (scan_matches(args.leagues, since=args.since, until=args.until)
+               if args.leagues or args.since or args.until else load_matches())
+    start = time.perf_counter()
+    model = DixonColes(xi=args.xi).fit(matches)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    engine = RatingEngine.from_matches(matches)
+    stream_seconds = time.perf_counter() - start
+    print(f"Dixon-Coles: {len(matches)} matches, {len(model.teams_)} teams, {model.n_iter_} iterations "
+          f"in {fit_seconds:.2f}s (home {model.home_:.3f}, rho {model.rho_:.3f})")
+    print(f"Elo/strength stream: {stream_seconds:.2f}s")
+    print(model.ratings().join(engine.ratings()["Elo"]).head(args.top).to_string(float_format="%.3f"))
+    if args.home and args.away:
+        fixture = [(args.home, args.away)]
+        prediction = model.predict_fixtures(fixture).iloc[0]
+        probabilities = model.outcome_probabilities(fixture).iloc[0]
+        print(f"{args.home} {prediction['home_goals']:.2f} - {prediction['away_goals']:.2f} {args.away} "
+              f"(H {probabilities['H']:.2f}, D {probabilities['D']:.2f}, A {probabilities['A']:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Features de forma previas al partido, en una sola pasada vectorizada.
+
+HF/AF (``team_form``) son la media de ``goal_difference`` en los últimos 5
+partidos *incluido* el propio, así que contienen el resultado que se quiere
+predecir. Aquí cada partido sólo ve los anteriores de cada equipo:
+
+- cada partido se convierte en dos filas de equipo (local y visitante) con
+  sus estadísticas a favor y en contra (goles, tiros, tiros a puerta,
+  córners, tarjetas, diferencia de goles y puntos);
+- las filas se ordenan una vez por fecha y se agrupan por equipo ('all':
+  todos sus partidos) y por equipo y campo ('venue': el local en casa, el
+  visitante fuera);
+- las medias móviles de todas las ventanas salen de sumas acumuladas y las
+  medias exponenciales (``ewm(span=w)``) de un único filtro recursivo sobre
+  todas las filas, con todas las estadísticas a la vez.
+
+El coste es lineal en filas: no hay un ``groupby().rolling()`` por columna y
+ventana. Los valores que faltan (temporadas sin tiros, p. ej.) no cuentan en
+las medias.
+
+Las columnas se llaman ``<rol>_<grupo>_<estadística>_<mean|ewm><ventana>``
+(``home_all_goals_for_mean5``, ``away_venue_shots_ewm10``...) más
+``<rol>_<grupo>_n<ventana>``, el número de partidos previos en la ventana.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from .team_form import _sorted_groups
+
+WINDOWS = (3, 5, 10)
+SPLITS = ("all", "venue")
+
+# Estadística del equipo -> (columna cuando juega en casa, columna cuando juega fuera)
+TEAM_STATS = {
+    "goals_for": ("FTHG", "FTAG"),
+    "goals_against": ("FTAG", "FTHG"),
+    "shots": ("HS", "AS"),
+    "shots_against": ("AS", "HS"),
+    "shots_on_target": ("HST", "AST"),
+    "shots_on_target_against": ("AST", "HST"),
+    "corners": ("HC", "AC"),
+    "corners_against": ("AC", "HC"),
+    "yellows": ("HY", "AY"),
+    "reds": ("HR", "AR"),
+}
+# Calculadas a partir de los goles
+DERIVED_STATS = ("goal_difference", "points")
+
+
+def feature_columns(windows=WINDOWS, stats=None, splits=SPLITS):
+    """Nombres de las columnas que devuelve ``build_rolling_features``, en orden."""
+    stats = list(stats or list(TEAM_STATS) + list(DERIVED_STATS))
+    columns = []
+    for role in ("home", "away"):
+        for split in splits:
+            prefix = f"{role}_{split}"
+            columns += [f"{prefix}_n{w}" for w in windows]
+            columns += [f"{prefix}_{stat}_{kind}{w}" for stat in stats for kind in ("mean", "ewm") for w in windows]
+    return columns
+
+
+def _team_values(matches, stats):
+    # Filas de equipo intercaladas (local, visitante) partido a partido
+    n = len(matches)
+    values = np.empty((2 * n, len(stats)))
+    for side in (0, 1):
+        goals_for = matches[TEAM_STATS["goals_for"][side]].to_numpy(dtype=float)
+        goals_against = matches[TEAM_STATS["goals_against"][side]].to_numpy(dtype=float)
+        for j, stat in enumerate(stats):
+            if stat == "goal_difference":
+                column = goals_for - goals_against
+            elif stat == "points":
+                column = np.where(goals_for > goals_against, 3.0, np.where(goals_for == goals_against, 1.0, 0.0))
+                column[np.isnan(goals_for) | np.isnan(goals_against)] = np.nan
+            elif TEAM_STATS[stat][side] in matches:
+                column = matches[TEAM_STATS[stat][side]].to_numpy(dtype=float)
+            else:
+                column = np.full(n, np.nan)
+            values[side::2, j] = column
+    return values
+
+
+def _rolling_previous(order, first, values, valid, windows):
+    """
+    Sumas de los ``w`` partidos anteriores de cada grupo (sin la fila actual).
+
+    Args:
+        order, first: Salida de ``team_form._sorted_groups`` para los grupos.
+
+    Returns:
+        dict: Ventana -> (número de partidos previos, sumas, valores no nulos por columna).
+    """
+    idx = np.arange(len(order))
+    cumsum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values[order], axis=0)])
+    cumvalid = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(valid[order], axis=0)])
+    results = {}
+    for w in windows:
+        lo = np.maximum(idx - w, first)
+        counts, sums, n_valid = (np.empty(len(order)), np.empty(values.shape), np.empty(values.shape))
+        counts[order] = idx - lo
+        sums[order] = cumsum[idx] - cumsum[lo]
+        n_valid[order] = cumvalid[idx] - cumvalid[lo]
+        results[w] = counts, sums, n_valid
+    return results
+
+
+def _ewm_previous(order, first, sorted_rows, span):
+    """
+    ``ewm(span).mean()`` de los partidos anteriores de cada grupo (como
+    ``shift()`` + ``ewm(span, adjust=True)``; los nulos no pesan).
+
+    Un solo ``lfilter`` recorre todas las filas ordenadas por grupo; al
+    empezar cada grupo se resta lo arrastrado del anterior, que decae como
+    ``decay ** k``.
+
+    Args:
+        sorted_rows (array): Valores y máscara de no nulos apilados, una fila
+            por columna y en el orden de ``order`` (contiguo para ``lfilter``).
+    """
+    decay = 1 - 2 / (span + 1)
+    idx = np.arange(len(order))
+    carried = lfilter([1.0], [1.0, -decay], sorted_rows, axis=1)
+    # Estado justo antes del primer partido de cada grupo
+    before = np.hstack([np.zeros((len(carried), 1)), carried])[:, first]
+    inclusive = carried - decay ** (idx - first + 1) * before
+    # Partidos anteriores: el valor inclusivo de la fila previa del grupo
+    previous = np.hstack([np.zeros((len(carried), 1)), inclusive[:, :-1]])
+    previous[:, idx == first] = 0.0
+    numerator, weight = np.split(previous, 2)
+    ewm = np.empty(numerator.T.shape)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ewm[order] = np.where(weight > 0, numerator / weight, np.nan).T
+    return ewm
+
+
+def build_rolling_features(matches, windows=WINDOWS, stats=None, splits=SPLITS):
+    """
+    Medias móviles, medias exponenciales y recuentos previos a cada partido.
+
+    Args:
+        matches (DataFrame): Partidos con Date, HomeTeam, AwayTeam, FTHG, FTAG y
+            las estadísticas de ``TEAM_STATS`` que haya (las que falten quedan NaN).
+        windows (tuple): Ventanas (en partidos) de las medias y spans de las exponenciales.
+        stats (list): Estadísticas de ``TEAM_STATS`` y ``DERIVED_STATS`` (por defecto todas).
+        splits (tuple): 'all' (todos los partidos del equipo) y/o 'venue' (sólo
+            los de su mismo campo).
+
+    Returns:
+        DataFrame: Columnas de ``feature_columns``, con el índice de ``matches``.
+        La primera vez que juega un equipo sus medias son NaN y sus recuentos 0.
+    """
+    stats = list(stats or list(TEAM_STATS) + list(DERIVED_STATS))
+    windows = tuple(windows)
+    # Un solo orden por fecha; los partidos del mismo día conservan su orden
+    chronological = np.argsort(matches["Date"].to_numpy(), kind="stable")
+    ordered = matches.iloc[chronological]
+
+    values = _team_values(ordered, stats)
+    valid = ~np.isnan(values)
+    values = np.where(valid, values, 0.0)
+    teams = np.empty(2 * len(ordered), dtype=object)
+    teams[0::2] = ordered["HomeTeam"].to_numpy()
+    teams[1::2] = ordered["AwayTeam"].to_numpy()
+    team_codes, _ = pd.factorize(teams)
+    is_home = np.tile([1, 0], len(ordered))
+
+    blocks = {}
+    for split in splits:
+        codes = team_codes if split == "all" else team_codes * 2 + (1 - is_home)
+        order, first = _sorted_groups(codes)
+        block = {}
+        for w, (counts, sums, n_valid) in _rolling_previous(order, first, values, valid, windows).items():
+            block[f"n{w}"] = counts
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = np.where(n_valid > 0, sums / n_valid, np.nan)
+            for j, stat in enumerate(stats):
+                block[f"{stat}_mean{w}"] = means[:, j]
+        sorted_rows = np.vstack([values[order].T, valid[order].T])
+        for w in windows:
+            ewm = _ewm_previous(order, first, sorted_rows, w)
+            for j, stat in enumerate(stats):
+                block[f"{stat}_ewm{w}"] = ewm[:, j]
+        blocks[split] = block
+
+    columns = {}
+    for role, rows in (("home", slice(0, None, 2)), ("away", slice(1, None, 2))):
+        for split in splits:
+            for name, column in blocks[split].items():
+                columns[f"{role}_{split}_{name}"] = column[rows]
+    features = pd.DataFrame(columns)[feature_columns(windows, stats, splits)].astype(np.float32)
+    # De vuelta al orden de ``matches``
+    features = features.iloc[np.argsort(chronological)]
+    features.index = matches.index
+    return features
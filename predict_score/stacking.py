@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""Stacking sobre predicciones fuera de pliegue cacheadas.
+
+``StackingRegressor`` vuelve a ajustar sus modelos base (con su validación
+cruzada interna) cada vez que se entrena, una vez por objetivo, aunque esos
+mismos modelos ya se hayan entrenado sueltos. Aquí las predicciones fuera de
+pliegue de cada modelo base se calculan una sola vez por objetivo
+(``evaluation_engine.run_out_of_fold``) y se guardan en un
+``OutOfFoldPredictions``. Cualquier meta-modelo (lineal, ridge, un GBM
+pequeño) se entrena después sobre esa matriz de filas x modelos base en
+milisegundos, así que probar combinaciones no vuelve a pagar los modelos base.
+
+Con ``cache`` las predicciones se guardan en un ``.npz``; al reutilizarlo sólo
+se calculan los modelos nuevos o con hiperparámetros distintos, y se descarta
+si el split (características y objetivos) o el número de pliegues cambian.
+
+Uso:
+    python -m predict_score.stacking --cache oof.npz
+    python -m predict_score.stacking --cache oof.npz --combination "Random Forest" XGBRegressor CatBoostRegressor
+"""
+
+import argparse
+import itertools
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression, RidgeCV
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+from .evaluation_engine import run_out_of_fold
+from .model_catalog import STACKING_BASE_MODELS
+
+
+def build_meta_learners():
+    """Meta-modelos que se prueban sobre las predicciones de los modelos base."""
+    return {
+        "linear": LinearRegression(),
+        "ridge": RidgeCV(alphas=np.logspace(-3, 3, 13)),
+        "gbm": GradientBoostingRegressor(n_estimators=50, max_depth=2, learning_rate=0.1, random_state=42),
+    }
+
+
+def _target_names(target):
+    return list(target) if isinstance(target, tuple) else [target]
+
+
+def split_fingerprint(X_train, X_test, targets, cv):
+    """Huella del split: si cambian los datos, los objetivos o los pliegues, la caché no sirve."""
+    ys = {str(target): (np.asarray(y_train), np.asarray(y_test)) for target, (y_train, y_test) in targets.items()}
+    return joblib.hash((X_train, X_test, ys, cv))
+
+
+class OutOfFoldPredictions:
+    """
+    Predicciones de los modelos base por objetivo ('Home', 'Away').
+
+    ``train[objetivo]`` tiene una columna por modelo con la predicción fuera de
+    pliegue de cada fila de entrenamiento; ``test[objetivo]``, la del modelo
+    ajustado con todo el entrenamiento sobre el test. Es lo que ve el
+    meta-modelo de un ``StackingRegressor`` (sin ``passthrough``).
+
+    Args:
+        fingerprint (str): ``split_fingerprint`` del split.
+        cv (int): Número de pliegues.
+    """
+
+    def __init__(self, fingerprint, cv):
+        self.fingerprint = fingerprint
+        self.cv = cv
+        self.train = {}
+        self.test = {}
+        self.y_train = {}
+        self.y_test = {}
+        self.fit_seconds = {}
+        self.model_keys = {}
+
+    @property
+    def models(self):
+        return list(self.model_keys)
+
+    @property
+    def targets(self):
+        return list(self.train)
+
+    def add(self, predictions, targets, model_keys):
+        """Incorpora la salida de ``run_out_of_fold`` (una columna por modelo nuevo)."""
+        for (name, target), (y_oof, y_pred, fit_seconds) in predictions.items():
+            y_train, y_test = targets[target]
+            names = _target_names(target)
+            y_oof = y_oof.reshape(len(y_oof), len(names))
+            y_pred = y_pred.reshape(len(y_pred), len(names))
+            y_train = np.asarray(y_train, dtype=float).reshape(len(y_oof), len(names))
+            y_test = np.asarray(y_test, dtype=float).reshape(len(y_pred), len(names))
+            for i, target_name in enumerate(names):
+                self.train.setdefault(target_name, pd.DataFrame(index=range(len(y_oof))))[name] = y_oof[:, i]
+                self.test.setdefault(target_name, pd.DataFrame(index=range(len(y_pred))))[name] = y_pred[:, i]
+                self.y_train[target_name] = y_train[:, i]
+                self.y_test[target_name] = y_test[:, i]
+                self.fit_seconds.setdefault(target_name, {})[name] = fit_seconds
+            self.model_keys[name] = model_keys[name]
+
+    def scores(self, models=None):
+        """MSE/MAE de cada modelo base en test, en el formato de ``run_model_evaluation``."""
+        rows = []
+        for name in models or self.models:
+            for target in self.targets:
+                y_pred = self.test[target][name]
+                rows.append({
+                    "Model": name,
+                    "Target": target,
+                    "MSE": mean_squared_error(self.y_test[target], y_pred),
+                    "MAE": mean_absolute_error(self.y_test[target], y_pred),
+                    "Fit seconds": self.fit_seconds[target][name],
+                })
+        return pd.DataFrame(rows)
+
+    def evaluate(self, meta_learner, models=None, name=None):
+        """
+        Entrena ``meta_learner`` sobre las predicciones fuera de pliegue de
+        ``models`` (por defecto todos) y lo evalúa en test, por objetivo.
+
+        Returns:
+            DataFrame: Filas (Model, Target, MSE, MAE, Fit seconds) como ``scores``;
+            los segundos son sólo los del meta-modelo.
+        """
+        models = list(models or self.models)
+        name = name or " + ".join(models)
+        rows = []
+        for target in self.targets:
+            meta = clone(meta_learner)
+            start = time.perf_counter()
+            meta.fit(self.train[target][models].to_numpy(), self.y_train[target])
+            fit_seconds = time.perf_counter() - start
+            y_pred = meta.predict(self.test[target][models].to_numpy())
+            rows.append({
+                "Model": name,
+                "Target": target,
+                "MSE": mean_squared_error(self.y_test[target], y_pred),
+                "MAE": mean_absolute_error(self.y_test[target], y_pred),
+                "Fit seconds": fit_seconds,
+            })
+        return pd.DataFrame(rows)
+
+    def save(self, path):
+        arrays = {
+            "fingerprint": np.array(self.fingerprint), "cv": np.array(self.cv),
+            "models": np.array(self.models, dtype=str),
+            "model_keys": np.array([self.model_keys[name] for name in self.models], dtype=str),
+            "targets": np.array(self.targets, dtype=str),
+        }
+        for target in self.targets:
+            arrays[f"train_{target}"] = self.train[target][self.models].to_numpy()
+            arrays[f"test_{target}"] = self.test[target][self.models].to_numpy()
+            arrays[f"y_train_{target}"] = self.y_train[target]
+            arrays[f"y_test_{target}"] = self.y_test[target]
+            arrays[f"fit_seconds_{target}"] = np.array([self.fit_seconds[target][name] for name in self.models])
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            oof = cls(str(data["fingerprint"]), int(data["cv"]))
+            models = [str(name) for name in data["models"]]
+            oof.model_keys = dict(zip(models, (str(key) for key in data["model_keys"])))
+            for target in (str(target) for target in data["targets"]):
+                oof.train[target] = pd.DataFrame(data[f"train_{target}"], columns=models)
+                oof.test[target] = pd.DataFrame(data[f"test_{target}"], columns=models)
+                oof.y_train[target] = data[f"y_train_{target}"]
+                oof.y_test[target] = data[f"y_test_{target}"]
+                oof.fit_seconds[target] = dict(zip(models, data[f"fit_seconds_{target}"].tolist()))
+        return oof
+
+
+def compute_out_of_fold(models, preprocessor, X_train, X_test, targets, cv=5, n_jobs=None, threads_per_worker=1,
+                        cache=None):
+    """
+    Predicciones fuera de pliegue de ``models`` para cada objetivo.
+
+    Args:
+        models (dict): Nombre -> estimador sin ajustar (los modelos base).
+        preprocessor (ColumnTransformer): Se ajusta una vez sobre ``X_train``.
+        targets (dict): Como en ``evaluation_engine.run_model_evaluation``.
+        cache (str): ``.npz`` donde se leen y guardan las predicciones; sólo se
+            calculan los modelos que falten o cuyos hiperparámetros cambien.
+
+    Returns:
+        OutOfFoldPredictions: Predicciones de todos los modelos de ``models``
+        (y de los que ya hubiera en la caché).
+    """
+    fingerprint = split_fingerprint(X_train, X_test, targets, cv)
+    oof = None
+    if cache and os.path.exists(cache):
+        oof = OutOfFoldPredictions.load(cache)
+        if oof.fingerprint != fingerprint:
+            oof = None
+    oof = oof or OutOfFoldPredictions(fingerprint, cv)
+
+    model_keys = {name: joblib.hash(model.get_params()) for name, model in models.items()}
+    pending = {name: model for name, model in models.items() if oof.model_keys.get(name) != model_keys[name]}
+    if pending:
+        predictions = run_out_of_fold(pending, preprocessor, X_train, X_test, targets, cv=cv, n_jobs=n_jobs,
+                                      threads_per_worker=threads_per_worker)
+        oof.add(predictions, targets, model_keys)
+        if cache:
+            oof.save(cache)
+    return oof
+
+
+def evaluate_ensembles(oof, combinations=None, meta_learners=None):
+    """
+    Evalúa cada meta-modelo sobre cada combinación de modelos base.
+
+    Args:
+        oof (OutOfFoldPredictions): Predicciones de los modelos base.
+        combinations (list): Listas de nombres de modelo. Por defecto, los
+            estimadores base del ``StackingRegressor`` y todos los modelos.
+        meta_learners (dict): Nombre -> meta-modelo (por defecto ``build_meta_learners()``).
+
+    Returns:
+        DataFrame: Una fila por (ensemble, objetivo), con el ensemble como
+        "<meta> [<modelo> + <modelo>...]".
+    """
+    if combinations is None:
+        combinations = [list(STACKING_BASE_MODELS.values()), oof.models]
+    meta_learners = meta_learners or build_meta_learners()
+    frames = [
+        oof.evaluate(meta, models, name=f"{meta_name} [{' + '.join(models)}]")
+        for models in (list(c) for c in dict.fromkeys(tuple(c) for c in combinations))
+        for meta_name, meta in meta_learners.items()
+        if all(name in oof.models for name in models)
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def all_combinations(models, min_size=2, max_size=None):
+    """Todas las combinaciones de ``models`` de ``min_size`` a ``max_size`` modelos."""
+    max_size = max_size or len(models)
+    return [list(c) for size in range(min_size, max_size + 1) for c in itertools.combinations(models, size)]
+
+
+def main(argv=None):
+    from .comparison import create_preprocessor, preprocess_data
+    from .model_catalog import build_models
+
+    parser = argparse.ArgumentParser(description="Stacking ensembles on cached out-of-fold predictions")
+    parser.add_argument("--cache", default="oof_predictions.npz", help="out-of-fold predictions (.npz)")
+    parser.add_argument("--models", nargs="+", help="base models (default: every catalog model except stacking)")
+    parser.add_argument("--combination", nargs="+", action="append", dest="combinations",
+                        help="base models of one ensemble (repeatable)")
+    parser.add_argument("--all-combinations", type=int, metavar="MAX_SIZE",
+                        help="every combination of 2..MAX_SIZE base models")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int)
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    (X_train, X_test, y_home_train, y_home_test), (_, _, y_away_train, y_away_test) = preprocess_data()
+    models = {name: model for name, model in build_models().items() if name != "Stacking Regressor"}
+    if args.models:
+        models = {name: models[name] for name in args.models}
+    targets = {"Home": (y_home_train, y_home_test), "Away": (y_away_train, y_away_test)}
+    oof = compute_out_of_fold(models, create_preprocessor(), X_train, X_test, targets, cv=args.cv,
+                              n_jobs=args.n_jobs, threads_per_worker=args.threads_per_worker, cache=args.cache)
+
+    combinations = args.combinations
+    if args.all_combinations:
+        combinations = (combinations or []) + all_combinations(list(models), max_size=args.all_combinations)
+    start = time.perf_counter()
+    results = pd.concat([oof.scores(list(models)), evaluate_ensembles(oof, combinations)], ignore_index=True)
+    seconds = time.perf_counter() - start
+    table = results.pivot_table(index="Model", columns="Target", values="MSE", sort=False)
+    table["Average MSE"] = table.mean(axis=1)
+    print(table.sort_values("Average MSE").to_string())
+    print(f"{len(results) // len(oof.targets)} models and ensembles scored in {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Estado de forma de los equipos (HF/AF) con buffers circulares por equipo.
+
+La forma de un equipo es la media de ``goal_difference`` (goles local menos
+goles visitante) en sus últimos ``window`` partidos como local (HF) o como
+visitante (AF). ``TeamFormStore`` guarda esos últimos valores en un buffer
+circular de tamaño fijo por equipo y lado, de modo que consultar o añadir un
+resultado cuesta O(1) independientemente del número de partidos históricos.
+"""
+
+import numpy as np
+import pandas as pd
+
+SIDES = ("Home", "Away")
+
+
+def _sorted_groups(codes):
+    """
+    Orden estable de las filas por grupo y, para cada posición de ese orden,
+    el índice donde empieza su grupo.
+    """
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.ones(len(codes), dtype=bool)
+    starts[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(codes)), 0))
+    return order, first
+
+
+def _rolling_sums_by_group(codes, values, window):
+    """
+    Suma y número de elementos de la ventana móvil (incluida la fila actual)
+    de ``values`` dentro de cada grupo, respetando el orden de las filas.
+    """
+    order, first = _sorted_groups(codes)
+    idx = np.arange(len(codes))
+    cumsum = np.r_[0.0, np.cumsum(values[order])]
+    lo = np.maximum(idx + 1 - window, first)
+
+    sums = np.empty(len(codes))
+    counts = np.empty(len(codes), dtype=np.int64)
+    sums[order] = cumsum[idx + 1] - cumsum[lo]
+    counts[order] = idx + 1 - lo
+    return sums, counts
+
+
+class TeamFormStore:
+    """
+    Forma local/visitante de cada equipo sobre sus últimos ``window`` partidos.
+
+    Args:
+        window (int): Tamaño de la ventana (5 en todos los scripts).
+    """
+
+    def __init__(self, window=5):
+        self.window = window
+        self.teams = {}
+        self._buffers = np.zeros((len(SIDES), 0, window))
+        self._counts = np.zeros((len(SIDES), 0), dtype=np.int64)
+
+    def __contains__(self, team):
+        return team in self.teams
+
+    def __len__(self):
+        return len(self.teams)
+
+    def _ensure_writable(self):
+        # Los buffers cargados de un bundle con mmap_mode='r' son de sólo lectura
+        if not self._buffers.flags.writeable or not self._counts.flags.writeable:
+            self._buffers = np.array(self._buffers)
+            self._counts = np.array(self._counts)
+
+    def _team_index(self, team):
+        index = self.teams.get(team)
+        if index is None:
+            index = self.teams[team] = len(self.teams)
+            if index >= self._buffers.shape[1]:
+                grow = max(16, self._buffers.shape[1])
+                self._buffers = np.concatenate(
+                    [self._buffers, np.zeros((len(SIDES), grow, self.window))], axis=1)
+                self._counts = np.concatenate(
+                    [self._counts, np.zeros((len(SIDES), grow), dtype=np.int64)], axis=1)
+        return index
+
+    def _push(self, side, team, value):
+        self._ensure_writable()
+        index = self._team_index(team)
+        count = self._counts[side, index]
+        self._buffers[side, index, count % self.window] = value
+        self._counts[side, index] = count + 1
+
+    def update(self, home_team, away_team, goal_difference):
+        """Añade el resultado de un partido a la forma de ambos equipos."""
+        self._push(0, home_team, goal_difference)
+        self._push(1, away_team, goal_difference)
+
+    def update_many(self, matches):
+        """Añade en orden los partidos de un DataFrame con HomeTeam, AwayTeam, FTHG y FTAG."""
+        goal_difference = (matches["FTHG"] - matches["FTAG"]).to_numpy(dtype=float)
+        for home, away, value in zip(matches["HomeTeam"], matches["AwayTeam"], goal_difference):
+            self.update(home, away, value)
+
+    def form(self, team, side="Home", full_window=False):
+        """
+        Media de ``goal_difference`` en los últimos partidos de ``team``.
+
+        Args:
+            team (str): Nombre del equipo.
+            side (str): 'Home' (forma como local) o 'Away' (como visitante).
+            full_window (bool): Si es True, devuelve NaN mientras el equipo no
+                tenga ``window`` partidos (como ``rolling(window).mean()``); si es
+                False, usa la media de los que haya (0 si no hay ninguno).
+
+        Returns:
+            float: Forma del equipo.
+        """
+        index = self.teams.get(team)
+        count = 0 if index is None else self._counts[SIDES.index(side), index]
+        if count < self.window and (full_window or count == 0):
+            return np.nan if full_window else 0.0
+        filled = min(count, self.window)
+        return float(self._buffers[SIDES.index(side), index, :filled].sum() / filled)
+
+    def recent(self, team, side="Home", n=None):
+        """Últimos ``n`` valores (como mucho ``window``) de ``team`` en ese lado, del más antiguo al último."""
+        index = self.teams.get(team)
+        if index is None:
+            return np.empty(0)
+        count = self._counts[SIDES.index(side), index]
+        n = min(count, self.window if n is None else n)
+        return self._buffers[SIDES.index(side), index, np.arange(count - n, count) % self.window]
+
+    def home_form(self, team):
+        return self.form(team, "Home")
+
+    def away_form(self, team):
+        return self.form(team, "Away")
+
+    @classmethod
+    def from_matches(cls, matches, window=5):
+        """Construye el estado a partir de partidos históricos en orden de filas."""
+        store = cls(window)
+        store._load(matches)
+        return store
+
+    def _load(self, matches):
+        # Carga vectorizada: equivale a llamar update() fila a fila
+        goal_difference = (matches["FTHG"] - matches["FTAG"]).to_numpy(dtype=float)
+        self._ensure_writable()
+        for side, column in enumerate(f"{s}Team" for s in SIDES):
+            codes, names = pd.factorize(matches[column])
+            for name in names:
+                self._team_index(name)
+            team_index = np.array([self.teams[name] for name in names], dtype=np.int64)[codes]
+            order, first = _sorted_groups(team_index)
+            seen = np.empty_like(team_index)
+            seen[order] = np.arange(len(team_index)) - first
+            sizes = np.bincount(team_index, minlength=self._counts.shape[1])
+
+            # Sólo los últimos ``window`` partidos de cada equipo quedan en el buffer
+            tail = sizes[team_index] - seen <= self.window
+            position = self._counts[side, team_index] + seen
+            self._buffers[side, team_index[tail], position[tail] % self.window] = goal_difference[tail]
+            self._counts[side] += sizes
+
+
+def build_form_features(matches, window=5):
+    """
+    Calcula HF y AF para cada fila de ``matches`` de forma vectorizada.
+
+    Reproduce ``groupby(...)['goal_difference'].rolling(window).mean()``: la
+    ventana incluye el partido de la propia fila y vale NaN hasta que el equipo
+    tiene ``window`` partidos en ese lado.
+
+    Args:
+        matches (DataFrame): Partidos con HomeTeam, AwayTeam, FTHG y FTAG.
+        window (int): Tamaño de la ventana.
+
+    Returns:
+        home_form (array): HF por fila.
+        away_form (array): AF por fila.
+        store (TeamFormStore): Estado tras el último partido, listo para predecir.
+    """
+    goal_difference = (matches["FTHG"] - matches["FTAG"]).to_numpy(dtype=float)
+    forms = []
+    for column in ("HomeTeam", "AwayTeam"):
+        codes, _ = pd.factorize(matches[column])
+        sums, counts = _rolling_sums_by_group(codes, goal_difference, window)
+        forms.append(np.where(counts >= window, sums / window, np.nan))
+    return forms[0], forms[1], TeamFormStore.from_matches(matches, window)
+
+
+def iter_form_features(chunks, store):
+    """
+    Calcula HF y AF bloque a bloque, sin juntar todos los partidos.
+
+    Cada bloque usa como historia previa los últimos ``window - 1`` valores de
+    ``store``, así que recorrer los bloques en orden da los mismos valores que
+    ``build_form_features`` sobre su concatenación.
+
+    Args:
+        chunks (iterable): DataFrames con HomeTeam, AwayTeam, FTHG y FTAG, en orden
+            (p. ej. ``match_data.iter_matches``).
+        store (TeamFormStore): Estado previo; se actualiza con cada bloque.
+
+    Yields:
+        DataFrame: El bloque con ``goal_difference``, ``HF`` y ``AF`` añadidas.
+    """
+    window = store.window
+    for chunk in chunks:
+        chunk = chunk.copy()
+        goal_difference = (chunk["FTHG"] - chunk["FTAG"]).to_numpy(dtype=float)
+        chunk["goal_difference"] = goal_difference
+        for side, column in zip(SIDES, ("HF", "AF")):
+            codes, names = pd.factorize(chunk[f"{side}Team"])
+            history = [store.recent(name, side, window - 1) for name in names]
+            # La historia de cada equipo va delante de sus filas del bloque
+            history_codes = np.repeat(np.arange(len(names)), [len(values) for values in history])
+            sums, counts = _rolling_sums_by_group(np.r_[history_codes, codes],
+                                                  np.r_[np.concatenate(history or [np.empty(0)]), goal_difference],
+                                                  window)
+            sums, counts = sums[len(history_codes):], counts[len(history_codes):]
+            chunk[column] = np.where(counts >= window, sums / window, np.nan)
+        store._load(chunk)
+        yield chunk
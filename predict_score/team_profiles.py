@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Índice de perfiles de equipo para las consultas de ``modelonosupervisado``.
+
+En una sola pasada sobre los partidos (ya etiquetados con su cluster) se
+acumulan, por equipo y por lado (local/visitante): el histograma de
+clusters, la suma de cada variable de ``VARS`` y el primer partido visto en
+cada cluster. Con eso el cluster dominante, las medias por lado y la
+comparación entre dos equipos son búsquedas O(1), y añadir partidos nuevos
+sólo suma sus filas (``update``) sin recorrer el histórico.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .clustering import VARS
+
+SIDES = ("Home", "Away")
+NEVER = np.iinfo(np.int64).max
+
+
+class TeamProfileIndex:
+    """
+    Perfiles por equipo y lado.
+
+    Args:
+        n_clusters (int): Número de clusters de las etiquetas.
+        variables (list): Variables de las medias (``VARS``).
+    """
+
+    def __init__(self, n_clusters, variables=VARS):
+        self.n_clusters = n_clusters
+        self.variables = list(variables)
+        self.teams = {}
+        self.n_rows = 0
+        self._counts = np.zeros((len(SIDES), 0, n_clusters), dtype=np.int64)
+        self._sums = np.zeros((len(SIDES), 0, len(self.variables)))
+        self._first_seen = np.full((len(SIDES), 0, n_clusters), NEVER, dtype=np.int64)
+        # Totales por cluster (equivale a groupby('Cluster')[VARS].mean())
+        self._cluster_counts = np.zeros(n_clusters, dtype=np.int64)
+        self._cluster_sums = np.zeros((n_clusters, len(self.variables)))
+        self._cluster_first_seen = np.full(n_clusters, NEVER, dtype=np.int64)
+
+    def __contains__(self, team):
+        return team in self.teams
+
+    def __len__(self):
+        return len(self.teams)
+
+    @classmethod
+    def from_matches(cls, dataset, labels, n_clusters=None, variables=VARS):
+        """
+        Construye el índice a partir de partidos y su cluster.
+
+        Args:
+            dataset (DataFrame): Partidos con HomeTeam, AwayTeam y ``variables``.
+            labels (array): Cluster de cada fila (p. ej. ``dataset['Cluster']``).
+            n_clusters (int): Por defecto, ``max(labels) + 1``.
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        index = cls(n_clusters or int(labels.max()) + 1, variables)
+        index.update(dataset, labels)
+        return index
+
+    def _grow(self, names):
+        for name in names:
+            if name not in self.teams:
+                self.teams[name] = len(self.teams)
+        missing = len(self.teams) - self._counts.shape[1]
+        if missing > 0:
+            grow = max(missing, 16, self._counts.shape[1])
+            self._counts = np.concatenate(
+                [self._counts, np.zeros((len(SIDES), grow, self.n_clusters), dtype=np.int64)], axis=1)
+            self._sums = np.concatenate(
+                [self._sums, np.zeros((len(SIDES), grow, len(self.variables)))], axis=1)
+            self._first_seen = np.concatenate(
+                [self._first_seen, np.full((len(SIDES), grow, self.n_clusters), NEVER, dtype=np.int64)], axis=1)
+
+    def update(self, matches, labels):
+        """
+        Añade partidos nuevos (y su cluster, p. ej. de ``ClusterModel.assign``).
+
+        Args:
+            matches (DataFrame): Partidos con HomeTeam, AwayTeam y ``variables``.
+            labels (array): Cluster de cada fila.
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        values = matches[self.variables].fillna(0).to_numpy(dtype=float)
+        rows = self.n_rows + np.arange(len(matches))
+
+        for side, column in enumerate(f"{s}Team" for s in SIDES):
+            codes, names = pd.factorize(matches[column])
+            self._grow(names)
+            team_index = np.array([self.teams[name] for name in names], dtype=np.int64)[codes]
+            cell = team_index * self.n_clusters + labels
+            size = self._counts.shape[1] * self.n_clusters
+            self._counts[side] += np.bincount(cell, minlength=size).reshape(-1, self.n_clusters)
+            np.add.at(self._sums[side], team_index, values)
+            np.minimum.at(self._first_seen[side].reshape(-1), cell, rows)
+
+        self._cluster_counts += np.bincount(labels, minlength=self.n_clusters)
+        np.add.at(self._cluster_sums, labels, values)
+        np.minimum.at(self._cluster_first_seen, labels, rows)
+        self.n_rows += len(matches)
+
+    def _side(self, side):
+        return SIDES.index(side)
+
+    def _team(self, team):
+        index = self.teams.get(team)
+        if index is None:
+            raise KeyError(f"'{team}' does not exist in the dataset.")
+        return index
+
+    def cluster_histogram(self, team, side="Home"):
+        """Partidos de ``team`` en cada cluster jugando como ``side``."""
+        return self._counts[self._side(side), self._team(team)].copy()
+
+    def dominant_cluster(self, team, side="Home"):
+        """Cluster más frecuente (en empate, el menor, como ``Series.mode()[0]``)."""
+        return int(np.argmax(self._counts[self._side(side), self._team(team)]))
+
+    def mean_stats(self, team, side="Home"):
+        """Media de ``variables`` en los partidos de ``team`` como ``side``."""
+        side, team_index = self._side(side), self._team(team)
+        matches = self._counts[side, team_index].sum()
+        return pd.Series(self._sums[side, team_index] / max(matches, 1), index=self.variables, name=team)
+
+    def cluster_stats(self, cluster=None):
+        """Media de ``variables`` por cluster (DataFrame) o de un cluster (Series)."""
+        means = self._cluster_sums / np.maximum(self._cluster_counts, 1)[:, None]
+        table = pd.DataFrame(means, columns=self.variables).rename_axis("Cluster")
+        return table if cluster is None else table.loc[cluster]
+
+    def clusters(self):
+        """Clusters presentes, en orden de primera aparición (como ``unique()``)."""
+        present = np.flatnonzero(self._cluster_counts)
+        return present[np.argsort(self._cluster_first_seen[present], kind="stable")].tolist()
+
+    def teams_in_cluster(self, cluster, side="Home"):
+        """Equipos con algún partido en ``cluster`` como ``side``, en orden de primera aparición."""
+        first_seen = self._first_seen[self._side(side), :len(self.teams), cluster]
+        present = np.flatnonzero(first_seen != NEVER)
+        names = np.array(list(self.teams), dtype=object)
+        return names[present[np.argsort(first_seen[present], kind="stable")]].tolist()
+
+    def compare(self, home_team, away_team):
+        """
+        Compara el cluster dominante del local (como local) con el del visitante (como visitante).
+
+        Returns:
+            dict: Clusters dominantes, medias de cada cluster y perfil propio de cada equipo
+            en su lado, más qué equipo supera al otro en FTHG y HST según esas medias.
+        """
+        home_cluster = self.dominant_cluster(home_team, "Home")
+        away_cluster = self.dominant_cluster(away_team, "Away")
+        home_stats = self.cluster_stats(home_cluster)
+        away_stats = self.cluster_stats(away_cluster)
+        return {
+            "home_cluster": home_cluster,
+            "away_cluster": away_cluster,
+            "home_cluster_stats": home_stats,
+            "away_cluster_stats": away_stats,
+            "home_profile": self.mean_stats(home_team, "Home"),
+            "away_profile": self.mean_stats(away_team, "Away"),
+            "more_goals": home_team if home_stats["FTHG"] > away_stats["FTHG"] else away_team,
+            "more_shots_on_target": home_team if home_stats["HST"] > away_stats["HST"] else away_team,
+        }
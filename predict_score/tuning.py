@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""Búsqueda de hiperparámetros con Hyperband / successive halving.
+
+Los candidatos de cada modelo se evalúan primero con poco recurso (una
+fracción de las filas de entrenamiento o pocos árboles) y sólo el mejor
+``1/eta`` de cada ronda pasa a la siguiente con ``eta`` veces más recurso;
+Hyperband repite esto con varios compromisos entre número de candidatos y
+recurso inicial. Así las configuraciones sin futuro se descartan pronto.
+
+- Las matrices preprocesadas de cada fold se calculan una sola vez, se
+  guardan en ``<search_dir>/folds`` y todos los candidatos las abren con
+  ``mmap_mode='c'`` (como ``evaluation_engine``).
+- Los trials de una ronda corren en paralelo en un pool de procesos.
+- Cada trial terminado se añade a ``<search_dir>/trials.jsonl``; al reanudar
+  la búsqueda los trials ya hechos se leen de ahí y no se repiten.
+- ``cpu_hours`` limita el tiempo de CPU total (incluidos los trials de
+  ejecuciones anteriores); al agotarse se devuelve lo mejor encontrado.
+
+Uso:
+    python -m predict_score.tuning --models "Random Forest" XGBRegressor --cpu-hours 2 --search-dir tuning_runs/nightly
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import KFold, ParameterSampler, TimeSeriesSplit
+from threadpoolctl import threadpool_limits
+
+from .evaluation_engine import default_workers, limit_threads
+from .model_catalog import build_models
+from .multi_output import GOAL_TARGETS
+from .preprocessing import create_preprocessor
+
+TUNED_PARAMS_PATH = "tuned_params.json"
+
+# Espacio de búsqueda y parámetro que hace de recurso cuando se escala por estimadores
+SEARCH_SPACES = {
+    "Random Forest": {
+        "estimators_param": "n_estimators",
+        "space": {
+            "max_depth": [None, 4, 6, 8, 12, 16],
+            "min_samples_leaf": [1, 2, 5, 10, 20],
+            "max_features": [1.0, 0.5, 0.3, "sqrt"],
+        },
+    },
+    "Gradient Boosting": {
+        "estimators_param": "n_estimators",
+        "space": {
+            "learning_rate": [0.01, 0.03, 0.05, 0.1, 0.2],
+            "max_depth": [2, 3, 4, 5],
+            "subsample": [0.6, 0.8, 1.0],
+            "min_samples_leaf": [1, 5, 20],
+        },
+    },
+    "XGBRegressor": {
+        "estimators_param": "n_estimators",
+        "space": {
+            "learning_rate": [0.01, 0.03, 0.05, 0.1, 0.2],
+            "max_depth": [2, 3, 4, 6, 8],
+            "subsample": [0.6, 0.8, 1.0],
+            "colsample_bytree": [0.5, 0.8, 1.0],
+            "min_child_weight": [1, 5, 10],
+            "reg_lambda": [0.1, 1.0, 10.0],
+        },
+    },
+    "CatBoostRegressor": {
+        "estimators_param": "iterations",
+        "space": {
+            "learning_rate": [0.01, 0.03, 0.05, 0.1],
+            "depth": [4, 6, 8],
+            "l2_leaf_reg": [1, 3, 10],
+        },
+    },
+    "KNeighbors (default)": {
+        "estimators_param": None,
+        "space": {
+            "n_neighbors": [5, 10, 20, 40, 80],
+            "weights": ["uniform", "distance"],
+        },
+    },
+    "Decision Tree (no max_depth)": {
+        "estimators_param": None,
+        "space": {
+            "max_depth": [None, 3, 4, 6, 8, 12],
+            "min_samples_leaf": [1, 5, 10, 20, 50],
+        },
+    },
+}
+
+
+def trial_key(model_name, params, resource, fold_id):
+    text = json.dumps([model_name, params, resource, fold_id], sort_keys=True, default=str)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class FoldCache:
+    """
+    Matrices preprocesadas de cada fold, calculadas una vez y abiertas con mmap.
+
+    Args:
+        directory (str): Carpeta de la caché.
+        X (DataFrame): Características (HF, AF, HomeTeam, AwayTeam).
+        y (ndarray): Objetivos, una columna por objetivo.
+        n_splits (int): Número de folds.
+        time_series (bool): Folds en orden temporal (``TimeSeriesSplit``) en vez de ``KFold``.
+        seed (int): Semilla del ``KFold`` y del orden de submuestreo de filas.
+    """
+
+    def __init__(self, directory, X, y, n_splits=3, time_series=False, seed=123):
+        self.directory = directory
+        splitter = TimeSeriesSplit(n_splits) if time_series else KFold(n_splits, shuffle=True, random_state=seed)
+        # El id cambia si cambian los datos o la partición: una caché vieja nunca se reutiliza por error
+        digest = hashlib.sha1(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+        digest.update(np.ascontiguousarray(y).tobytes())
+        digest.update(repr((n_splits, time_series, seed)).encode())
+        self.fold_id = digest.hexdigest()[:16]
+        self.paths = []
+
+        os.makedirs(directory, exist_ok=True)
+        rng = np.random.default_rng(seed)
+        for i, (train, valid) in enumerate(splitter.split(X)):
+            path = os.path.join(directory, f"{self.fold_id}_{i}.joblib")
+            if not os.path.exists(path):
+                preprocessor = create_preprocessor().fit(X.iloc[train])
+                # Orden aleatorio fijo: los primeros k% de filas son la submuestra del recurso "rows"
+                order = rng.permutation(len(train)) if not time_series else np.arange(len(train))
+                fold = {
+                    "X_train": preprocessor.transform(X.iloc[train[order]]),
+                    "y_train": y[train[order]],
+                    "X_valid": preprocessor.transform(X.iloc[valid]),
+                    "y_valid": y[valid],
+                }
+                joblib.dump(fold, path + ".tmp")
+                os.replace(path + ".tmp", path)
+            self.paths.append(path)
+
+
+def _run_trial(model_name, params, resource, fold_paths, threads):
+    """Ajusta un candidato en todos los folds y devuelve el MSE medio (media de los objetivos)."""
+    kind, amount = resource
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    estimator = build_models()[model_name]
+    estimator.set_params(**params)
+    estimators_param = SEARCH_SPACES[model_name]["estimators_param"]
+    if kind == "estimators":
+        estimator.set_params(**{estimators_param: int(amount)})
+    estimator = limit_threads(estimator, threads)
+
+    fold_scores = []
+    with threadpool_limits(limits=threads):
+        for path in fold_paths:
+            fold = joblib.load(path, mmap_mode="c")
+            rows = len(fold["y_train"]) if kind != "rows" else max(10, int(len(fold["y_train"]) * amount))
+            X_train, y_train = fold["X_train"][:rows], fold["y_train"][:rows]
+            scores = []
+            for target in range(y_train.shape[1]):
+                estimator.fit(X_train, y_train[:, target])
+                scores.append(mean_squared_error(fold["y_valid"][:, target], estimator.predict(fold["X_valid"])))
+            fold_scores.append(float(np.mean(scores)))
+
+    return {
+        "model": model_name,
+        "params": params,
+        "resource": [kind, amount],
+        "score": float(np.mean(fold_scores)),
+        "fold_scores": fold_scores,
+        "wall_seconds": time.perf_counter() - start_wall,
+        "cpu_seconds": time.process_time() - start_cpu,
+    }
+
+
+class HyperbandSearch:
+    """
+    Hyperband sobre filas o estimadores para los modelos de ``evaluate_models``.
+
+    Args:
+        search_dir (str): Carpeta con ``trials.jsonl``, la caché de folds y los mejores parámetros.
+        resource (str): 'rows' (fracción de filas de entrenamiento) o 'estimators'
+            (árboles/iteraciones; los modelos sin estimadores usan filas).
+        min_resource, max_resource: Rango del recurso (por defecto 1/27..1 en filas y 25..675 estimadores).
+        eta (int): Factor de reducción entre rondas.
+        n_jobs (int): Trials en paralelo. Por defecto, núcleos / ``threads_per_trial``.
+        threads_per_trial (int): Hilos de cada trial.
+        cpu_hours (float): Presupuesto de CPU total de la búsqueda (None = sin límite).
+        seed (int): Semilla del muestreo de candidatos (misma semilla = mismos trials al reanudar).
+    """
+
+    def __init__(self, search_dir, resource="rows", min_resource=None, max_resource=None, eta=3,
+                 n_jobs=None, threads_per_trial=1, cpu_hours=None, seed=42):
+        self.search_dir = search_dir
+        self.resource = resource
+        if resource == "rows":
+            self.min_resource, self.max_resource = min_resource or 1 / 27, max_resource or 1.0
+        else:
+            self.min_resource, self.max_resource = min_resource or 25, max_resource or 675
+        self.eta = eta
+        self.threads_per_trial = threads_per_trial
+        self.n_jobs = n_jobs or default_workers(threads_per_trial)
+        self.cpu_budget = cpu_hours * 3600 if cpu_hours else None
+        self.seed = seed
+        self.trials_path = os.path.join(search_dir, "trials.jsonl")
+        os.makedirs(search_dir, exist_ok=True)
+        self.trials = self._load_trials()
+
+    def _load_trials(self):
+        trials = {}
+        if os.path.exists(self.trials_path):
+            with open(self.trials_path) as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        trials[record["key"]] = record
+        return trials
+
+    @property
+    def cpu_seconds(self):
+        return sum(trial["cpu_seconds"] for trial in self.trials.values())
+
+    def budget_left(self):
+        return self.cpu_budget is None or self.cpu_seconds < self.cpu_budget
+
+    def _resource_for(self, model_name, amount):
+        if self.resource == "estimators" and SEARCH_SPACES[model_name]["estimators_param"]:
+            return ("estimators", int(round(amount)))
+        # Sin parámetro de estimadores se escala por filas en la misma proporción
+        fraction = amount / self.max_resource if self.resource == "estimators" else amount
+        return ("rows", round(float(fraction), 6))
+
+    def _evaluate(self, model_name, candidates, amount, folds):
+        """Evalúa los candidatos con el recurso dado; reutiliza los trials ya persistidos."""
+        resource = self._resource_for(model_name, amount)
+        keys = [trial_key(model_name, params, resource, folds.fold_id) for params in candidates]
+        pending = [(key, params) for key, params in zip(keys, candidates) if key not in self.trials]
+
+        # Por lotes del tamaño del pool para poder cortar al agotar el presupuesto
+        for start in range(0, len(pending), self.n_jobs):
+            if not self.budget_left():
+                break
+            batch = pending[start:start + self.n_jobs]
+            outputs = Parallel(n_jobs=self.n_jobs, backend="loky", return_as="generator")(
+                delayed(_run_trial)(model_name, params, resource, folds.paths, self.threads_per_trial)
+                for _, params in batch)
+            with open(self.trials_path, "a") as f:
+                for (key, _), record in zip(batch, outputs):
+                    record["key"] = key
+                    self.trials[key] = record
+                    f.write(json.dumps(record, default=str) + "\n")
+                    f.flush()
+
+        return [self.trials[key]["score"] if key in self.trials else None for key in keys]
+
+    def search(self, model_name, X, y, n_splits=3, time_series=False):
+        """
+        Ejecuta Hyperband para un modelo.
+
+        Returns:
+            dict: Mejores parámetros (incluido el nº de estimadores si ese es el recurso),
+            su MSE de validación cruzada y el recurso con el que se midió.
+        """
+        folds = FoldCache(os.path.join(self.search_dir, "folds"), X, y, n_splits, time_series)
+        spec = SEARCH_SPACES[model_name]
+        ratio = self.max_resource / self.min_resource
+        s_max = int(math.floor(math.log(ratio, self.eta) + 1e-9))
+        best = None
+
+        for s in range(s_max, -1, -1):
+            n = int(math.ceil((s_max + 1) / (s + 1) * self.eta ** s))
+            amount = self.max_resource * self.eta ** (-s)
+            candidates = [dict(params) for params in ParameterSampler(
+                spec["space"], n, random_state=self.seed + s)]
+            for rung in range(s + 1):
+                if not self.budget_left():
+                    return best
+                scores = self._evaluate(model_name, candidates, amount, folds)
+                finished = [(score, params) for score, params in zip(scores, candidates) if score is not None]
+                if not finished:
+                    return best
+                finished.sort(key=lambda item: item[0])
+                # Sólo cuentan como "mejor" las evaluaciones con el recurso máximo de esta rama
+                if rung == s and (best is None or finished[0][0] < best["score"]):
+                    resource = self._resource_for(model_name, amount)
+                    params = dict(finished[0][1])
+                    if resource[0] == "estimators":
+                        params[spec["estimators_param"]] = resource[1]
+                    best = {"params": params, "score": finished[0][0], "resource": list(resource)}
+                keep = max(1, int(len(finished) / self.eta))
+                candidates = [params for _, params in finished[:keep]]
+                amount = min(self.max_resource, amount * self.eta)
+        return best
+
+
+def load_tuned_params(path=TUNED_PARAMS_PATH):
+    """Parámetros ajustados por modelo ({} si todavía no se ha ejecutado la búsqueda)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {name: result["params"] for name, result in json.load(f).items()}
+
+
+def tuning_data():
+    """Características y objetivos con los que se entrenan los modelos de goles."""
+    from .match_data import load_matches
+    from .team_form import build_form_features
+
+    matches = load_matches()
+    matches["HF"], matches["AF"], _ = build_form_features(matches, window=5)
+    matches = matches.fillna({"HF": 0, "AF": 0})
+    return matches[["HF", "AF", "HomeTeam", "AwayTeam"]], matches[GOAL_TARGETS].to_numpy(dtype=float)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budget-aware Hyperband tuning of the goal models")
+    parser.add_argument("--models", nargs="+", default=["Random Forest", "XGBRegressor"], choices=sorted(SEARCH_SPACES))
+    parser.add_argument("--search-dir", default="tuning_runs/default")
+    parser.add_argument("--resource", choices=["rows", "estimators"], default="rows")
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--time-series", action="store_true", help="time-ordered folds instead of shuffled KFold")
+    parser.add_argument("--n-jobs", type=int)
+    parser.add_argument("--threads-per-trial", type=int, default=1)
+    parser.add_argument("--cpu-hours", type=float, help="total CPU budget, including resumed trials")
+    parser.add_argument("--output", default=TUNED_PARAMS_PATH, help="best parameters per model (JSON)")
+    args = parser.parse_args(argv)
+
+    X, y = tuning_data()
+    search = HyperbandSearch(args.search_dir, args.resource, eta=args.eta, n_jobs=args.n_jobs,
+                             threads_per_trial=args.threads_per_trial, cpu_hours=args.cpu_hours)
+    results = {}
+    if os.path.exists(args.output):
+        with open(args.output) as f:
+            results = json.load(f)
+    for model_name in args.models:
+        best = search.search(model_name, X, y, args.folds, args.time_series)
+        if best is not None:
+            results[model_name] = best
+            print(f"{model_name}: MSE {best['score']:.4f} with {best['params']}")
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+    print(f"{len(search.trials)} trials, {search.cpu_seconds / 3600:.3f} CPU hours")
+
+
+if __name__ == "__main__":
+    main()
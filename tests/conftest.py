@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Datos compartidos por los tests: una liga sintética y reproducible, sin red."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Nada de descargas ni de caché de modelos durante los tests
+os.environ["PREDICT_SCORE_OFFLINE"] = "1"
+os.environ["PREDICT_SCORE_MODEL_CACHE"] = "off"
+
+TEAMS = [f"Team {i:02d}" for i in range(12)]
+
+
+def make_matches(n_rounds=6, teams=TEAMS, seed=0, start="2023-08-12"):
+    """
+    Liga a doble vuelta repetida ``n_rounds`` veces, un partido por día,
+    con goles de Poisson y algunas estadísticas y cuotas.
+    """
+    rng = np.random.default_rng(seed)
+    pairs = [(home, away) for home in teams for away in teams if home != away]
+    fixtures = [pairs[i] for _ in range(n_rounds // 2 or 1) for i in rng.permutation(len(pairs))]
+    n = len(fixtures)
+    strength = dict(zip(teams, rng.normal(0.0, 0.3, len(teams))))
+    home_rate = np.array([np.exp(0.3 + strength[h] - strength[a]) for h, a in fixtures])
+    away_rate = np.array([np.exp(0.1 + strength[a] - strength[h]) for h, a in fixtures])
+    matches = pd.DataFrame({
+        "Div": "E0",
+        "Date": pd.Timestamp(start) + pd.to_timedelta(np.arange(n), unit="D"),
+        "HomeTeam": [h for h, _ in fixtures],
+        "AwayTeam": [a for _, a in fixtures],
+        "FTHG": rng.poisson(home_rate).astype("float32"),
+        "FTAG": rng.poisson(away_rate).astype("float32"),
+        "HS": rng.poisson(12, n).astype("float32"),
+        "AS": rng.poisson(10, n).astype("float32"),
+        "HST": rng.poisson(5, n).astype("float32"),
+        "AST": rng.poisson(4, n).astype("float32"),
+        "HC": rng.poisson(6, n).astype("float32"),
+        "AC": rng.poisson(5, n).astype("float32"),
+        "HY": rng.poisson(2, n).astype("float32"),
+        "AY": rng.poisson(2, n).astype("float32"),
+        "HR": rng.poisson(0.1, n).astype("float32"),
+        "AR": rng.poisson(0.1, n).astype("float32"),
+    })
+    matches["FTR"] = np.select([matches["FTHG"] > matches["FTAG"], matches["FTHG"] < matches["FTAG"]],
+                               ["H", "A"], "D")
+    return matches
+
+
+@pytest.fixture
+def matches():
+    return make_matches()
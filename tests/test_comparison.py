@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+pytest.importorskip("xgboost")
+pytest.importorskip("catboost")
+
+from predict_score.comparison import evaluate_models, preprocess_data  # noqa: E402
+from predict_score.model_catalog import build_models  # noqa: E402
+
+# Modelos pequeños: sólo interesa que cada modo de evaluación funcione
+FAST_PARAMS = {
+    "Random Forest": {"n_estimators": 10},
+    "Gradient Boosting": {"n_estimators": 10},
+    "XGBRegressor": {"n_estimators": 10},
+    "CatBoostRegressor": {"iterations": 10},
+    "Stacking Regressor": {"rf__n_estimators": 10, "gb__n_estimators": 10},
+}
+
+
+@pytest.fixture
+def split(matches):
+    (X_train, X_test, y_home_train, y_home_test), (_, _, y_away_train, y_away_test) = preprocess_data(matches)
+    return X_train, X_test, y_home_train, y_home_test, y_away_train, y_away_test
+
+
+@pytest.mark.parametrize("multioutput", [False, True])
+def test_oof_stacking_scores_every_model(split, multioutput):
+    results = evaluate_models(*split, n_jobs=1, multioutput=multioutput, params=FAST_PARAMS, oof_stacking=True)
+    assert list(results["Model"]) == list(build_models())
+    assert np.isfinite(results[["Home MSE", "Away MSE", "Home MAE", "Away MAE"]].to_numpy()).all()
+
+
+@pytest.mark.parametrize("multioutput", [False, True])
+def test_oof_stacking_base_scores_match_plain_evaluation(split, multioutput):
+    plain = evaluate_models(*split, n_jobs=1, multioutput=multioutput, params=FAST_PARAMS).set_index("Model")
+    oof = evaluate_models(*split, n_jobs=1, multioutput=multioutput, params=FAST_PARAMS,
+                          oof_stacking=True).set_index("Model")
+    # Los modelos base se ajustan con todo el entrenamiento en ambos caminos
+    for name in ("Linear Regression", "Random Forest", "Gradient Boosting"):
+        np.testing.assert_allclose(oof.loc[name, ["Home MSE", "Away MSE"]], plain.loc[name, ["Home MSE", "Away MSE"]],
+                                   rtol=1e-9)
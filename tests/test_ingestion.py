@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from predict_score.ingestion import FeatureStore, ingest, ingest_csv, refresh_form
+from predict_score.match_data import (append_matches, bootstrap_from_csv, default_seasons, fetch_partitions,
+                                      load_matches, read_partition)
+from predict_score.model_bundle import ModelBundle
+from predict_score.team_form import TeamFormStore, build_form_features
+
+
+def _csv(tmp_path, matches):
+    path = tmp_path / "matches.csv"
+    matches.assign(Date=matches["Date"].dt.strftime("%d/%m/%Y")).to_csv(path, index=False)
+    return path
+
+
+def test_bootstrap_never_overwrites_cached_partitions(tmp_path, matches):
+    csv_path, cache = _csv(tmp_path, matches), tmp_path / "cache"
+    assert bootstrap_from_csv(csv_path, cache) == [("E0", "2324"), ("E0", "2425")]
+    late = matches.iloc[:1].assign(Date=pd.Timestamp("2024-05-30"), HomeTeam="New Team")
+    assert len(append_matches(late, "E0", cache)) == 1
+    rows = len(read_partition("E0", "2324", cache_dir=cache))
+
+    assert bootstrap_from_csv(csv_path, cache) == []
+    # Una temporada que falta sale del CSV del paquete, sin tocar las que ya están
+    assert fetch_partitions(["2324", "2122"], "E0", offline=True, refresh=True, cache_dir=cache) == []
+    assert len(read_partition("E0", "2122", cache_dir=cache)) > 0
+    assert len(read_partition("E0", "2324", cache_dir=cache)) == rows
+
+
+def test_ingested_season_and_form_reach_loaders_and_bundles(tmp_path, matches):
+    cache = tmp_path / "cache"
+    bootstrap_from_csv(_csv(tmp_path, matches), cache)
+    history = load_matches(["2425", "2324"], cache_dir=cache)
+    FeatureStore("E0", cache).build(seasons=["2425", "2324"])
+    new = pd.DataFrame({"Date": ["16/08/2025"], "HomeTeam": ["Team 00"], "AwayTeam": ["Team 01"],
+                        "FTHG": [4], "FTAG": [0]})
+    result = ingest(new, "E0", cache)
+    assert result["added"] == 1
+
+    assert default_seasons("E0", cache)[0] == "2526"
+    store = FeatureStore("E0", cache)
+    expected = build_form_features(pd.concat([history.sort_values("Date"), load_matches(["2526"], cache_dir=cache)]))
+    table = store.read()
+    np.testing.assert_allclose(table["HF"], expected[0], equal_nan=True)
+
+    bundle = ModelBundle(None, None, form_store=TeamFormStore.from_matches(history.sort_values("Date")))
+    assert refresh_form(bundle, "E0", cache) == store.version
+    assert bundle.form_store.home_form("Team 00") == store.form_store.home_form("Team 00")
+    assert bundle.form_store.recent("Team 00")[-1] == 4.0
+
+
+def test_refresh_form_keeps_teams_outside_the_table(tmp_path, matches):
+    cache = tmp_path / "cache"
+    bootstrap_from_csv(_csv(tmp_path, matches), cache)
+    store = FeatureStore("E0", cache)
+    store.build(seasons=["2425", "2324"])
+
+    # Bundle entrenado con dos ligas: los equipos de la segunda no están en la tabla de E0
+    other = matches.assign(HomeTeam="Other " + matches["HomeTeam"], AwayTeam="Other " + matches["AwayTeam"])
+    frozen = TeamFormStore.from_matches(pd.concat([matches.iloc[:100], other]))
+    bundle = ModelBundle(None, None, form_store=frozen)
+    assert refresh_form(bundle, "E0", cache) == store.version
+
+    assert set(bundle.form_store.teams) == set(frozen.teams)
+    for team in ("Team 00", "Team 07"):
+        assert bundle.form_store.home_form(team) == store.form_store.home_form(team)
+        assert bundle.form_store.home_form(team) != frozen.home_form(team)
+    for team in ("Other Team 00", "Other Team 07"):
+        assert bundle.form_store.home_form(team) == frozen.home_form(team)
+        assert bundle.form_store.away_form(team) == frozen.away_form(team)
+
+
+def test_ingest_csv_reports_added_and_duplicate_matches(tmp_path, matches, capsys):
+    cache = tmp_path / "cache"
+    bootstrap_from_csv(_csv(tmp_path, matches), cache)
+    FeatureStore("E0", cache).build(seasons=["2425", "2324"])
+    day = tmp_path / "day.csv"
+    pd.DataFrame({"Date": ["16/08/2025", "16/08/2025"], "HomeTeam": ["Team 00", "Team 00"],
+                  "AwayTeam": ["Team 01", "Team 01"], "FTHG": [1, 1], "FTAG": [0, 0]}).to_csv(day, index=False)
+
+    result = ingest_csv([day], "E0", cache_dir=cache)
+    assert (result["added"], result["duplicates"]) == (1, 1)
+    assert capsys.readouterr().out.startswith("1 new matches, 1 already stored")
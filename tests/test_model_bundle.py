@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+from predict_score.model_bundle import load_bundle, mark_stale, save_bundle
+from predict_score.preprocessing import create_preprocessor
+from predict_score.team_form import build_form_features
+
+FIXTURES = [("Team 00", "Team 01"), ("Team 05", "Team 03"), ("Team 11", "Team 07")]
+
+
+@pytest.fixture
+def trained(matches):
+    matches["HF"], matches["AF"], form_store = build_form_features(matches)
+    matches = matches.dropna(subset=["HF", "AF"])
+    preprocessor = create_preprocessor()
+    X = preprocessor.fit_transform(matches[["HF", "AF", "HomeTeam", "AwayTeam"]])
+    return preprocessor, X, matches[["FTHG", "FTAG"]].to_numpy(), form_store
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_round_trip_two_models(tmp_path, trained, mmap_mode):
+    preprocessor, X, y, form_store = trained
+    home_model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y[:, 0])
+    away_model = Ridge().fit(X, y[:, 1])
+    path = str(tmp_path / "bundle.joblib")
+    saved = save_bundle(path, preprocessor, home_model, away_model, form_store, metadata={"seasons": ["2324"]})
+
+    loaded = load_bundle(path, mmap_mode=mmap_mode)
+    assert not loaded.joint and loaded.stale is None
+    assert loaded.teams == saved.teams == sorted(form_store.teams)
+    assert loaded.metadata == saved.metadata
+    assert loaded.metadata["seasons"] == ["2324"] and loaded.metadata["home_model"] == "RandomForestRegressor"
+    expected = saved.predict_fixtures(FIXTURES)
+    np.testing.assert_array_equal(loaded.predict_fixtures(FIXTURES)[["home_goals", "away_goals"]],
+                                  expected[["home_goals", "away_goals"]])
+    for team in form_store.teams:
+        assert loaded.form_store.home_form(team) == form_store.home_form(team)
+
+
+def test_round_trip_joint_model_and_form_updates(tmp_path, trained):
+    preprocessor, X, y, form_store = trained
+    model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+    path = str(tmp_path / "bundle.joblib")
+    saved = save_bundle(path, preprocessor, model, form_store=form_store)
+
+    loaded = load_bundle(path)
+    assert loaded.joint
+    np.testing.assert_array_equal(loaded.predict_fixtures(FIXTURES)["home_goals"],
+                                  saved.predict_fixtures(FIXTURES)["home_goals"])
+    # Los buffers mapeados son de sólo lectura: actualizar la forma debe copiarlos
+    loaded.form_store.update("Team 00", "Team 01", 3.0)
+    assert loaded.form_store.home_form("Team 00") != form_store.home_form("Team 00")
+
+
+def test_stale_marks_accumulate_until_saved_again(tmp_path, trained):
+    preprocessor, X, y, form_store = trained
+    model = Ridge().fit(X, y)
+    path = str(tmp_path / "bundle.joblib")
+    save_bundle(path, preprocessor, model, form_store=form_store)
+    mark_stale(path, 2, ["Team 00", "Team 01"], "2025-08-16")
+    mark_stale(path, 1, ["Team 02"])
+
+    stale = load_bundle(path).stale
+    assert stale["new_matches"] == 3 and stale["teams"] == ["Team 00", "Team 01", "Team 02"]
+    save_bundle(path, preprocessor, model, form_store=form_store)
+    assert load_bundle(path).stale is None
+
+
+def test_rejects_other_files(tmp_path):
+    import joblib
+
+    path = tmp_path / "other.joblib"
+    joblib.dump({"model": 1}, path)
+    with pytest.raises(ValueError, match="not a model bundle"):
+        load_bundle(str(path))
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+from predict_score.model_cache import CACHE_ENV, ModelCache, default_cache, fit_cached
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    return X, X @ [1.0, -2.0, 0.5, 0.0] + rng.normal(0, 0.1, 200)
+
+
+def test_hit_and_miss(tmp_path, data):
+    X, y = data
+    cache = ModelCache(tmp_path)
+    first = fit_cached(Ridge(alpha=1.0), X, y, cache=cache)
+    second = fit_cached(Ridge(alpha=1.0), X, y, cache=cache)
+    np.testing.assert_array_equal(second.coef_, first.coef_)
+    assert second is not first
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["models"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_key_ignores_threads_but_not_data_or_params(data):
+    X, y = data
+    cache = ModelCache("unused")
+    key = cache.key(RandomForestRegressor(n_estimators=5), X, y)
+    assert cache.key(RandomForestRegressor(n_estimators=5, n_jobs=4, verbose=1), X, y) == key
+    assert cache.key(RandomForestRegressor(n_estimators=6), X, y) != key
+    assert cache.key(RandomForestRegressor(n_estimators=5), X, y + 1) != key
+    assert cache.key(RandomForestRegressor(n_estimators=5), X, y, features=list("abcd")) != key
+
+
+def test_evicts_least_recently_used(tmp_path, data):
+    X, y = data
+    cache = ModelCache(tmp_path)
+    keys = []
+    for i, alpha in enumerate((1.0, 2.0, 3.0)):
+        model = Ridge(alpha=alpha).fit(X, y)
+        keys.append(cache.key(model, X, y))
+        cache.put(keys[-1], model)
+        # Últimos usos separados un segundo: 0 el más antiguo
+        os.utime(cache._model_path(keys[-1]), (1_000_000 + i, 1_000_000 + i))
+    assert cache.get(keys[0]) is not None  # vuelve a ser el más reciente
+
+    size = max(size for _, size, _ in cache.entries())
+    cache.max_bytes = int(2.5 * size)
+    model = Ridge(alpha=4.0).fit(X, y)
+    cache.put(cache.key(model, X, y), model)
+
+    remaining = {os.path.basename(path)[:-len(".joblib")] for path, _, _ in cache.entries()}
+    assert remaining == {keys[0], cache.key(model, X, y)}
+    assert cache.stats()["evictions"] == 2
+
+
+def test_default_cache_is_off_unless_enabled(tmp_path, monkeypatch):
+    monkeypatch.delenv(CACHE_ENV, raising=False)
+    assert default_cache() is None
+    monkeypatch.setenv(CACHE_ENV, "off")
+    assert default_cache() is None
+    monkeypatch.setenv(CACHE_ENV, str(tmp_path / "models"))
+    assert default_cache().path == str(tmp_path / "models")
+    monkeypatch.setenv(CACHE_ENV, "on")
+    monkeypatch.setenv("PREDICT_SCORE_CACHE_DIR", str(tmp_path))
+    assert default_cache().path == os.path.join(str(tmp_path), "models")
+
+
+def test_fit_cached_without_cache_writes_nothing(tmp_path, data, monkeypatch):
+    monkeypatch.delenv(CACHE_ENV, raising=False)
+    monkeypatch.chdir(tmp_path)
+    model = fit_cached(Ridge(), *data)
+    assert hasattr(model, "coef_")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from predict_score.mlp import TeamEmbeddingEncoder, build_embedding_mlp, build_mlp  # noqa: E402
+from predict_score.numpy_inference import NumpyScorePredictor, export_npz  # noqa: E402
+from predict_score.preprocessing import create_preprocessor  # noqa: E402
+from predict_score.team_form import build_form_features  # noqa: E402
+
+
+@pytest.fixture
+def training(matches):
+    matches["HF"], matches["AF"], form_store = build_form_features(matches)
+    matches = matches.dropna(subset=["HF", "AF"]).reset_index(drop=True)
+    features = matches[["HF", "AF", "HomeTeam", "AwayTeam"]]
+    # Un equipo que no estaba en el entrenamiento: one-hot a cero / embedding 0
+    queries = features.iloc[:50].copy()
+    queries.loc[[3, 7], "HomeTeam"] = "Unknown FC"
+    queries.loc[[5], "AwayTeam"] = "Unknown FC"
+    return features, matches[["FTHG", "FTAG"]].to_numpy(dtype=np.float32), queries, form_store
+
+
+def _export_and_load(tmp_path, preprocessor, model, form_store):
+    path = str(tmp_path / "model.npz")
+    export_npz(path, preprocessor, model, form_store)
+    return NumpyScorePredictor.load(path)
+
+
+@pytest.mark.parametrize("sparse_float32", [False, True])
+def test_one_hot_mlp_matches_keras(tmp_path, training, sparse_float32):
+    features, y, queries, form_store = training
+    preprocessor = create_preprocessor(sparse_float32=sparse_float32)
+    X = preprocessor.fit_transform(features)
+    model = build_mlp(X.shape[1], sparse_input=sparse_float32)
+    model.fit(X, y, epochs=2, batch_size=64, verbose=0)
+
+    predictor = _export_and_load(tmp_path, preprocessor, model, form_store)
+    assert predictor.kind == "one_hot"
+    expected = model.predict(preprocessor.transform(queries), verbose=0)
+    np.testing.assert_allclose(predictor.predict(queries), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_embedding_mlp_matches_keras(tmp_path, training):
+    features, y, queries, form_store = training
+    encoder = TeamEmbeddingEncoder().fit(features)
+    model = build_embedding_mlp(encoder.n_teams)
+    model.fit(encoder.transform(features), y, epochs=2, batch_size=64, verbose=0)
+
+    predictor = _export_and_load(tmp_path, encoder, model, form_store)
+    assert predictor.kind == "embedding"
+    expected = model.predict(encoder.transform(queries), verbose=0)
+    np.testing.assert_allclose(predictor.predict(queries), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_exported_form_predicts_from_team_names(tmp_path, training):
+    features, y, _, form_store = training
+    preprocessor = create_preprocessor()
+    X = preprocessor.fit_transform(features)
+    model = build_mlp(X.shape[1])
+
+    predictor = _export_and_load(tmp_path, preprocessor, model, form_store)
+    goals = predictor.predict_fixtures([("Team 00", "Team 01")])
+    query = features.iloc[:1].copy()
+    query[["HF", "AF", "HomeTeam", "AwayTeam"]] = [form_store.home_form("Team 00"), form_store.away_form("Team 01"),
+                                                   "Team 00", "Team 01"]
+    expected = model.predict(preprocessor.transform(query), verbose=0)[0]
+    np.testing.assert_allclose(goals.loc[0, ["home_goals", "away_goals"]].to_numpy(dtype=float), expected,
+                               rtol=1e-5, atol=1e-5)
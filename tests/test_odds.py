@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from predict_score.odds import OddsMatrix, odds_columns, scan_value
+
+
+@pytest.fixture
+def book_odds():
+    # Partido 0: dos casas; 1: B365 sin empate y sólo medias completas; 2: sólo Avg y Max; 3: nadie
+    return pd.DataFrame({
+        "HomeTeam": ["A", "C", "E", "G"], "AwayTeam": ["B", "D", "F", "H"],
+        "B365H": [2.10, 1.50, np.nan, np.nan], "B365D": [3.40, np.nan, np.nan, np.nan],
+        "B365A": [3.60, 6.50, np.nan, np.nan],
+        "PSH": [2.20, np.nan, np.nan, np.nan], "PSD": [3.50, np.nan, np.nan, np.nan],
+        "PSA": [3.70, np.nan, np.nan, np.nan],
+        "AvgH": [2.05, 1.55, 1.80, np.nan], "AvgD": [3.30, 4.00, 3.60, np.nan], "AvgA": [3.50, 6.00, 4.50, np.nan],
+        "MaxH": [2.25, 1.60, 1.90, np.nan], "MaxD": [3.60, 4.20, 3.80, np.nan], "MaxA": [3.80, 6.60, 4.80, np.nan],
+        "B365C>2.5": [1.9, 2.0, 1.8, 2.1], "B365C<2.5": [1.9, 1.8, 2.0, 1.7],
+    })
+
+
+def test_odds_columns_group_books_and_outcomes(book_odds):
+    assert odds_columns(book_odds.columns)["B365"] == ["B365H", "B365D", "B365A"]
+    assert set(odds_columns(book_odds.columns)) == {"B365", "PS", "Avg", "Max"}
+    assert odds_columns(book_odds.columns, "ou25") == {}
+    assert odds_columns(book_odds.columns, "ou25", closing=True) == {"B365": ["B365C>2.5", "B365C<2.5"]}
+
+
+@pytest.mark.parametrize("method", ["basic", "power"])
+def test_fair_probabilities_sum_to_one_and_keep_gaps(book_odds, method):
+    matrix = OddsMatrix.from_matches(book_odds)
+    fair = matrix.fair_probabilities(method)
+    quoted = ~np.isnan(matrix.odds).any(axis=2)
+    np.testing.assert_allclose(fair[quoted].sum(axis=1), 1.0, atol=1e-9)
+    # Una casa a la que le falta algún resultado no tiene probabilidades
+    assert np.isnan(fair[~quoted]).all()
+    assert np.isnan(fair[1, matrix.books.index("B365")]).all()
+
+
+def test_power_method_is_a_common_exponent():
+    rng = np.random.default_rng(0)
+    fair = rng.dirichlet([4, 3, 3], size=500)
+    # Cuotas con margen de potencia: probabilidades implícitas p ** k con k < 1 (suman más de 1)
+    k = rng.uniform(0.85, 0.98, (500, 1))
+    odds = 1.0 / fair ** k
+    matrix = OddsMatrix("1x2", ["B365"], ("H", "D", "A"), odds[:, None, :], pd.RangeIndex(500))
+    recovered = matrix.fair_probabilities("power")[:, 0, :]
+    np.testing.assert_allclose(recovered.sum(axis=1), 1.0, atol=1e-9)
+    np.testing.assert_allclose(recovered, fair, atol=1e-4)
+
+
+def test_consensus_uses_books_and_falls_back_to_averages(book_odds):
+    matrix = OddsMatrix.from_matches(book_odds)
+    consensus = matrix.consensus()
+    fair = matrix.fair_probabilities()
+    b365, ps, avg = (matrix.books.index(book) for book in ("B365", "PS", "Avg"))
+
+    assert consensus["books"].tolist() == [2, 1, 1, 0]
+    np.testing.assert_allclose(consensus.loc[0, ["H", "D", "A"]], (fair[0, b365] + fair[0, ps]) / 2)
+    # Sin ninguna casa completa se usa la media del mercado (Avg), nunca Max
+    np.testing.assert_allclose(consensus.loc[1, ["H", "D", "A"]], fair[1, avg])
+    np.testing.assert_allclose(consensus.loc[2, ["H", "D", "A"]], fair[2, avg])
+    assert consensus.loc[3, ["H", "D", "A", "overround"]].isna().all()
+
+
+def test_best_odds_skip_averages(book_odds):
+    odds, books = OddsMatrix.from_matches(book_odds).best_odds()
+    np.testing.assert_allclose(odds[0], [2.25, 3.60, 3.80])
+    assert books[0].tolist() == ["Max", "Max", "Max"]
+    assert books[1, 2] == "Max" and odds[1, 2] == 6.60
+    assert np.isnan(odds[3]).all() and books[3].tolist() == [None, None, None]
+
+
+def test_scan_value_flags_positive_edges(book_odds):
+    predictions = pd.DataFrame({"H": [0.60, 0.10, 0.50, 0.4], "D": [0.20, 0.10, 0.25, 0.3],
+                                "A": [0.20, 0.80, 0.25, 0.3]})
+    value = scan_value(predictions, book_odds, min_edge=0.05)
+    assert list(zip(value["HomeTeam"], value["outcome"])) == [("C", "A"), ("A", "H"), ("E", "A")]
+    np.testing.assert_allclose(value["edge"], [0.8 * 6.6 - 1, 0.6 * 2.25 - 1, 0.25 * 4.8 - 1])
+    assert (value["book"] == "Max").all()
+
+
+def test_scan_value_without_odds_columns_names_the_market(book_odds):
+    plain = book_odds[["HomeTeam", "AwayTeam"]]
+    predictions = pd.DataFrame({"H": [0.5] * 4, "D": [0.25] * 4, "A": [0.25] * 4})
+    with pytest.raises(ValueError, match="no 1x2 odds columns in matches"):
+        scan_value(predictions, plain)
+    with pytest.raises(ValueError, match="no ou25 odds columns"):
+        scan_value(predictions.rename(columns={"H": "Over", "D": "Under"}), book_odds, market="ou25")
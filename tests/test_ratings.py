@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+from scipy.optimize import check_grad
+
+from predict_score.ratings import ELO_SCALE, INITIAL_ELO, DixonColes, RatingEngine, rating_features
+
+
+def _likelihood_args(matches, alpha=1e-3):
+    teams = pd.Index(pd.unique(matches[["HomeTeam", "AwayTeam"]].to_numpy().ravel()))
+    h, a = teams.get_indexer(matches["HomeTeam"]), teams.get_indexer(matches["AwayTeam"])
+    x, y = matches["FTHG"].to_numpy(dtype=float), matches["FTAG"].to_numpy(dtype=float)
+    w = np.exp(-0.002 * np.arange(len(x))[::-1])
+    low = np.flatnonzero((x <= 1) & (y <= 1))
+    cases = [((x[low] == i) & (y[low] == j)).astype(float) for i, j in ((0, 0), (0, 1), (1, 0), (1, 1))]
+    return h, a, x, y, w, low, cases, len(teams), alpha
+
+
+def _random_params(n_teams, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.r_[rng.normal(0, 0.3, 2 * n_teams), 0.25, -0.08]
+
+
+def test_dixon_coles_gradient(matches):
+    args = _likelihood_args(matches)
+    params = _random_params(args[-2])
+    error = check_grad(lambda p: DixonColes._negative_log_likelihood(p, *args)[0],
+                       lambda p: DixonColes._negative_log_likelihood(p, *args)[1], params)
+    assert error < 1e-5 * np.linalg.norm(DixonColes._negative_log_likelihood(params, *args)[1]) + 1e-7
+
+
+def test_dixon_coles_likelihood_matches_definition(matches):
+    h, a, x, y, w, low, cases, n, alpha = _likelihood_args(matches)
+    params = _random_params(n, seed=1)
+    attack, defence, home, rho = params[:n], params[n:2 * n], params[-2], params[-1]
+    loglik = []
+    for i in range(len(x)):
+        lam = np.exp(home + attack[h[i]] + defence[a[i]])
+        mu = np.exp(attack[a[i]] + defence[h[i]])
+        tau = {(0, 0): 1 - lam * mu * rho, (0, 1): 1 + lam * rho, (1, 0): 1 + mu * rho, (1, 1): 1 - rho}
+        # Sin los términos log(x!) log(y!), que no dependen de los parámetros
+        loglik.append(x[i] * np.log(lam) - lam + y[i] * np.log(mu) - mu + np.log(tau.get((x[i], y[i]), 1.0)))
+    expected = -(w @ np.array(loglik)) / w.sum() + alpha * (attack @ attack + defence @ defence)
+    value, _ = DixonColes._negative_log_likelihood(params, h, a, x, y, w, low, cases, n, alpha)
+    assert np.isclose(value, expected, rtol=1e-12)
+
+
+def test_dixon_coles_fit_is_stationary(matches):
+    model = DixonColes(xi=0.0, alpha=1e-3).fit(matches)
+    h, a, x, y, _, low, cases, n, alpha = _likelihood_args(matches)
+    assert list(model.teams_) == list(pd.unique(matches[["HomeTeam", "AwayTeam"]].to_numpy().ravel()))
+    params = np.r_[model.attack_, model.defence_, model.home_, model.rho_]
+    _, gradient = DixonColes._negative_log_likelihood(params, h, a, x, y, np.ones(len(x)), low, cases, n, alpha)
+    # rho puede quedar en su cota; el resto del gradiente se anula en el óptimo
+    assert np.abs(gradient[:-1]).max() < 1e-4
+    probabilities = model.outcome_probabilities([("Team 00", "Team 01")])
+    np.testing.assert_allclose(probabilities[["H", "D", "A"]].sum(axis=1), 1.0, atol=1e-6)
+
+
+def test_streaming_updates_equal_batch_stream(matches):
+    batch = RatingEngine()
+    features = batch.stream(matches)
+
+    streaming = RatingEngine()
+    for i, row in enumerate(matches.itertuples(index=False)):
+        if row.HomeTeam in streaming and row.AwayTeam in streaming:
+            before = streaming.features([(row.HomeTeam, row.AwayTeam)]).iloc[0, 2:].to_numpy(dtype=float)
+            np.testing.assert_allclose(before, features[i], rtol=1e-12)
+        streaming.update(row.HomeTeam, row.AwayTeam, row.FTHG, row.FTAG)
+
+    pd.testing.assert_frame_equal(streaming.ratings(), batch.ratings())
+    assert streaming.intercept == batch.intercept and streaming.home == batch.home
+
+
+def test_elo_matches_reference_loop(matches):
+    k, advantage = 20.0, 60.0
+    elo = {}
+    expected_home, expected_away = [], []
+    for row in matches.sort_values("Date").itertuples():
+        home, away = elo.get(row.HomeTeam, INITIAL_ELO), elo.get(row.AwayTeam, INITIAL_ELO)
+        expected_home.append(home)
+        expected_away.append(away)
+        score = 1.0 if row.FTHG > row.FTAG else 0.5 if row.FTHG == row.FTAG else 0.0
+        margin = abs(row.FTHG - row.FTAG)
+        multiplier = 1.0 if margin <= 1 else 1.5 if margin == 2 else (11 + margin) / 8
+        change = k * multiplier * (score - 1 / (1 + 10 ** ((away - home - advantage) / ELO_SCALE)))
+        elo[row.HomeTeam], elo[row.AwayTeam] = home + change, away - change
+
+    shuffled = matches.sample(frac=1.0, random_state=3)
+    features = rating_features(shuffled, k=k, home_advantage=advantage).loc[matches.sort_values("Date").index]
+    np.testing.assert_allclose(features["home_elo"], expected_home, rtol=1e-6)
+    np.testing.assert_allclose(features["away_elo"], expected_away, rtol=1e-6)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from predict_score.rolling_features import build_rolling_features, feature_columns
+
+STATS = ["goals_for", "goals_against", "shots", "shots_on_target_against", "goal_difference", "points"]
+
+
+def _pandas_reference(matches, windows, stats, split):
+    # Filas de equipo en orden cronológico y, por grupo, shift() + rolling/ewm de pandas
+    ordered = matches.sort_values("Date", kind="stable")
+    rows = []
+    for side, (team, own, other, shots, target_against) in enumerate(
+            [("HomeTeam", "FTHG", "FTAG", "HS", "AST"), ("AwayTeam", "FTAG", "FTHG", "AS", "HST")]):
+        rows.append(pd.DataFrame({
+            "match": ordered.index, "position": np.arange(len(ordered)) * 2 + side, "team": ordered[team].to_numpy(),
+            "venue": side, "goals_for": ordered[own].to_numpy(float), "goals_against": ordered[other].to_numpy(float),
+            "shots": ordered[shots].to_numpy(float), "shots_on_target_against": ordered[target_against].to_numpy(float),
+        }))
+    long = pd.concat(rows).sort_values("position").reset_index(drop=True)
+    long["goal_difference"] = long["goals_for"] - long["goals_against"]
+    long["points"] = np.select([long["goal_difference"] > 0, long["goal_difference"] == 0], [3.0, 1.0], 0.0)
+
+    keys = ["team"] if split == "all" else ["team", "venue"]
+    grouped = long.groupby(keys, sort=False)
+    previous = grouped[stats].shift()
+    previous[keys] = long[keys]
+    by_group = previous.groupby(keys, sort=False)
+    expected = {}
+    for w in windows:
+        expected[f"n{w}"] = np.minimum(grouped.cumcount(), w)
+        for stat in stats:
+            expected[f"{stat}_mean{w}"] = by_group[stat].transform(lambda s: s.rolling(w, min_periods=1).mean())
+            expected[f"{stat}_ewm{w}"] = by_group[stat].transform(lambda s: s.ewm(span=w).mean())
+    expected = pd.DataFrame(expected)
+    expected["match"], expected["venue"] = long["match"], long["venue"]
+    return expected
+
+
+@pytest.mark.parametrize("split", ["all", "venue"])
+def test_matches_pandas_shift_rolling_and_ewm(matches, split):
+    rng = np.random.default_rng(1)
+    # Nulos sueltos: no cuentan en las medias pero sí en el número de partidos
+    matches.loc[rng.random(len(matches)) < 0.1, "HS"] = np.nan
+    matches = matches.sample(frac=1.0, random_state=2)
+    windows = (3, 5, 10)
+
+    features = build_rolling_features(matches, windows, STATS, splits=(split,))
+    assert list(features.columns) == feature_columns(windows, STATS, (split,))
+    assert features.index.equals(matches.index)
+
+    expected = _pandas_reference(matches, windows, STATS, split)
+    for venue, role in ((0, "home"), (1, "away")):
+        side = expected[expected["venue"] == venue].set_index("match").loc[matches.index]
+        for name in side.columns.drop("venue"):
+            np.testing.assert_allclose(features[f"{role}_{split}_{name}"], side[name], rtol=1e-5, atol=1e-6,
+                                       equal_nan=True, err_msg=f"{role}_{split}_{name}")
+
+
+def test_first_match_has_no_history(matches):
+    features = build_rolling_features(matches, windows=(5,), stats=["goals_for"])
+    first = matches.index[0]
+    assert features.loc[first, "home_all_n5"] == 0
+    assert np.isnan(features.loc[first, "home_all_goals_for_mean5"])
+    assert np.isnan(features.loc[first, "away_venue_goals_for_ewm5"])
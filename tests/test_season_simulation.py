@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import skellam
+
+from predict_score.season_simulation import (current_table, match_outcome_probabilities, poisson_rates,
+                                             simulate_season)
+
+
+def _predictions(matches, seed=0):
+    rng = np.random.default_rng(seed)
+    fixtures = matches.drop_duplicates(["HomeTeam", "AwayTeam"])[["HomeTeam", "AwayTeam"]].reset_index(drop=True)
+    fixtures["home_goals"] = rng.uniform(0.6, 2.4, len(fixtures))
+    fixtures["away_goals"] = rng.uniform(0.4, 1.8, len(fixtures))
+    return fixtures
+
+
+def _expected_points(predictions, probabilities):
+    home = pd.Series(3 * probabilities["H"] + probabilities["D"]).groupby(predictions["HomeTeam"]).sum()
+    away = pd.Series(3 * probabilities["A"] + probabilities["D"]).groupby(predictions["AwayTeam"]).sum()
+    return home.add(away, fill_value=0.0)
+
+
+@pytest.mark.parametrize("shared_rate", [0.0, 0.3])
+def test_outcome_probabilities_match_skellam(matches, shared_rate):
+    predictions = _predictions(matches)
+    probabilities = match_outcome_probabilities(predictions, shared_rate, max_goals=30)
+    # El componente común no cambia la diferencia de goles: sigue una Skellam de las tasas propias
+    home, away, _ = poisson_rates(predictions, shared_rate)
+    np.testing.assert_allclose(probabilities["H"], skellam.sf(0, home, away), atol=1e-9)
+    np.testing.assert_allclose(probabilities["D"], skellam.pmf(0, home, away), atol=1e-9)
+    np.testing.assert_allclose(probabilities["A"], skellam.cdf(-1, home, away), atol=1e-9)
+
+
+@pytest.mark.parametrize("shared_rate", [0.0, 0.3])
+def test_simulated_expected_points_match_analytic(matches, shared_rate):
+    predictions = _predictions(matches)
+    table = current_table(matches.iloc[:40])
+    simulation = simulate_season(predictions, n_simulations=20_000, chunk_size=3_000, table=table,
+                                 shared_rate=shared_rate, seed=0)
+
+    analytic = _expected_points(predictions, match_outcome_probabilities(predictions, shared_rate, max_goals=30))
+    analytic = analytic.add(table["Points"], fill_value=0.0)
+    # 22 partidos por equipo: desviación de los puntos ~6, error de la media ~0.05
+    np.testing.assert_allclose(simulation.expected_points.loc[analytic.index], analytic, atol=0.25)
+    np.testing.assert_allclose(simulation.position_probabilities.sum(axis=1), 1.0)
+    np.testing.assert_allclose(simulation.position_probabilities.sum(axis=0), 1.0)
+
+
+def test_current_table():
+    played = pd.DataFrame({"HomeTeam": ["A", "B", "C"], "AwayTeam": ["B", "C", "A"],
+                           "FTHG": [2, 1, 0], "FTAG": [0, 1, 3]})
+    table = current_table(played, teams=["A", "B", "C", "D"])
+    assert table["Points"].tolist() == [6, 1, 1, 0]
+    assert table["GD"].tolist() == [5, -2, -3, 0]
+    assert table["GF"].tolist() == [5, 1, 1, 0]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from predict_score.team_form import TeamFormStore, build_form_features, iter_form_features
+
+
+def _groupby_rolling(matches, column, window):
+    # Cálculo original de los scripts de entrenamiento
+    return (matches.groupby(column)["goal_difference"].rolling(window).mean()
+            .reset_index(level=0, drop=True).sort_index().to_numpy())
+
+
+def test_build_form_features_matches_groupby_rolling(matches):
+    matches["goal_difference"] = matches["FTHG"] - matches["FTAG"]
+    home_form, away_form, _ = build_form_features(matches, window=5)
+    np.testing.assert_allclose(home_form, _groupby_rolling(matches, "HomeTeam", 5), rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(away_form, _groupby_rolling(matches, "AwayTeam", 5), rtol=1e-12, equal_nan=True)
+
+
+def test_store_form_matches_last_rolling_value(matches):
+    matches["goal_difference"] = matches["FTHG"] - matches["FTAG"]
+    store = TeamFormStore.from_matches(matches, window=5)
+    for team in matches["HomeTeam"].unique():
+        for side in ("Home", "Away"):
+            played = matches[matches[f"{side}Team"] == team]
+            expected = played["goal_difference"].rolling(5).mean().iloc[-1]
+            assert np.isclose(store.form(team, side, full_window=True), expected, equal_nan=True)
+
+
+def test_update_equals_bulk_load(matches):
+    store = TeamFormStore(window=5)
+    store.update_many(matches)
+    bulk = TeamFormStore.from_matches(matches, window=5)
+    for team in bulk.teams:
+        assert store.home_form(team) == bulk.home_form(team)
+        assert store.away_form(team) == bulk.away_form(team)
+        np.testing.assert_array_equal(store.recent(team, "Away"), bulk.recent(team, "Away"))
+
+
+def test_partial_window_and_unknown_team():
+    store = TeamFormStore(window=3)
+    store.update("A", "B", 2.0)
+    store.update("A", "C", -1.0)
+    assert store.home_form("A") == 0.5
+    assert np.isnan(store.form("A", "Home", full_window=True))
+    assert store.away_form("A") == 0.0
+    assert store.home_form("Z") == 0.0
+
+
+def test_iter_form_features_matches_full_build(matches):
+    home_form, away_form, _ = build_form_features(matches, window=5)
+    chunks = [matches.iloc[start:start + 37] for start in range(0, len(matches), 37)]
+    streamed = pd.concat(iter_form_features(chunks, TeamFormStore(window=5)), ignore_index=True)
+    np.testing.assert_allclose(streamed["HF"], home_form, equal_nan=True)
+    np.testing.assert_allclose(streamed["AF"], away_form, equal_nan=True)